@@ -0,0 +1,442 @@
+import shlex
+from datetime import date, datetime
+from functools import partial, wraps
+
+import click
+
+from app.db.instrumentation import query_action
+from app.db.unit_of_work import UnitOfWork
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.auth_service import forget_session, login_user, remember_session, restore_session
+from app.services.client_service import create_client, get_clients_by_user, get_clients_page
+from app.services.contract_service import (
+    get_contracts_by_user, get_contracts_page, list_paid_contracts, list_signed_contracts,
+    list_unpaid_contracts, list_unsigned_contracts, record_payment, update_contract
+)
+from app.services.errors import NotFoundError, StaleDataError
+from app.services.event_service import (
+    assign_support_matching, assign_supports, get_events_with_details_page, get_filtered_events,
+    get_support_users, update_event
+)
+from app.services.import_service import RecordError, read_records
+from app.services.pagination import iter_pages
+from app.services.search_service import search_clients
+from app.services.user_service import list_users_page
+from app.utils import telemetry
+from app.utils.money import to_money
+from app.utils.validators import validate_client_data
+
+CLIENT_COLUMNS = ("id", "full_name", "email", "phone", "company_name", "commercial")
+CONTRACT_COLUMNS = ("id", "client", "commercial", "total_amount", "amount_due", "is_signed", "date_created")
+EVENT_COLUMNS = ("id", "name", "client", "support", "date_start", "date_end", "location", "attendees")
+USER_COLUMNS = ("id", "name", "email", "role")
+
+
+class CliContext:
+    """State shared by every command of one invocation: one login and one session"""
+
+    def __init__(self, email: str = None, password: str = None):
+        self.email = email
+        self.password = password
+        self.uow = UnitOfWork()
+        self._user = None
+
+    @property
+    def db(self):
+        return self.uow.session
+
+    def login(self) -> User:
+        """Log in on first use, the same user then serves every command"""
+        if self._user is None:
+            # A valid session token of the same user skips the prompts and the bcrypt check
+            user = restore_session(self.email)
+            if not user:
+                email = self.email or click.prompt("Email")
+                password = self.password or click.prompt("Mot de passe", hide_input=True)
+                user = login_user(email, password)
+                if not user:
+                    raise click.ClickException("Email ou mot de passe incorrect.")
+                remember_session(user)
+            self._user = user
+        return self._user
+
+    def require_role(self, *roles: UserRole) -> User:
+        """Get the logged in user, refusing the command for other roles"""
+        user = self.login()
+        if user.role not in roles:
+            raise click.ClickException("Accès non autorisé.")
+        return user
+
+
+_pass_obj = click.make_pass_decorator(CliContext)
+
+
+def pass_context(command):
+    """Pass the shared CliContext to a command, its statements being reported as one query action"""
+    @wraps(command)
+    def tracked(obj, *args, **kwargs):
+        with query_action(click.get_current_context().command_path):
+            result = command(obj, *args, **kwargs)
+        obj.uow.end_action()
+        return result
+    return _pass_obj(tracked)
+
+
+def _format(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, UserRole):
+        return value.value
+    return str(value)
+
+
+def _echo_rows(columns, rows):
+    """Print rows as tab separated values with a header line"""
+    click.echo("\t".join(columns))
+    for row in rows:
+        click.echo("\t".join(_format(value) for value in row))
+
+
+def _client_row(client: Client):
+    return (client.id, client.full_name, client.email, client.phone, client.company_name,
+            client.commercial.name if client.commercial else None)
+
+
+def _contract_row(contract: Contract):
+    return (contract.id, contract.client.full_name if contract.client else None,
+            contract.commercial.name if contract.commercial else None,
+            contract.total_amount, contract.amount_due, contract.is_signed, contract.date_created)
+
+
+def _event_row(event: Event):
+    client = event.contract.client if event.contract else event.client
+    return (event.id, event.name, client.full_name if client else None,
+            event.support_contact.name if event.support_contact else None,
+            event.date_start, event.date_end, event.location, event.attendees)
+
+
+@click.group(name="epic")
+@click.option("--email", envvar="EPIC_EMAIL", help="Email de connexion (EPIC_EMAIL).")
+@click.option("--password", envvar="EPIC_PASSWORD", help="Mot de passe (EPIC_PASSWORD).")
+@click.pass_context
+def cli(ctx, email, password):
+    """Epic Events CRM en ligne de commande."""
+    # Commands run from a file reuse the context, hence the login and the session, of the caller
+    if ctx.obj is None:
+        ctx.obj = CliContext(email, password)
+        ctx.call_on_close(ctx.obj.uow.close)
+
+
+@cli.group()
+def clients():
+    """Clients."""
+
+
+@clients.command("list")
+@click.option("--mine", is_flag=True, help="Uniquement mes clients (commercial).")
+@pass_context
+def list_clients(obj, mine):
+    """Liste les clients."""
+    user = obj.login()
+    if mine:
+        rows = get_clients_by_user(obj.db, user)
+    else:
+        rows = iter_pages(partial(get_clients_page, obj.db))
+    _echo_rows(CLIENT_COLUMNS, map(_client_row, rows))
+
+
+@clients.command("search")
+@click.argument("text")
+@click.option("--mine", is_flag=True, help="Uniquement mes clients (commercial).")
+@click.option("--limit", type=click.IntRange(min=1), default=None,
+              help="Nombre maximal de résultats (SEARCH_LIMIT, 20 par défaut).")
+@pass_context
+def search_clients_command(obj, text, mine, limit):
+    """Recherche des clients par nom, email, entreprise ou téléphone, les plus pertinents d'abord."""
+    user = obj.login()
+    rows = search_clients(obj.db, text, commercial_id=user.id if mine else None, limit=limit)
+    _echo_rows(CLIENT_COLUMNS, map(_client_row, rows))
+
+
+@clients.command("create")
+@click.option("--full-name", required=True)
+@click.option("--email", required=True)
+@click.option("--phone", default="")
+@click.option("--company-name", default="")
+@pass_context
+def create_client_command(obj, full_name, email, phone, company_name):
+    """Crée un client rattaché au commercial connecté."""
+    user = obj.require_role(UserRole.COMMERCIAL)
+    data = {'full_name': full_name.strip(), 'email': email.strip(),
+            'phone': phone.strip(), 'company_name': company_name.strip()}
+    errors = validate_client_data(data)
+    if errors:
+        raise click.ClickException(" ".join(errors))
+
+    client = create_client(obj.db, user.id, **data, date_created=date.today(), last_contact=date.today())
+    click.echo(f"Client {client.id} créé.")
+
+
+@cli.group()
+def contracts():
+    """Contrats."""
+
+
+@contracts.command("list")
+@pass_context
+def list_contracts(obj):
+    """Liste les contrats."""
+    obj.login()
+    _echo_rows(CONTRACT_COLUMNS, map(_contract_row, iter_pages(partial(get_contracts_page, obj.db))))
+
+
+@contracts.command("filter")
+@click.option("--unsigned", "status", flag_value="unsigned", help="Contrats non signés.")
+@click.option("--signed", "status", flag_value="signed", help="Contrats signés.")
+@click.option("--unpaid", "status", flag_value="unpaid", help="Contrats non soldés.")
+@click.option("--paid", "status", flag_value="paid", help="Contrats soldés.")
+@pass_context
+def filter_contracts(obj, status):
+    """Filtre les contrats, un commercial ne voit que les siens."""
+    user = obj.login()
+    listings = {
+        'unsigned': list_unsigned_contracts,
+        'signed': list_signed_contracts,
+        'unpaid': list_unpaid_contracts,
+        'paid': list_paid_contracts,
+    }
+    if status:
+        rows = listings[status](obj.db, commercial_id=user.id if user.role == UserRole.COMMERCIAL else None)
+    else:
+        rows = get_contracts_by_user(obj.db, user)
+    _echo_rows(CONTRACT_COLUMNS, map(_contract_row, rows))
+
+
+@contracts.command("update")
+@click.argument("contract_id", type=int)
+@click.option("--total-amount", type=to_money, metavar="MONTANT")
+@click.option("--amount-due", type=to_money, metavar="MONTANT")
+@click.option("--signed/--unsigned", "is_signed", default=None)
+@pass_context
+def update_contract_command(obj, contract_id, total_amount, amount_due, is_signed):
+    """Modifie un contrat (commercial du contrat ou gestion)."""
+    user = obj.require_role(UserRole.COMMERCIAL, UserRole.GESTION)
+    fields = {key: value for key, value in (('total_amount', total_amount), ('amount_due', amount_due),
+                                            ('is_signed', is_signed)) if value is not None}
+    if not fields:
+        raise click.UsageError("Aucune modification demandée.")
+    try:
+        contract = update_contract(obj.db, contract_id, user, **fields)
+    except NotFoundError:
+        raise click.ClickException(f"Contrat {contract_id} introuvable.") from None
+    click.echo(f"Contrat {contract.id} modifié.")
+
+
+@contracts.command("pay")
+@click.argument("contract_id", type=int)
+@click.argument("amount", type=to_money)
+@pass_context
+def pay_contract(obj, contract_id, amount):
+    """Enregistre un paiement sur un contrat (commercial du contrat ou gestion)."""
+    user = obj.require_role(UserRole.COMMERCIAL, UserRole.GESTION)
+    amount_due = record_payment(obj.db, contract_id, amount, user)
+    click.echo(f"Paiement de {amount} € enregistré, reste dû : {amount_due} €.")
+
+
+@cli.group()
+def events():
+    """Événements."""
+
+
+@events.command("list")
+@pass_context
+def list_events(obj):
+    """Liste les événements."""
+    obj.login()
+    _echo_rows(EVENT_COLUMNS, map(_event_row, iter_pages(partial(get_events_with_details_page, obj.db))))
+
+
+@events.command("filter")
+@click.option("--unassigned", is_flag=True, help="Événements sans support.")
+@click.option("--mine", is_flag=True, help="Mes événements (support uniquement).")
+@click.option("--from", "start", type=click.DateTime(), help="Début à partir de cette date.")
+@click.option("--to", "end", type=click.DateTime(), help="Début avant cette date.")
+@click.option("--location", help="Lieu contenant ce texte.")
+@pass_context
+def filter_events(obj, unassigned, mine, start, end, location):
+    """Filtre les événements."""
+    user = obj.login()
+    if mine and user.role != UserRole.SUPPORT:
+        raise click.UsageError("--mine est réservé aux membres du support.")
+    filters = {}
+    if unassigned:
+        filters['support_contact_id'] = None
+    elif mine:
+        filters['support_contact_id'] = user.id
+    if start:
+        filters['start_date_gte'] = start
+    if end:
+        filters['start_date_lt'] = end
+    if location:
+        filters['location'] = location
+    _echo_rows(EVENT_COLUMNS, map(_event_row, get_filtered_events(obj.db, filters)))
+
+
+@events.command("assign")
+@click.argument("event_id", type=int)
+@click.argument("support_email")
+@pass_context
+def assign_event(obj, event_id, support_email):
+    """Assigne un membre du support à un événement (gestion)."""
+    user = obj.require_role(UserRole.GESTION)
+    support = next((staff for staff in get_support_users(obj.db)
+                    if staff.email.lower() == support_email.lower()), None)
+    if support is None:
+        raise click.ClickException(f"Aucun membre du support avec l'email {support_email}.")
+    try:
+        event = update_event(obj.db, event_id, user, support_id=support.id)
+    except NotFoundError:
+        raise click.ClickException(f"Événement {event_id} introuvable.") from None
+    click.echo(f"Événement {event.id} assigné à {support.name}.")
+
+
+@events.command("assign-many")
+@click.option("--file", "path", type=click.Path(exists=True, dir_okay=False),
+              help="Fichier CSV ou JSONL de colonnes event_id et support_email (vide pour désassigner).")
+@click.option("--support", "support_email", help="Support assigné aux événements filtrés.")
+@click.option("--unassigned", is_flag=True, help="Événements sans support.")
+@click.option("--from", "start", type=click.DateTime(), help="Début à partir de cette date.")
+@click.option("--to", "end", type=click.DateTime(), help="Début avant cette date.")
+@click.option("--location", help="Lieu contenant ce texte.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=None,
+              help="Événements modifiés par requête (ASSIGN_BATCH_SIZE, 1000 par défaut).")
+@pass_context
+def assign_many_events(obj, path, support_email, unassigned, start, end, location, batch_size):
+    """Assigne le support de nombreux événements (gestion), depuis un fichier ou un filtre."""
+    user = obj.require_role(UserRole.GESTION)
+    supports = {support.email.lower(): support for support in get_support_users(obj.db)}
+
+    def support_id(email, where=""):
+        if not email:
+            return None
+        if email.lower() not in supports:
+            raise click.ClickException(f"{where}Aucun membre du support avec l'email {email}.")
+        return supports[email.lower()].id
+
+    def assignment(line_number, record):
+        if isinstance(record, RecordError):
+            raise click.ClickException(f"ligne {line_number} : {record}")
+        try:
+            event_id = int(record['event_id'])
+        except (KeyError, TypeError, ValueError):
+            raise click.ClickException(f"ligne {line_number} : event_id invalide.") from None
+        return event_id, support_id(record.get('support_email'), f"ligne {line_number} : ")
+
+    if path:
+        if support_email or unassigned or start or end or location:
+            raise click.UsageError("--file ne se combine pas avec --support ni avec les filtres.")
+        pairs = (assignment(line_number, record) for line_number, record in read_records(path))
+        report = assign_supports(obj.db, pairs, user, batch_size)
+        click.echo(f"{report['updated']}/{report['requested']} événement(s) assigné(s) "
+                   f"en {report['batches']} lot(s).")
+        _echo_conflicts(report['conflicts'])
+        if report['missing']:
+            raise click.ClickException(f"Événement(s) introuvable(s) : {', '.join(map(str, report['missing']))}.")
+        return
+
+    filters = {}
+    if unassigned:
+        filters['support_contact_id'] = None
+    if start:
+        filters['start_date_gte'] = start
+    if end:
+        filters['start_date_lt'] = end
+    if location:
+        filters['location'] = location
+    if not support_email or not filters:
+        raise click.UsageError("Indiquez --file, ou --support avec au moins un filtre.")
+    report = assign_support_matching(obj.db, filters, support_id(support_email), user)
+    click.echo(f"{report['updated']}/{report['matched']} événement(s) assigné(s) "
+               f"à {supports[support_email.lower()].name}.")
+    _echo_conflicts(report['conflicts'])
+
+
+def _echo_conflicts(conflicts: dict):
+    """Report the events left unassigned because they overlap another event of the support"""
+    for event_id, overlapping in conflicts.items():
+        click.echo(f"Événement {event_id} non assigné, il chevauche : {', '.join(map(str, overlapping))}.", err=True)
+    if conflicts:
+        raise click.ClickException(f"{len(conflicts)} événement(s) non assigné(s) pour conflit de planning.")
+
+
+@cli.group()
+def users():
+    """Utilisateurs (gestion)."""
+
+
+@users.command("list")
+@pass_context
+def list_users(obj):
+    """Liste les utilisateurs."""
+    obj.require_role(UserRole.GESTION)
+    rows = ((user.id, user.name, user.email, user.role) for user in iter_pages(partial(list_users_page, obj.db)))
+    _echo_rows(USER_COLUMNS, rows)
+
+
+@cli.command("logout")
+def logout():
+    """Supprime le jeton de session enregistré."""
+    forget_session()
+    click.echo("Session fermée.")
+
+
+@cli.command("run")
+@click.argument("commands", type=click.File("r", encoding="utf-8"))
+@click.option("--stop-on-error", is_flag=True, help="Arrête au premier échec.")
+@click.pass_context
+def run_commands(ctx, commands, stop_on_error):
+    """Exécute un fichier de commandes (une par ligne, # pour commenter) avec une seule connexion."""
+    failures = 0
+    for line_number, line in enumerate(commands, 1):
+        args = shlex.split(line, comments=True)
+        if not args:
+            continue
+        if args[0] == "run":
+            raise click.ClickException(f"ligne {line_number} : un fichier de commandes ne peut pas en lancer un autre.")
+        try:
+            with cli.make_context("epic", args, parent=ctx, obj=ctx.obj) as sub_ctx:
+                cli.invoke(sub_ctx)
+        except click.ClickException as e:
+            failures += 1
+            click.echo(f"ligne {line_number} : {e.format_message()}", err=True)
+        except (PermissionError, ValueError, StaleDataError) as e:
+            ctx.obj.uow.rollback()
+            failures += 1
+            click.echo(f"ligne {line_number} : {e}", err=True)
+        if failures and stop_on_error:
+            break
+    if failures:
+        raise click.ClickException(f"{failures} commande(s) en échec.")
+
+
+def main(args=None):
+    """Run the command line, reporting permission, validation and concurrency errors without a traceback"""
+    try:
+        cli.main(args=args, prog_name="epic", standalone_mode=False)
+    except click.exceptions.Abort:
+        click.echo("Annulé.", err=True)
+        raise SystemExit(1)
+    except click.ClickException as e:
+        e.show()
+        raise SystemExit(e.exit_code)
+    except (PermissionError, ValueError, StaleDataError) as e:
+        click.echo(f"Erreur : {e}", err=True)
+        raise SystemExit(1)
+    except Exception as e:
+        telemetry.capture_exception(e)
+        raise
@@ -1,7 +1,27 @@
-from app.services.auth_service import login_user
+import importlib
+import threading
+from typing import TYPE_CHECKING
+
+from app.utils.session_token import clear_token, has_stored_token
 from app.views.auth_view import AuthView
 from app.views.utils_view import show_error, show_success
-from app.models.user import User
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+# The auth service pulls in SQLAlchemy, the models and the database driver: it is imported on
+# first use, and preloaded in the background while the user types their credentials
+AUTH_SERVICE = "app.services.auth_service"
+
+
+def preload_auth_service():
+    """Start importing the auth service in the background"""
+    threading.Thread(target=importlib.import_module, args=(AUTH_SERVICE,), daemon=True).start()
+
+
+def auth_service():
+    """Get the auth service module, importing it if the preload has not finished"""
+    return importlib.import_module(AUTH_SERVICE)
 
 
 class AuthController:
@@ -9,8 +29,16 @@ class AuthController:
         self.view = AuthView()
         self.current_user = None
 
-    def login(self) -> User:
+    def login(self) -> "User":
         """Handle user login process"""
+        # A valid session token from a previous login skips the password and its bcrypt check
+        user = auth_service().restore_session() if has_stored_token() else None
+        if user:
+            self.current_user = user
+            show_success(f"Session restaurée. Bienvenue {user.name}")
+            return user
+
+        preload_auth_service()
         while True:
             self.view.show_welcome()
 
@@ -24,10 +52,11 @@ class AuthController:
                     show_error("Email et mot de passe requis.")
                     continue
 
-                user = login_user(email, password)
+                user = auth_service().login_user(email, password)
 
                 if user:
                     self.current_user = user
+                    auth_service().remember_session(user)
                     show_success(f"Connexion réussie ! Bienvenue {user.name}")
                     return user
                 else:
@@ -44,9 +73,10 @@ class AuthController:
     def logout(self):
         """Handle user logout"""
         if self.current_user:
+            clear_token()
             show_success(f"Au revoir {self.current_user.name} !")
             self.current_user = None
 
-    def get_current_user(self) -> User:
+    def get_current_user(self) -> "User":
         """Get the current user"""
         return self.current_user
@@ -1,11 +1,16 @@
 from datetime import date
-import sentry_sdk
+from functools import partial
 
 from app.models.user import UserRole
 from app.views.client_menu_view import ClientMenuView
-from app.views.utils_view import show_error, show_success, show_info
-from app.services.client_service import create_client, update_client, get_clients_by_user, get_all_clients
-from app.db.connection import SessionLocal
+from app.views.utils_view import confirm_stale_retry, show_error, show_success, show_info
+from app.services.client_service import create_client, update_client, get_clients_page
+from app.services.pagination import iter_pages
+from app.services.search_service import search_clients
+from app.services.versioning import retry_on_stale
+from app.db.instrumentation import track_action
+from app.db.unit_of_work import UnitOfWork
+from app.utils import telemetry
 
 
 class ClientMenuController:
@@ -14,44 +19,45 @@ class ClientMenuController:
     def __init__(self, current_user):
         self.current_user = current_user
         self.view = ClientMenuView()
+        self.uow = UnitOfWork()
 
     def handle_menu(self):
         """Handle the clients menu loop"""
-        while True:
-            choice = self.view.show_clients_menu(self.current_user)
-
-            if choice == "1":
-                self.list_clients()
-            elif choice == "2" and self.current_user.role == UserRole.COMMERCIAL:
-                self.create_client()
-            elif choice == "3" and self.current_user.role == UserRole.COMMERCIAL:
-                self.update_client()
-            elif choice == "0":
-                break
-            else:
-                show_error("Choix invalide ou non autorisé.")
+        try:
+            while True:
+                choice = self.view.show_clients_menu(self.current_user)
+
+                if choice == "1":
+                    self.list_clients()
+                elif choice == "2" and self.current_user.role == UserRole.COMMERCIAL:
+                    self.create_client()
+                elif choice == "3" and self.current_user.role == UserRole.COMMERCIAL:
+                    self.update_client()
+                elif choice == "0":
+                    break
+                else:
+                    show_error("Choix invalide ou non autorisé.")
+                # Nothing stays in transaction while the menu waits for the next choice
+                self.uow.end_action()
+        finally:
+            self.uow.close()
 
+    @track_action
     def list_clients(self):
-        """List all clients"""
+        """List all clients, fetched page by page"""
         try:
-            db = SessionLocal()
-            clients = get_all_clients(db)
-
-            if clients:
-                self.view.display_clients_list(clients)
-            else:
-                show_info("Aucun client trouvé.")
+            db = self.uow.session
+            clients = iter_pages(partial(get_clients_page, db))
+            self.view.display_clients_list(clients)
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la récupération des clients: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def create_client(self):
         """Create a new client (COMMERCIAL only)"""
-        db = None
-
         if self.current_user.role != UserRole.COMMERCIAL:
             show_error("Accès non autorisé. Seuls les commerciaux peuvent créer des clients.")
             return
@@ -72,20 +78,18 @@ class ClientMenuController:
             client_data['last_contact'] = date.today()
 
             # Create client in database
-            db = SessionLocal()
+            db = self.uow.session
             client = create_client(db, self.current_user.id, **client_data)
 
             show_success(f"Client '{client.full_name}' créé avec succès (ID: {client.id})")
-            sentry_sdk.capture_message(
-                f"Client '{client.full_name}' created successfully (ID: {client.id})", level="info")
+            telemetry.record_event("client.created", f"Client '{client.full_name}' created", client_id=client.id)
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la création du client: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            if db is not None:
-                db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def update_client(self):
         """Update an existing client COMMERCIAL"""
         if self.current_user.role != UserRole.COMMERCIAL:
@@ -94,16 +98,9 @@ class ClientMenuController:
             return
 
         try:
-            # Get list of clients user can modify
-            db = SessionLocal()
-            clients = get_clients_by_user(db, self.current_user)
-
-            if not clients:
-                show_info("Aucun client disponible pour modification.")
-                return
-
-            # Let user select a client
-            selected_client = self.view.get_client_selection(clients)
+            # Let user search the clients they can modify and select one
+            db = self.uow.session
+            selected_client = self.view.search_client(partial(search_clients, db, commercial_id=self.current_user.id))
 
             if not selected_client:
                 show_info("Modification annulée.")
@@ -130,18 +127,24 @@ class ClientMenuController:
             # Add last contact update
             updated_data['last_contact'] = date.today()
 
-            # Update client in database
-            updated_client = update_client(db, selected_client.id, self.current_user, **updated_data)
+            # Update client in database, offering to reapply the changes if someone saved it meanwhile
+            updated_client = retry_on_stale(
+                lambda fields: update_client(db, selected_client.id, self.current_user, **fields),
+                updated_data,
+                confirm_stale_retry
+            )
+            if not updated_client:
+                show_info("Modification annulée.")
+                return
 
             show_success(f"Client '{updated_client.full_name}' modifié avec succès.")
 
-            sentry_sdk.capture_message(f"Client '{updated_client.full_name}'"
-                                       f" modifié par {self.current_user.name}", level="info")
+            telemetry.record_event("client.updated", f"Client '{updated_client.full_name}' updated",
+                                   client_id=updated_client.id, user_id=self.current_user.id)
 
         except PermissionError as e:
             show_error(str(e))
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la modification du client: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
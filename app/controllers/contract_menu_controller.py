@@ -1,10 +1,16 @@
-import sentry_sdk
 from datetime import date
+from functools import partial
 
 from app.views.contract_menu_view import ContractMenuView
 from app.services.contract_service import *
-from app.db.connection import SessionLocal
-from app.views.utils_view import show_error, show_success
+from app.services.errors import NotFoundError
+from app.services.pagination import iter_pages
+from app.services.search_service import search_clients, search_contracts
+from app.services.versioning import retry_on_stale
+from app.db.instrumentation import track_action
+from app.db.unit_of_work import UnitOfWork
+from app.utils import telemetry
+from app.views.utils_view import confirm_stale_retry, show_error, show_info, show_success
 
 
 class ContractMenuController:
@@ -13,53 +19,61 @@ class ContractMenuController:
     def __init__(self, current_user):
         self.current_user = current_user
         self.view = ContractMenuView()
+        self.uow = UnitOfWork()
 
     def handle_menu(self):
         """Handle the contracts menu loop"""
-        while True:
-            choice = self.view.show_contracts_menu(self.current_user)
-
-            if choice == "1":
-                self.list_contracts()
-            elif choice == "2" and self.current_user.role == UserRole.GESTION:
-                self.create_contract()
-            elif choice == "3" and self.current_user.role in [UserRole.COMMERCIAL, UserRole.GESTION]:
-                self.update_contract()
-            elif choice == "4":
-                self.filter_contracts()
-            elif choice == "0":
-                break
-            else:
-                show_error("Choix invalide ou non autorisé.")
+        try:
+            while True:
+                choice = self.view.show_contracts_menu(self.current_user)
+
+                if choice == "1":
+                    self.list_contracts()
+                elif choice == "2" and self.current_user.role == UserRole.GESTION:
+                    self.create_contract()
+                elif choice == "3" and self.current_user.role in [UserRole.COMMERCIAL, UserRole.GESTION]:
+                    self.update_contract()
+                elif choice == "4":
+                    self.filter_contracts()
+                elif choice == "5" and self.current_user.role in [UserRole.COMMERCIAL, UserRole.GESTION]:
+                    self.record_payment()
+                elif choice == "0":
+                    break
+                else:
+                    show_error("Choix invalide ou non autorisé.")
+                # Nothing stays in transaction while the menu waits for the next choice
+                self.uow.end_action()
+        finally:
+            self.uow.close()
 
+    @track_action
     def list_contracts(self):
-        """List all contracts"""
-        db = SessionLocal()
+        """List all contracts, fetched page by page"""
+        db = self.uow.session
         try:
-            contracts = get_all_contracts(db)
+            contracts = iter_pages(partial(get_contracts_page, db))
             self.view.display_contracts_list(contracts)
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la récupération des contrats: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def create_contract(self):
         """Create a new contract (GESTION only)"""
         if self.current_user.role != UserRole.GESTION:
             show_error("Accès non autorisé. Seule la gestion peut créer des contrats.")
             return
 
-        db = SessionLocal()
+        db = self.uow.session
         try:
-            # Get all clients
-            clients = get_all_clients(db)
-            if not clients:
+            # Check there is a client without loading them all, the user then searches for one
+            if not search_clients(db, limit=1):
                 show_error("Aucun client disponible. Créez d'abord des clients.")
                 return
 
             # Get contract data from user
-            contract_data = self.view.get_contract_data(clients)
+            contract_data = self.view.get_contract_data(partial(search_clients, db))
             if not contract_data:
                 return
 
@@ -93,31 +107,25 @@ class ContractMenuController:
             db.commit()
 
             show_success(f"Contrat créé avec succès (ID: {contract.id})")
-            sentry_sdk.capture_message(f"Contract created successfully (ID: {contract.id})", level="info")
+            telemetry.record_event("contract.created", f"Contract {contract.id} created", contract_id=contract.id)
 
         except Exception as e:
-            db.rollback()
+            self.uow.rollback()
             show_error(f"Erreur lors de la création du contrat: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def update_contract(self):
         """Update an existing contract (COMMERCIAL and GESTION)"""
         if self.current_user.role not in [UserRole.COMMERCIAL, UserRole.GESTION]:
             show_error("Accès non autorisé. Seuls les commerciaux et la gestion peuvent modifier des contrats.")
             return
 
-        db = SessionLocal()
+        db = self.uow.session
         try:
-            # Get contracts that user can modify
-            contracts = get_contracts_by_user(db, self.current_user)
-            if not contracts:
-                show_error("Aucun contrat disponible pour modification.")
-                return
-
-            # Let user select contract
-            contract = self.view.get_contract_selection(contracts)
+            # Let user search the contracts they can modify and select one
+            commercial_id = self.current_user.id if self.current_user.role == UserRole.COMMERCIAL else None
+            contract = self.view.search_contract(partial(search_contracts, db, commercial_id=commercial_id))
             if not contract:
                 return
 
@@ -129,31 +137,65 @@ class ContractMenuController:
 
             # Get updated data
             update_data = self.view.get_contract_update_data(contract)
+            if update_data is None:
+                return
             if not update_data:
+                show_info("Aucune modification.")
                 return
 
-            # Update the contract
-            updated_contract = update_contract(
-                db=db,
-                contract_id=contract.id,
-                updater=self.current_user,
-                **update_data
+            # Update the contract, offering to reapply the changes if someone saved it meanwhile
+            updated_contract = retry_on_stale(
+                lambda fields: update_contract(db=db, contract_id=contract.id, updater=self.current_user, **fields),
+                update_data,
+                confirm_stale_retry
             )
+            if not updated_contract:
+                show_info("Modification annulée.")
+                return
 
             show_success(f"Contrat {updated_contract.id} modifié avec succès.")
-            sentry_sdk.capture_message(f"Contract {updated_contract.id} modified successfully", level="info")
+            telemetry.record_event("contract.updated", f"Contract {updated_contract.id} updated",
+                                   contract_id=updated_contract.id)
 
         except PermissionError as e:
             show_error(str(e))
         except Exception as e:
-            db.rollback()
+            self.uow.rollback()
             show_error(f"Erreur lors de la modification du contrat: {str(e)}")
-        finally:
-            db.close()
 
+    @track_action
+    def record_payment(self):
+        """Record a payment on a contract, subtracted from the amount due by the database (COMMERCIAL and GESTION)"""
+        if self.current_user.role not in [UserRole.COMMERCIAL, UserRole.GESTION]:
+            show_error("Accès non autorisé. Seuls les commerciaux et la gestion peuvent enregistrer des paiements.")
+            return
+
+        db = self.uow.session
+        try:
+            commercial_id = self.current_user.id if self.current_user.role == UserRole.COMMERCIAL else None
+            contract = self.view.search_contract(partial(search_contracts, db, commercial_id=commercial_id))
+            if not contract:
+                return
+
+            amount = self.view.get_payment_amount(contract)
+            if amount is None:
+                return
+
+            amount_due = record_payment(db, contract.id, amount, self.current_user)
+            show_success(f"Paiement de {amount} € enregistré, reste dû : {amount_due} €.")
+            telemetry.record_event("contract.paid", f"Payment on contract {contract.id}", contract_id=contract.id)
+
+        except (PermissionError, ValueError, NotFoundError) as e:
+            show_error(str(e))
+        except Exception as e:
+            self.uow.rollback()
+            show_error(f"Erreur lors de l'enregistrement du paiement: {str(e)}")
+            telemetry.capture_exception(e)
+
+    @track_action
     def filter_contracts(self):
         """Filter contracts (available to all users)"""
-        db = SessionLocal()
+        db = self.uow.session
         try:
             # Get filter criteria
             filter_choice = self.view.get_contract_filter()
@@ -177,7 +219,6 @@ class ContractMenuController:
             self.view.display_contracts_list(contracts)
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors du filtrage des contrats: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
@@ -1,9 +1,15 @@
-import sentry_sdk
+from functools import partial
 
 from app.views.event_menu_view import EvenMenuView
-from app.views.utils_view import show_error, show_success, show_info
+from app.views.utils_view import confirm_stale_retry, show_error, show_success, show_info
+from app.services.errors import ScheduleConflictError
 from app.services.event_service import *
-from app.db.connection import SessionLocal
+from app.services.pagination import iter_pages
+from app.services.search_service import search_events
+from app.services.versioning import retry_on_stale
+from app.db.instrumentation import track_action
+from app.db.unit_of_work import UnitOfWork
+from app.utils import telemetry
 
 
 class EventMenuController:
@@ -12,41 +18,48 @@ class EventMenuController:
     def __init__(self, current_user):
         self.current_user = current_user
         self.view = EvenMenuView()
+        self.uow = UnitOfWork()
 
     def handle_menu(self):
         """Handle the events menu loop"""
-        while True:
-            choice = self.view.show_events_menu(self.current_user)
-
-            if choice == "1":
-                self.list_events()
-            elif choice == "2" and self.current_user.role == UserRole.COMMERCIAL:
-                self.create_event()
-            elif choice == "3" and self.current_user.role in [UserRole.SUPPORT, UserRole.GESTION]:
-                self.update_event()
-            elif choice == "4":
-                self.filter_events()
-            elif choice == "0":
-                break
-            else:
-                show_error("Choix invalide ou non autorisé.")
+        try:
+            while True:
+                choice = self.view.show_events_menu(self.current_user)
+
+                if choice == "1":
+                    self.list_events()
+                elif choice == "2" and self.current_user.role == UserRole.COMMERCIAL:
+                    self.create_event()
+                elif choice == "3" and self.current_user.role in [UserRole.SUPPORT, UserRole.GESTION]:
+                    self.update_event()
+                elif choice == "4":
+                    self.filter_events()
+                elif choice == "0":
+                    break
+                else:
+                    show_error("Choix invalide ou non autorisé.")
+                # Nothing stays in transaction while the menu waits for the next choice
+                self.uow.end_action()
+        finally:
+            self.uow.close()
 
+    @track_action
     def list_events(self):
-        """List all events"""
-        db = SessionLocal()
+        """List all events, fetched page by page"""
+        db = self.uow.session
         try:
-            events = get_events_with_details(db)
+            events = iter_pages(partial(get_events_with_details_page, db))
             self.view.display_events_list(events)
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la récupération des événements: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def filter_events(self):
         """Filter events (available to all users)"""
 
-        db = SessionLocal()
+        db = self.uow.session
         try:
             filter_criteria = self.view.get_event_filter(self.current_user)
             filtered_events = get_filtered_events(db, filter_criteria)
@@ -57,18 +70,18 @@ class EventMenuController:
             else:
                 show_info("Aucun événement ne correspond aux critères de filtrage.")
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors du filtrage des événements: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def create_event(self):
         """Create a new event (COMMERCIAL only)"""
         if self.current_user.role != UserRole.COMMERCIAL:
             show_error("Accès non autorisé. Seuls les commerciaux peuvent créer des événements.")
             return
 
-        db = SessionLocal()
+        db = self.uow.session
         try:
             # Get signed contracts for current commercial
             signed_contracts = get_signed_contracts_for_commercial(db, self.current_user.id)
@@ -103,36 +116,25 @@ class EventMenuController:
             )
 
             show_success(f"Événement créé avec succès (ID: {new_event.id})")
-            sentry_sdk.capture_message(f"Event created successfully (ID: {new_event.id})", level="info")
+            telemetry.record_event("event.created", f"Event {new_event.id} created", event_id=new_event.id)
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la création de l'événement: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def update_event(self):
         """Update an existing event (SUPPORT and GESTION)"""
         if self.current_user.role not in [UserRole.SUPPORT, UserRole.GESTION]:
             show_error("Accès non autorisé. Seuls le support et la gestion peuvent modifier des événements.")
             return
 
-        db = SessionLocal()
+        db = self.uow.session
         try:
-            # Get events based on user role using service methods
-            if self.current_user.role == UserRole.SUPPORT:
-                # Support users can only update their assigned events or unassigned ones
-                events = get_events_for_support_user(db, self.current_user.id)
-            else:
-                # Gestion can update all events
-                events = get_all_events_for_management(db)
-
-            if not events:
-                show_error("Aucun événement disponible pour modification.")
-                return
-
-            # Select event to update
-            selected_event = self.view.get_event_selection(events)
+            # Support users can only update their assigned events or unassigned ones, gestion all events
+            support_id = self.current_user.id if self.current_user.role == UserRole.SUPPORT else None
+            selected_event = self.view.search_event(partial(search_events, db, support_id=support_id))
             if not selected_event:
                 show_info("Modification annulée.")
                 return
@@ -162,20 +164,22 @@ class EventMenuController:
             if 'support_contact_id' in update_data:
                 updated_fields['support_id'] = update_data['support_contact_id']
 
-            updated_event = update_event(
-                db=db,
-                event_id=selected_event.id,
-                updater=self.current_user,
-                **updated_fields
+            # Offer to reapply the changes if someone saved the event meanwhile
+            updated_event = retry_on_stale(
+                lambda fields: update_event(db=db, event_id=selected_event.id, updater=self.current_user, **fields),
+                updated_fields,
+                confirm_stale_retry
             )
+            if not updated_event:
+                show_info("Modification annulée.")
+                return
 
             show_success(f"Événement ID {updated_event.id} modifié avec succès.")
-            sentry_sdk.capture_message(f"Event ID {updated_event.id} updated successfully.", level="info")
+            telemetry.record_event("event.updated", f"Event {updated_event.id} updated", event_id=updated_event.id)
 
-        except PermissionError as e:
+        except (PermissionError, ScheduleConflictError) as e:
             show_error(str(e))
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la modification de l'événement: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
@@ -1,13 +1,12 @@
-import sentry_sdk
-
 from app.controllers.auth_controller import AuthController
-from app.controllers.client_menu_controller import ClientMenuController
-from app.controllers.contract_menu_controller import ContractMenuController
-from app.controllers.event_menu_controller import EventMenuController
-from app.controllers.user_menu_controller import UserMenuController
 from app.views.main_view import MainView
-from app.models.user import UserRole
+from app.models.roles import UserRole
 from app.views.utils_view import show_error, show_info
+from app.utils import telemetry
+
+
+# Menu controllers, with the services and the ORM behind them, are imported when their menu
+# is first opened so the login prompt shows without waiting for them
 
 
 class MainController:
@@ -50,26 +49,30 @@ class MainController:
                 break
             except Exception as e:
                 show_error(f"Une erreur s'est produite: {str(e)}")
-                sentry_sdk.capture_exception(e)
+                telemetry.capture_exception(e)
 
     def client_menu(self):
         """Handle clients menu navigation"""
+        from app.controllers.client_menu_controller import ClientMenuController
         client_controller = ClientMenuController(self.current_user)
         client_controller.handle_menu()
 
     def contract_menu(self):
         """Handle contracts menu navigation"""
+        from app.controllers.contract_menu_controller import ContractMenuController
         contract_controller = ContractMenuController(self.current_user)
         contract_controller.handle_menu()
 
     def event_menu(self):
         """Handle events menu navigation"""
+        from app.controllers.event_menu_controller import EventMenuController
         event_controller = EventMenuController(self.current_user)
         event_controller.handle_menu()
 
     def user_menu(self):
         """Handle users menu navigation (GESTION only)"""
         if self.current_user.role == UserRole.GESTION:
+            from app.controllers.user_menu_controller import UserMenuController
             user_controller = UserMenuController(self.current_user)
             user_controller.handle_menu()
         else:
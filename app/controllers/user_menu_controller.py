@@ -1,8 +1,11 @@
-import sentry_sdk
+from functools import partial
 
 from app.views.user_menu_view import UserMenuView
 from app.services.user_service import *
-from app.db.connection import SessionLocal
+from app.services.pagination import iter_pages
+from app.db.instrumentation import track_action
+from app.db.unit_of_work import UnitOfWork
+from app.utils import telemetry
 from app.utils.password import hash_password
 from app.views.utils_view import show_error, show_success, show_info, show_warning
 
@@ -13,6 +16,7 @@ class UserMenuController:
     def __init__(self, current_user):
         self.current_user = current_user
         self.view = UserMenuView()
+        self.uow = UnitOfWork()
 
     def handle_menu(self):
         """Handle the users menu loop"""
@@ -21,37 +25,43 @@ class UserMenuController:
             show_error("Accès non autorisé. Seule la gestion peut gérer les utilisateurs.")
             return
 
-        while True:
-            choice = self.view.show_users_menu()
-
-            if choice == "1":
-                self.list_users()
-            elif choice == "2":
-                self.create_user()
-            elif choice == "3":
-                self.update_user()
-            elif choice == "4":
-                self.delete_user()
-            elif choice == "0":
-                break
-            else:
-                show_error("Choix invalide.")
+        try:
+            while True:
+                choice = self.view.show_users_menu()
+
+                if choice == "1":
+                    self.list_users()
+                elif choice == "2":
+                    self.create_user()
+                elif choice == "3":
+                    self.update_user()
+                elif choice == "4":
+                    self.delete_user()
+                elif choice == "0":
+                    break
+                else:
+                    show_error("Choix invalide.")
+                # Nothing stays in transaction while the menu waits for the next choice
+                self.uow.end_action()
+        finally:
+            self.uow.close()
 
+    @track_action
     def list_users(self):
-        """List all users (GESTION only)"""
-        db = SessionLocal()
+        """List all users, fetched page by page (GESTION only)"""
+        db = self.uow.session
         try:
-            users = list_all_users(db)
+            users = iter_pages(partial(list_users_page, db))
             self.view.display_users_list(users)
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la récupération des utilisateurs: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def create_user(self):
         """Create a new user (GESTION only)"""
-        db = SessionLocal()
+        db = self.uow.session
         try:
             # Get user data from view
             user_data = self.view.get_user_data()
@@ -82,17 +92,17 @@ class UserMenuController:
             )
 
             show_success(f"Utilisateur '{new_user.name}' créé avec succès.")
-            sentry_sdk.capture_message(f"User '{new_user.name}' created successfully.", level="info")
+            telemetry.record_event("user.created", f"User '{new_user.name}' created", user_id=new_user.id)
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la création de l'utilisateur: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def update_user(self):
         """Update an existing user (GESTION only)"""
-        db = SessionLocal()
+        db = self.uow.session
         try:
             # Get list of users using service
             users = list_all_users(db)
@@ -147,7 +157,7 @@ class UserMenuController:
             updated_user = update_user(db, selected_user.id, **fields_to_update)
 
             show_success(f"Utilisateur '{updated_user.name}' modifié avec succès.")
-            sentry_sdk.capture_message(f"User '{updated_user.name}' updated successfully", level="info")
+            telemetry.record_event("user.updated", f"User '{updated_user.name}' updated", user_id=updated_user.id)
 
             # Warning if current user changed their own role
             if selected_user.id == self.current_user.id and 'role' in fields_to_update:
@@ -155,14 +165,14 @@ class UserMenuController:
                              " Veuillez vous reconnecter pour que les changements prennent effet.")
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la modification de l'utilisateur: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
 
+    @track_action
     def delete_user(self):
         """Delete a user (GESTION only)"""
-        db = SessionLocal()
+        db = self.uow.session
         try:
             # Get list of users using service
             users = list_all_users(db)
@@ -208,10 +218,9 @@ class UserMenuController:
             delete_user(db, selected_user.id)
 
             show_success(f"Utilisateur '{user_name}' supprimé avec succès.")
-            sentry_sdk.capture_message(f"User '{user_name}' deleted successfully", level="info")
+            telemetry.record_event("user.deleted", f"User '{user_name}' deleted")
 
         except Exception as e:
+            self.uow.rollback()
             show_error(f"Erreur lors de la suppression de l'utilisateur: {str(e)}")
-            sentry_sdk.capture_exception(e)
-        finally:
-            db.close()
+            telemetry.capture_exception(e)
@@ -0,0 +1,61 @@
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.db.connection import DATABASE_URL, get_pool_options, instrumented, set_sqlite_pragmas
+
+ASYNC_DRIVERS = {
+    'postgresql': "postgresql+asyncpg",
+    'sqlite': "sqlite+aiosqlite",
+}
+
+_engine = None
+_sessionmaker = None
+
+
+def to_async_url(url) -> URL:
+    """Swap the driver of a database URL for its asyncio counterpart"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def build_async_engine(url=DATABASE_URL) -> AsyncEngine:
+    """Create an async engine with the same pool settings as the sync one"""
+    url = to_async_url(url)
+    options = get_pool_options()
+    # The monitored pool is a blocking QueuePool, async engines use their own adapted pool
+    options.pop('poolclass')
+    if url.get_backend_name() == "sqlite":
+        return instrumented(set_sqlite_pragmas(create_async_engine(url)))
+    return instrumented(create_async_engine(url, **options))
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get the shared async engine, created on first use so asyncpg is only needed by async callers"""
+    global _engine
+    if _engine is None:
+        _engine = build_async_engine()
+    return _engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get the factory of AsyncSession bound to the shared async engine
+
+    Objects are not expired on commit: with asyncio an expired attribute cannot
+    be reloaded implicitly on access.
+    """
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _sessionmaker
+
+
+async def dispose_async_engine():
+    """Close the connections of the shared async engine"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
@@ -1,8 +1,16 @@
 import os
-from sqlalchemy import create_engine
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
 
+from app.db.instrumentation import configure_query_log, instrument
+from app.db.pool import MonitoredQueuePool
+from app.utils.config import env_bool, env_float, env_int, env_str
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
@@ -11,7 +19,141 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Applied to every SQLite connection: WAL lets readers work during a write, NORMAL
+# synchronous is safe with WAL, and SQLite only enforces foreign keys when asked to
+SQLITE_PRAGMAS = {
+    'journal_mode': "WAL",
+    'synchronous': "NORMAL",
+    'foreign_keys': "ON",
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'temp_store': "MEMORY",
+}
+
+
+def get_database_url() -> str:
+    """Get DATABASE_URL, or the PostgreSQL URL built from the DB_* settings when it is not set
+
+    DATABASE_URL takes any SQLAlchemy URL, for instance sqlite:///epic_events.db
+    for a local file or sqlite:// for a database in memory.
+    """
+    return env_str("DATABASE_URL") or \
+        f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+DATABASE_URL = get_database_url()
+
+
+def is_memory_database(url) -> bool:
+    """Check whether a SQLite URL designates a database living in memory"""
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def set_sqlite_pragmas(engine, pragmas: dict = None):
+    """Run the PRAGMA statements on each new connection of a SQLite engine (sync or async)"""
+    pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+    if is_memory_database(engine.url):
+        # A database in memory has no file to keep a write-ahead log in
+        pragmas.pop('journal_mode', None)
+
+    @event.listens_for(getattr(engine, "sync_engine", engine), "connect")
+    def run_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+def begin_sqlite_transactions(engine):
+    """Let SQLAlchemy emit BEGIN instead of the pysqlite driver
+
+    pysqlite only begins a transaction before a write, so a SAVEPOINT opened
+    first starts one by itself and releasing it commits everything: sessions
+    joining an outer transaction through savepoints could not be rolled back.
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def get_pool_options() -> dict:
+    """Get the connection pool settings from the environment"""
+    return {
+        'poolclass': MonitoredQueuePool,
+        'pool_size': env_int("DB_POOL_SIZE", 5),
+        'max_overflow': env_int("DB_MAX_OVERFLOW", 10),
+        'pool_timeout': env_float("DB_POOL_TIMEOUT", 30.0),
+        # Recycle connections before the server or a firewall drops them (-1 disables)
+        'pool_recycle': env_int("DB_POOL_RECYCLE", 1800),
+        'pool_pre_ping': env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+def build_engine(url: str = DATABASE_URL):
+    """Create an engine using the configured connection pool, instrumented unless DB_INSTRUMENTATION is off
+
+    A SQLite database in memory lives and dies with its connection: it gets a
+    single connection shared by every thread instead of the pool.
+    """
+    if is_memory_database(url):
+        engine = create_engine(url, poolclass=StaticPool, connect_args={'check_same_thread': False})
+    else:
+        engine = create_engine(url, **get_pool_options())
+    if engine.dialect.name == "sqlite":
+        begin_sqlite_transactions(set_sqlite_pragmas(engine))
+    return instrumented(engine)
+
+
+def instrumented(engine):
+    """Time the statements of the engine and log the slow ones, as configured by DB_INSTRUMENTATION"""
+    if env_bool("DB_INSTRUMENTATION", True):
+        configure_query_log()
+        instrument(engine)
+    return engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Get the application engine, built on first use so that importing this module stays cheap"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = build_engine()
+        return _engine
+
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker bound to the application engine when the first session is opened"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionmaker()
+
+
+def __getattr__(name):
+    # Keep `from app.db.connection import engine` working without building it at import time
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+def get_pool_stats() -> dict:
+    """Get live statistics of the engine connection pool, empty without a pool (SQLite in memory)"""
+    pool = get_engine().pool
+    return pool.stats() if hasattr(pool, "stats") else {}
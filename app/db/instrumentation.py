@@ -0,0 +1,191 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy import event
+
+from app.utils.config import env_float, env_int, env_str
+from app.utils.telemetry import start_transaction
+
+logger = logging.getLogger("app.db.queries")
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+DEFAULT_SLOW_QUERY_LOG = "slow_queries.log"
+# Execution option of the statements run once per page of a listing, set by keyset_page: their
+# repetitions, and those of the eager loads of each page, are expected rather than N+1 queries
+PAGED = "paged"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|(?<!:):\w+|\$\d+|%s")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_SPACES = re.compile(r"\s+")
+
+_current_action = ContextVar("query_action", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so that executions differing only by their values are grouped
+
+    Literals and bind parameters of every paramstyle become ?, IN lists and
+    multi-row VALUES of any length become (...), whitespace is collapsed.
+    """
+    statement = _LITERALS.sub("?", statement)
+    statement = _VALUE_LISTS.sub("(...)", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+class QueryStats:
+    """Thread-safe totals of the executed statements, per fingerprint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def record(self, statement: str, duration: float, rows: int = None):
+        """Add one execution of a statement"""
+        with self._lock:
+            entry = self._statements.setdefault(statement, {'count': 0, 'total_time': 0.0,
+                                                            'max_time': 0.0, 'rows': 0})
+            entry['count'] += 1
+            entry['total_time'] += duration
+            entry['max_time'] = max(entry['max_time'], duration)
+            entry['rows'] += rows or 0
+
+    def reset_stats(self):
+        """Forget every recorded execution"""
+        with self._lock:
+            self._statements = {}
+
+    def stats(self, top: int = 10) -> dict:
+        """Get the totals and the statements that took the most time overall"""
+        with self._lock:
+            statements = [{'statement': statement, **entry} for statement, entry in self._statements.items()]
+        count = sum(entry['count'] for entry in statements)
+        total_time = sum(entry['total_time'] for entry in statements)
+        for entry in statements:
+            entry['avg_time'] = entry['total_time'] / entry['count']
+        return {
+            'statements': count,
+            'distinct': len(statements),
+            'total_time': total_time,
+            'avg_time': total_time / count if count else 0.0,
+            'slowest': sorted(statements, key=lambda entry: entry['total_time'], reverse=True)[:top],
+        }
+
+
+query_stats = QueryStats()
+
+
+class QueryAction:
+    """The statements run by one user action (a menu choice, a command), reported when it ends
+
+    A SELECT repeated n_plus_one_threshold times or more with only its values
+    changing is the mark of a relationship loaded row by row (N+1 queries), it
+    is logged as a warning. Executions marked PAGED do not count towards it.
+    Entering the action also starts a Sentry
+    transaction when Sentry is initialized, so the database spans of the
+    sampled actions are grouped under them.
+    """
+
+    def __init__(self, name: str, n_plus_one_threshold: int = None):
+        self.name = name
+        self.n_plus_one_threshold = (env_int("N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)
+                                     if n_plus_one_threshold is None else n_plus_one_threshold)
+        self.statements = Counter()
+        self.paged = Counter()
+        self.total_time = 0.0
+        self.rows = 0
+        self._token = None
+        self._transaction = None
+
+    def record(self, statement: str, duration: float, rows: int = None, paged: bool = False):
+        self.statements[statement] += 1
+        if paged:
+            self.paged[statement] += 1
+        self.total_time += duration
+        self.rows += rows or 0
+
+    @property
+    def count(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated(self) -> dict:
+        """Get the SELECT statements executed at least n_plus_one_threshold times, page queries aside"""
+        repeats = self.statements - self.paged
+        return {statement: count for statement, count in repeats.items()
+                if count >= self.n_plus_one_threshold and statement.upper().startswith("SELECT")}
+
+    def __enter__(self):
+        self._token = _current_action.set(self)
+        self._transaction = start_transaction(self.name)
+        self._transaction.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_action.reset(self._token)
+        self._transaction.__exit__(exc_type, exc_value, traceback)
+        for statement, count in self.repeated().items():
+            logger.warning("N+1 in %s: %d executions of %s", self.name, count, statement)
+        logger.debug("%s: %d statements, %d rows, %.1f ms", self.name, self.count, self.rows,
+                     self.total_time * 1000)
+
+
+def query_action(name: str, n_plus_one_threshold: int = None) -> QueryAction:
+    """Attribute the statements run inside a with block to the named action"""
+    return QueryAction(name, n_plus_one_threshold)
+
+
+def track_action(method):
+    """Run a controller method as a query action named after it"""
+    @wraps(method)
+    def tracked(*args, **kwargs):
+        with query_action(method.__qualname__):
+            return method(*args, **kwargs)
+    return tracked
+
+
+def current_action() -> QueryAction:
+    """Get the action the running code belongs to, None outside of any"""
+    return _current_action.get()
+
+
+def instrument(engine, slow_query_ms: float = None, stats: QueryStats = query_stats):
+    """Time every statement run by the engine, feeding the totals, the current action and the slow query log
+
+    Row counts come from the DB-API cursor: the affected rows of writes and, on
+    PostgreSQL, the rows a SELECT returned. SQLite does not report the latter.
+    """
+    threshold = env_float("SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS) if slow_query_ms is None else slow_query_ms
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info['query_start_time'] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_start_time']
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        normalized = fingerprint(statement)
+        stats.record(normalized, duration, rows)
+        action = _current_action.get()
+        if action is not None:
+            action.record(normalized, duration, rows, paged=bool(context and context.execution_options.get(PAGED)))
+        if duration * 1000 >= threshold:
+            logger.warning("slow query: %.1f ms, %s rows, action %s: %s", duration * 1000,
+                           "?" if rows is None else rows, action.name if action else "-", normalized)
+
+    return engine
+
+
+def configure_query_log(path: str = None):
+    """Write the slow query and N+1 warnings to SLOW_QUERY_LOG (slow_queries.log by default), once"""
+    path = path or env_str("SLOW_QUERY_LOG", DEFAULT_SLOW_QUERY_LOG)
+    if not any(isinstance(handler, logging.FileHandler) for handler in logger.handlers):
+        handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
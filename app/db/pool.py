@@ -0,0 +1,63 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self._record_wait(time.perf_counter() - start)
+        return connection
+
+    def _record_wait(self, waited: float, timed_out: bool = False):
+        with self._stats_lock:
+            if timed_out:
+                self._timeouts += 1
+            else:
+                self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def reset_stats(self):
+        """Reset the checkout counters"""
+        with self._stats_lock:
+            self._checkouts = 0
+            self._timeouts = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
+
+    def stats(self) -> dict:
+        """Get a snapshot of the pool usage"""
+        with self._stats_lock:
+            checkouts = self._checkouts
+            timeouts = self._timeouts
+            total_wait = self._total_wait
+            max_wait = self._max_wait
+
+        attempts = checkouts + timeouts
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': checkouts,
+            'timeouts': timeouts,
+            'total_wait': total_wait,
+            'avg_wait': total_wait / attempts if attempts else 0.0,
+            'max_wait': max_wait,
+        }
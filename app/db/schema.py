@@ -0,0 +1,101 @@
+from sqlalchemy import Float, Numeric, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app.models.base import Base
+# The models are imported for their tables to be registered on Base.metadata
+from app.models.user import User
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+
+__all__ = [
+    "Client", "Contract", "Event", "User",
+    "create_missing_columns", "create_missing_indexes", "create_schema", "upgrade_money_columns",
+]
+
+
+def create_missing_columns(bind) -> list:
+    """Add the columns declared on the models that existing tables lack
+
+    Only columns that existing rows can do without are added: nullable ones or
+    ones with a server default, such as the optimistic locking versions.
+    """
+    inspector = inspect(bind)
+    added = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not (column.nullable or column.server_default is not None):
+                continue
+            definition = CreateColumn(column).compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+            added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def create_missing_indexes(bind) -> list:
+    """Create the indexes declared on the models that an existing database lacks
+
+    create_all skips tables that already exist, indexes included, so databases
+    created before an index was declared need this to catch up.
+    """
+    inspector = inspect(bind)
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing = [index for index in sorted(table.indexes, key=lambda index: index.name)
+                   if index.name not in existing]
+        if not missing:
+            continue
+        for index in missing:
+            # SQLAlchemy itself skips the indexes restricted to another database with ddl_if
+            index.create(bind)
+        present = {index['name'] for index in inspect(bind).get_indexes(table.name)}
+        created.extend(index.name for index in missing if index.name in present)
+
+    return created
+
+
+def upgrade_money_columns(bind) -> list:
+    """Convert money columns created as floating point to the exact NUMERIC declared on the models
+
+    Only PostgreSQL needs it: SQLite stores both types the same way.
+    """
+    if bind.dialect.name != "postgresql":
+        return []
+    inspector = inspect(bind)
+    converted = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            exact = isinstance(column.type, Numeric) and not isinstance(column.type, Float)
+            if exact and isinstance(existing.get(column.name), Float):
+                type_name = column.type.compile(dialect=bind.dialect)
+                with bind.begin() as connection:
+                    connection.execute(text(
+                        f'ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE {type_name} '
+                        f'USING round({column.name}::numeric, {column.type.scale})'
+                    ))
+                converted.append(f"{table.name}.{column.name}")
+
+    return converted
+
+
+def create_schema(bind) -> list:
+    """Create the missing tables, then the missing indexes of existing tables"""
+    Base.metadata.create_all(bind=bind)
+    return create_missing_indexes(bind)
@@ -0,0 +1,119 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.connection import SessionLocal
+from app.models.base import Base
+from app.utils.config import env_float
+
+# Session.info key of the objects a unit of work keeps alive, by id
+KEPT_OBJECTS = "unit_of_work_kept"
+# Execution option of the queries whose rows are not kept, set by streamed listings
+KEEP_LOADED = "keep_loaded"
+
+
+def _kept_objects(session):
+    return session.info.get(KEPT_OBJECTS) if session is not None else None
+
+
+@event.listens_for(Base, "load", propagate=True)
+def _keep_loaded(instance, context):
+    kept = _kept_objects(context.session)
+    if kept is None:
+        return
+    # Eager loads carry the options in the context, the rows of the query itself in its statement
+    keep = context.execution_options.get(KEEP_LOADED, context.query.get_execution_options().get(KEEP_LOADED))
+    if keep is not False:
+        kept[id(instance)] = instance
+
+
+@event.listens_for(Session, "after_flush")
+def _keep_written(session, flush_context):
+    kept = _kept_objects(session)
+    if kept is not None:
+        for instance in (*session.new, *session.dirty):
+            kept[id(instance)] = instance
+
+
+@event.listens_for(Session, "persistent_to_deleted")
+def _release(session, instance):
+    kept = _kept_objects(session)
+    if kept is not None:
+        kept.pop(id(instance), None)
+
+
+class UnitOfWork:
+    """Session shared by every action of a menu, from entering it to leaving it
+
+    Each action ends its transaction (end_action), so no connection is left
+    idle in transaction while the menu waits for the user. The identity map
+    only holds weak references, so the unit of work keeps the objects it
+    loaded or wrote: the next actions answer primary key lookups and
+    many-to-one relationships of these rows without a query. Rows of streamed
+    listings (KEEP_LOADED set to False, see keyset_page) are not kept, so
+    paging through a table uses the memory of one page. Expiry rules:
+    - a commit keeps loaded objects as they are (expire_on_commit=False),
+      services refresh what they write themselves
+    - a rollback expires everything, the objects may no longer match the database
+    - objects are expired and released once they are older than SESSION_MAX_AGE
+      seconds, so changes made by other users are picked up
+    - leaving the menu closes the session
+    """
+
+    def __init__(self, session_factory=None, max_age: float = None):
+        self.session_factory = session_factory
+        self.max_age = env_float("SESSION_MAX_AGE", 300.0) if max_age is None else max_age
+        self._session = None
+        self._loaded_at = None
+        self._kept = {}
+
+    @property
+    def session(self):
+        """Get the shared session, opening it or expiring stale objects first"""
+        if self._session is None:
+            factory = self.session_factory or SessionLocal
+            self._session = factory(expire_on_commit=False, info={KEPT_OBJECTS: self._kept})
+            self._loaded_at = time.monotonic()
+        elif time.monotonic() - self._loaded_at > self.max_age:
+            self.expire_all()
+        return self._session
+
+    def end_action(self):
+        """Commit what the action left in the transaction, the loaded objects stay usable"""
+        if self._session is not None and self._session.in_transaction():
+            try:
+                self._session.commit()
+            except Exception:
+                self.rollback()
+                raise
+
+    def expire_all(self):
+        """Force every loaded object to be reloaded on next access"""
+        if self._session is not None:
+            self._session.expire_all()
+            self._kept.clear()
+            self._loaded_at = time.monotonic()
+
+    def rollback(self):
+        """Roll back a failed action (this also expires every loaded object)"""
+        if self._session is not None:
+            self._session.rollback()
+            self._kept.clear()
+            self._loaded_at = time.monotonic()
+
+    def close(self):
+        """Close the session, the next access opens a new one"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+            self._kept.clear()
+            self._loaded_at = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
@@ -1,8 +1,24 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import DDL, Column, Integer, String, Date, ForeignKey, Index, event, func, literal_column, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
 
+def client_search_document(full_name, email, company_name, phone):
+    """Lower-cased text searched for a client, also the expression of the search indexes
+
+    The separators are inlined rather than bound so that queries spell the
+    expression exactly as the indexes do.
+    """
+    space, empty = literal_column("' '"), literal_column("''")
+    return func.lower(full_name + space + email + space + func.coalesce(company_name, empty)
+                      + space + func.coalesce(phone, empty))
+
+
+def search_vector(document):
+    """Words of a search document, without stemming: names and emails are not French or English"""
+    return func.to_tsvector(literal_column("'simple'"), document)
+
+
 class Client(Base):
     __tablename__ = "clients"
 
@@ -14,5 +30,29 @@ class Client(Base):
     date_created = Column(Date)
     last_contact = Column(Date)
 
-    commercial_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    commercial_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     commercial = relationship("User")
+
+    # Optimistic locking, see app.services.versioning
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # Client search, see app.services.search_service, PostgreSQL only:
+        # trigrams for substrings and typos, words for whole-word matches
+        Index("ix_clients_search_trgm",
+              client_search_document(full_name, email, company_name, phone).label("document"),
+              postgresql_using="gin", postgresql_ops={"document": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_clients_search_words",
+              search_vector(client_search_document(full_name, email, company_name, phone)),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+    @classmethod
+    def search_document(cls):
+        """The searched text as a SQL expression, see client_search_document"""
+        return client_search_document(cls.full_name, cls.email, cls.company_name, cls.phone)
+
+
+event.listen(Base.metadata, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
@@ -1,19 +1,35 @@
-from sqlalchemy import Column, Integer, Float, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Numeric, Date, Boolean, ForeignKey, Index, false, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
+from app.utils.money import MONEY_PRECISION, MONEY_SCALE
 
 
 class Contract(Base):
     __tablename__ = "contracts"
 
     id = Column(Integer, primary_key=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     commercial_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
-    total_amount = Column(Float, nullable=False)
-    amount_due = Column(Float, nullable=False)
+    # Exact decimals: payments subtract to exactly 0 and "paid" filters can use equality
+    total_amount = Column(Numeric(MONEY_PRECISION, MONEY_SCALE), nullable=False)
+    amount_due = Column(Numeric(MONEY_PRECISION, MONEY_SCALE), nullable=False)
     date_created = Column(Date)
     is_signed = Column(Boolean, default=False)
 
     client = relationship("Client")
     commercial = relationship("User")
+
+    # Optimistic locking, see app.services.versioning
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # Leading commercial_id also serves the plain foreign key lookups
+        Index("ix_contracts_commercial_id_is_signed", commercial_id, is_signed),
+        # Partial indexes stay small: only the contracts still needing follow-up
+        Index("ix_contracts_unsigned", id,
+              postgresql_where=is_signed == false(), sqlite_where=is_signed == false()),
+        Index("ix_contracts_unpaid", id,
+              postgresql_where=amount_due > 0, sqlite_where=amount_due > 0),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import DDL, Column, Integer, String, DateTime, Text, ForeignKey, Index, event, func, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -8,12 +8,12 @@ class Event(Base):
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)  # ADD THIS LINE
-    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     support_id = Column(Integer, ForeignKey("users.id"), nullable=True)
 
-    date_start = Column(DateTime, nullable=False)
-    date_end = Column(DateTime, nullable=False)
+    date_start = Column(DateTime, nullable=False, index=True)
+    date_end = Column(DateTime, nullable=False, index=True)
     location = Column(String)
     attendees = Column(Integer)
     notes = Column(Text)
@@ -21,3 +21,23 @@ class Event(Base):
     contract = relationship("Contract")
     client = relationship("Client")
     support_contact = relationship("User")
+
+    # Optimistic locking, see app.services.versioning
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # A support's schedule; leading support_id also serves the foreign key lookups
+        Index("ix_events_support_id_date_start", support_id, date_start),
+        # Events still waiting for a support, ordered by start date
+        Index("ix_events_unassigned", date_start,
+              postgresql_where=support_id.is_(None), sqlite_where=support_id.is_(None)),
+        # Overlapping events of a support (tsrange &&, see app.services.schedule_service), PostgreSQL only
+        Index("ix_events_support_period", support_id, func.tsrange(date_start, date_end),
+              postgresql_using="gist", postgresql_where=support_id.isnot(None)).ddl_if(dialect="postgresql"),
+    )
+
+
+# GiST indexes an integer column alongside the range only with btree_gist
+event.listen(Base.metadata, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"))
@@ -0,0 +1,7 @@
+import enum
+
+
+class UserRole(enum.Enum):
+    COMMERCIAL = "commercial"
+    SUPPORT = "support"
+    GESTION = "gestion"
@@ -1,12 +1,7 @@
 from sqlalchemy import Column, Integer, String, Enum
 from app.models.base import Base
-import enum
-
-
-class UserRole(enum.Enum):
-    COMMERCIAL = "commercial"
-    SUPPORT = "support"
-    GESTION = "gestion"
+# Kept free of SQLAlchemy so the menus can check roles before the ORM is loaded
+from app.models.roles import UserRole  # noqa: F401
 
 
 class User(Base):
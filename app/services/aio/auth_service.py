@@ -0,0 +1,23 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.async_connection import get_async_sessionmaker
+from app.models.user import User
+from app.services.aio.user_service import hash_password_async
+from app.utils.password import needs_rehash, verify_password_async
+
+
+async def login_user(email: str, password: str, session_factory: async_sessionmaker = None) -> User:
+    async with (session_factory or get_async_sessionmaker())() as db:
+        user = (await db.scalars(select(User).filter_by(email=email))).first()
+        # bcrypt runs on the shared password pool, other requests keep being served meanwhile
+        if user and await asyncio.wrap_future(verify_password_async(password, user.password)):
+            # Upgrade hashes made with an outdated cost while the plain password is at hand
+            if needs_rehash(user.password):
+                user.password = await hash_password_async(password)
+                await db.commit()
+                await db.refresh(user)
+            return user
+        return None
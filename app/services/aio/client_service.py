@@ -0,0 +1,50 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.client import Client
+from app.models.user import User, UserRole
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_select
+from app.services.versioning import apply_changes_async, loaded_instance, update_returning_async
+
+
+def _clients_listing():
+    """Select clients with their commercial batched in one extra IN query"""
+    return select(Client).options(selectinload(Client.commercial))
+
+
+async def create_client(db: AsyncSession, commercial_id: int, **data) -> Client:
+    client = Client(**data, commercial_id=commercial_id)
+    db.add(client)
+    await db.commit()
+    await db.refresh(client)
+    return client
+
+
+async def update_client(db: AsyncSession, client_id: int, updater: User, **fields) -> Client:
+    """Update a client, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your own clients.")
+    client = loaded_instance(db, Client, client_id)
+    if client is None:
+        ownership = [Client.commercial_id == updater.id] if updater.role == UserRole.COMMERCIAL else []
+        return await update_returning_async(db, Client, client_id, fields, *ownership, permission_error=refusal)
+
+    if updater.role == UserRole.COMMERCIAL and client.commercial_id != updater.id:
+        raise refusal
+    return await apply_changes_async(db, client, fields)
+
+
+async def get_all_clients(db: AsyncSession):
+    return (await db.scalars(_clients_listing())).all()
+
+
+async def get_clients_page(db: AsyncSession, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of clients after the given client id"""
+    return (await db.scalars(keyset_select(_clients_listing(), Client.id, after_id, limit))).all()
+
+
+async def get_clients_by_user(db: AsyncSession, user: User):
+    query = _clients_listing()
+    if user.role == UserRole.COMMERCIAL:
+        query = query.filter_by(commercial_id=user.id)
+    return (await db.scalars(query)).all()
@@ -0,0 +1,104 @@
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.services.cache import get_staff_by_role_async
+from app.services.contract_service import payment_refusal, payment_statement, sync_loaded_contract
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_select
+from app.services.versioning import apply_changes_async, loaded_instance, update_returning_async
+from app.utils.money import to_money
+
+
+def _contracts_listing():
+    """Select contracts with their client joined and their commercial batched, as the sync listing"""
+    return select(Contract).options(joinedload(Contract.client), selectinload(Contract.commercial))
+
+
+async def create_contract(db: AsyncSession, client_id: int, commercial_id: int, total_amount: float) -> Contract:
+    contract = Contract(
+        client_id=client_id,
+        commercial_id=commercial_id,
+        total_amount=total_amount,
+        amount_due=total_amount,
+        is_signed=False
+    )
+    db.add(contract)
+    await db.commit()
+    await db.refresh(contract)
+    return contract
+
+
+async def update_contract(db: AsyncSession, contract_id: int, updater: User, **fields) -> Contract:
+    """Update a contract, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your own contracts.")
+    contract = loaded_instance(db, Contract, contract_id)
+    if contract is None:
+        ownership = [Contract.commercial_id == updater.id] if updater.role == UserRole.COMMERCIAL else []
+        return await update_returning_async(db, Contract, contract_id, fields, *ownership, permission_error=refusal)
+
+    if updater.role == UserRole.COMMERCIAL and contract.commercial_id != updater.id:
+        raise refusal
+    return await apply_changes_async(db, contract, fields)
+
+
+async def record_payment(db: AsyncSession, contract_id: int, amount, updater: User) -> Decimal:
+    """Subtract a payment from the amount due in one atomic statement, as the sync service"""
+    amount = to_money(amount)
+    if amount <= 0:
+        raise ValueError("Payment amount must be positive.")
+
+    row = (await db.execute(payment_statement(contract_id, amount, updater))).one_or_none()
+    if row is None:
+        refusal = payment_refusal(await db.get(Contract, contract_id), contract_id, amount, updater)
+        await db.rollback()
+        raise refusal
+    sync_loaded_contract(db.sync_session.identity_map, contract_id, row.amount_due, row.version)
+    await db.commit()
+    return row.amount_due
+
+
+async def list_unsigned_contracts(db: AsyncSession):
+    return (await db.scalars(_contracts_listing().filter_by(is_signed=False))).all()
+
+
+async def list_unpaid_contracts(db: AsyncSession):
+    return (await db.scalars(_contracts_listing().filter(Contract.amount_due > 0))).all()
+
+
+async def list_signed_contracts(db: AsyncSession):
+    return (await db.scalars(_contracts_listing().filter_by(is_signed=True))).all()
+
+
+async def list_paid_contracts(db: AsyncSession):
+    """Get all paid contracts (amount_due = 0)"""
+    return (await db.scalars(_contracts_listing().filter_by(amount_due=0))).all()
+
+
+async def get_all_contracts(db: AsyncSession):
+    return (await db.scalars(_contracts_listing())).all()
+
+
+async def get_contracts_page(db: AsyncSession, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of contracts after the given contract id"""
+    return (await db.scalars(keyset_select(_contracts_listing(), Contract.id, after_id, limit))).all()
+
+
+async def get_contracts_by_user(db: AsyncSession, user: User):
+    query = _contracts_listing()
+    if user.role == UserRole.COMMERCIAL:
+        query = query.filter_by(commercial_id=user.id)
+    return (await db.scalars(query)).all()
+
+
+async def get_all_clients(db: AsyncSession):
+    return (await db.scalars(select(Client))).all()
+
+
+async def get_commercial_users(db: AsyncSession):
+    """Get all commercial users (cached, see get_staff_by_role)"""
+    return await get_staff_by_role_async(db, UserRole.COMMERCIAL)
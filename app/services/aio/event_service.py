@@ -0,0 +1,126 @@
+"""Async counterpart of app.services.event_service
+
+The bulk assignments (assign_supports, assign_support_matching) and the export
+query are only run by the CLI and export_data.py, they stay synchronous.
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.cache import get_staff_by_role_async
+from app.services.errors import NotFoundError
+from app.services.event_filters import EventFilter
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_select
+from app.services.schedule_service import check_event_schedule_async
+from app.services.versioning import apply_changes_async, loaded_instance, update_returning_async
+
+
+def _events_with_details():
+    """Select events with their contract, client and support loaded in the same statement"""
+    return select(Event).options(joinedload(Event.contract).joinedload(Contract.client),
+                                 joinedload(Event.support_contact))
+
+
+async def create_event(db: AsyncSession, client_id: int, contract_id: int, name: str, start: datetime,
+                       end: datetime, location: str, attendees: int, notes: str) -> Event:
+    event = Event(
+        name=name,
+        client_id=client_id,
+        contract_id=contract_id,
+        date_start=start,
+        date_end=end,
+        location=location,
+        attendees=attendees,
+        notes=notes
+    )
+    db.add(event)
+    await db.commit()
+    await db.refresh(event)
+    return event
+
+
+async def assign_support_to_event(db: AsyncSession, event_id: int, support_user_id: int) -> Event:
+    """Assign a support user to an event, a concurrent change of the event raising StaleDataError"""
+    await check_event_schedule_async(db, event_id, {'support_id': support_user_id})
+    event = await db.get(Event, event_id)
+    if event is None:
+        raise NotFoundError("Event", event_id)
+    return await apply_changes_async(db, event, {'support_id': support_user_id})
+
+
+async def update_event(db: AsyncSession, event_id: int, updater: User, **fields) -> Event:
+    """Update an event, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your assigned events.")
+    owner_id = updater.id if updater.role == UserRole.SUPPORT else None
+    event = loaded_instance(db, Event, event_id)
+    if event is not None and owner_id is not None and event.support_id != owner_id:
+        raise refusal
+    # Restricted to the updater's own events, the check cannot reveal the schedule of other supports
+    await check_event_schedule_async(db, event_id, fields, owner_id)
+    if event is None:
+        ownership = [Event.support_id == owner_id] if owner_id is not None else []
+        return await update_returning_async(db, Event, event_id, fields, *ownership, permission_error=refusal)
+    return await apply_changes_async(db, event, fields)
+
+
+async def list_unassigned_events(db: AsyncSession):
+    return (await db.scalars(select(Event).filter_by(support_id=None))).all()
+
+
+async def list_events_by_support(db: AsyncSession, support_user_id: int):
+    return (await db.scalars(select(Event).filter_by(support_id=support_user_id))).all()
+
+
+async def get_all_events(db: AsyncSession):
+    return (await db.scalars(select(Event))).all()
+
+
+async def get_events_page(db: AsyncSession, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of events after the given event id"""
+    return (await db.scalars(keyset_select(select(Event), Event.id, after_id, limit))).all()
+
+
+async def get_events_with_details(db: AsyncSession):
+    return (await db.scalars(_events_with_details())).all()
+
+
+async def get_events_with_details_page(db: AsyncSession, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of events with their contract, client and support loaded"""
+    return (await db.scalars(keyset_select(_events_with_details(), Event.id, after_id, limit))).all()
+
+
+async def get_filtered_events(db: AsyncSession, filters: dict):
+    return (await db.scalars(EventFilter.from_dict(filters).apply(_events_with_details()))).all()
+
+
+async def get_signed_contracts_for_commercial(db: AsyncSession, commercial_id: int):
+    """Get signed contracts for a specific commercial user"""
+    query = select(Contract).filter(Contract.commercial_id == commercial_id,
+                                    Contract.is_signed == True).options(joinedload(Contract.client))  # noqa: E712
+    return (await db.scalars(query)).all()
+
+
+async def get_contract_by_id(db: AsyncSession, contract_id: int):
+    """Get a contract by its ID"""
+    return await db.get(Contract, contract_id)
+
+
+async def get_events_for_support_user(db: AsyncSession, support_user_id: int):
+    """Get events that a support user can update (assigned to them or unassigned)"""
+    query = EventFilter().support_or_unassigned(support_user_id).apply(_events_with_details())
+    return (await db.scalars(query)).all()
+
+
+async def get_all_events_for_management(db: AsyncSession):
+    """Get all events for management users"""
+    return (await db.scalars(_events_with_details())).all()
+
+
+async def get_support_users(db: AsyncSession):
+    """Get all support users (cached, see get_staff_by_role)"""
+    return await get_staff_by_role_async(db, UserRole.SUPPORT)
@@ -0,0 +1,88 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.cache import invalidate_staff
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_select
+from app.services.versioning import loaded_instance, update_returning_async
+from app.utils.password import get_executor, hash_password
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """Hash on the shared password pool so bcrypt does not block the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), hash_password, plain_password)
+
+
+async def create_user(db: AsyncSession, name: str, email: str, role: UserRole, password: str) -> User:
+    hashed = await hash_password_async(password)
+    user = User(name=name, email=email, role=role, password=hashed)
+    db.add(user)
+    await db.commit()
+    invalidate_staff()
+    await db.refresh(user)
+    return user
+
+
+async def update_user(db: AsyncSession, user_id: int, **fields) -> User:
+    """Update a user, in a single UPDATE ... RETURNING unless the session already holds it"""
+    user = loaded_instance(db, User, user_id)
+    if user is None:
+        user = await update_returning_async(db, User, user_id, fields)
+    else:
+        for key, value in fields.items():
+            setattr(user, key, value)
+        await db.commit()
+    invalidate_staff()
+    return user
+
+
+async def delete_user(db: AsyncSession, user_id: int) -> None:
+    user = await db.get(User, user_id)
+    await db.delete(user)
+    await db.commit()
+    invalidate_staff()
+
+
+async def list_all_users(db: AsyncSession):
+    return (await db.scalars(select(User))).all()
+
+
+async def list_users_page(db: AsyncSession, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of users after the given user id"""
+    return (await db.scalars(keyset_select(select(User), User.id, after_id, limit))).all()
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    return (await db.scalars(select(User).filter_by(email=email))).first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    return await db.get(User, user_id)
+
+
+async def check_user_associations(db: AsyncSession, user_id: int) -> dict:
+    """Check if user has associated data (clients, contracts, events), counted in one round trip"""
+    counts = (await db.execute(select(
+        select(func.count()).select_from(Client).filter_by(commercial_id=user_id).scalar_subquery(),
+        select(func.count()).select_from(Contract).filter_by(commercial_id=user_id).scalar_subquery(),
+        select(func.count()).select_from(Event).filter_by(support_id=user_id).scalar_subquery(),
+    ))).one()
+    clients_count, contracts_count, events_count = counts
+
+    return {
+        'clients_count': clients_count,
+        'contracts_count': contracts_count,
+        'events_count': events_count,
+        'has_associations': clients_count > 0 or contracts_count > 0 or events_count > 0
+    }
+
+
+async def email_exists_for_different_user(db: AsyncSession, email: str, user_id: int) -> bool:
+    """Check if email exists for a different user (used for updates)"""
+    existing_user = await get_user_by_email(db, email)
+    return existing_user is not None and existing_user.id != user_id
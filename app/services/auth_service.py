@@ -1,4 +1,7 @@
-from app.utils.password import verify_password
+from app.utils.password import verify_password, needs_rehash, hash_password
+from app.utils.session_token import (
+    clear_token, create_token, decode_token, get_secret, load_token, password_fingerprint, save_token
+)
 from app.db.connection import SessionLocal
 from app.models.user import User
 
@@ -8,7 +11,51 @@ def login_user(email: str, password: str) -> User:
     try:
         user = db.query(User).filter_by(email=email).first()
         if user and verify_password(password, user.password):
+            # Upgrade hashes made with an outdated cost while the plain password is at hand
+            if needs_rehash(user.password):
+                user.password = hash_password(password)
+                db.commit()
+                db.refresh(user)
             return user
         return None
     finally:
         db.close()
+
+
+def login_with_token(token: str) -> User:
+    """Get the user of a valid session token, without checking the password again"""
+    secret = get_secret()
+    claims = decode_token(token, secret) if secret and token else None
+    if claims is None:
+        return None
+    db = SessionLocal()
+    try:
+        # Primary key lookup, the token stays valid only while the user and their password do
+        user = db.get(User, claims.get("sub"))
+        if user and claims.get("pwd") == password_fingerprint(user.password):
+            return user
+        return None
+    finally:
+        db.close()
+
+
+def restore_session(email: str = None) -> User:
+    """Get the user of the stored session token, if any and matching the expected email"""
+    if not get_secret():
+        return None
+    user = login_with_token(load_token())
+    if user and (email is None or user.email.lower() == email.lower()):
+        return user
+    return None
+
+
+def remember_session(user: User):
+    """Store a session token for the user so the next start skips the password"""
+    secret = get_secret()
+    if secret:
+        save_token(create_token(user.id, user.password, secret))
+
+
+def forget_session():
+    """Remove the stored session token"""
+    clear_token()
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.user import User, UserRole
+from app.utils.config import env_float, env_int
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, default=None):
+        """Get a fresh value, counting the lookup as a hit or a miss"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            if entry is not _MISSING:
+                del self._entries[key]
+            self._misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, load):
+        """Get a value, calling load() to compute and store it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = load()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def reset_stats(self):
+        """Reset the hit and miss counters"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict:
+        """Get a snapshot of the cache usage"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+            }
+
+
+# Staff lists change rarely, STAFF_CACHE_TTL=0 disables caching
+staff_cache = TTLCache(maxsize=env_int("STAFF_CACHE_SIZE", 16), ttl=env_float("STAFF_CACHE_TTL", 300.0))
+
+
+def get_staff_by_role(db: Session, role: UserRole) -> list:
+    """Get the (id, name, email, role) rows of the users with a role, read through the cache
+
+    Plain rows are cached rather than User objects so the entries can be shared
+    between sessions without being expired or detached.
+    """
+    rows = staff_cache.get_or_load(role, lambda: tuple(
+        db.query(User.id, User.name, User.email, User.role)
+        .filter(User.role == role)
+        .order_by(User.name)
+        .all()
+    ))
+    return list(rows)
+
+
+async def get_staff_by_role_async(db: AsyncSession, role: UserRole) -> list:
+    """Async counterpart of get_staff_by_role, sharing the same cache"""
+    rows = staff_cache.get(role, _MISSING)
+    if rows is _MISSING:
+        result = await db.execute(
+            select(User.id, User.name, User.email, User.role).where(User.role == role).order_by(User.name)
+        )
+        rows = tuple(result.all())
+        staff_cache.set(role, rows)
+    return list(rows)
+
+
+def invalidate_staff():
+    """Forget the cached staff lists, to be called whenever users change"""
+    staff_cache.invalidate()
+
+
+def get_staff_cache_stats() -> dict:
+    """Get the hit/miss counters of the staff cache"""
+    return staff_cache.stats()
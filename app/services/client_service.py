@@ -1,6 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.models.client import Client
 from app.models.user import User, UserRole
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from app.services.versioning import apply_changes, loaded_instance, update_returning
+
+
+def _clients_listing(db: Session):
+    """Query clients with their commercial batched in one extra IN query"""
+    return db.query(Client).options(selectinload(Client.commercial))
 
 
 def create_client(db: Session, commercial_id: int, **data) -> Client:
@@ -12,22 +19,36 @@ def create_client(db: Session, commercial_id: int, **data) -> Client:
 
 
 def update_client(db: Session, client_id: int, updater: User, **fields) -> Client:
-    client = db.query(Client).filter_by(id=client_id).first()
+    """Update a client, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your own clients.")
+    client = loaded_instance(db, Client, client_id)
+    if client is None:
+        ownership = [Client.commercial_id == updater.id] if updater.role == UserRole.COMMERCIAL else []
+        return update_returning(db, Client, client_id, fields, *ownership, permission_error=refusal)
 
     if updater.role == UserRole.COMMERCIAL and client.commercial_id != updater.id:
-        raise PermissionError("You can only update your own clients.")
-    for key, value in fields.items():
-        setattr(client, key, value)
-
-    db.commit()
-    return client
+        raise refusal
+    return apply_changes(db, client, fields)
 
 
 def get_all_clients(db: Session):
-    return db.query(Client).all()
+    return _clients_listing(db).all()
+
+
+def get_clients_page(db: Session, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of clients after the given client id"""
+    return keyset_page(_clients_listing(db), Client.id, after_id, limit)
+
+
+def get_clients_export_query(db: Session):
+    """Query clients as flat rows with their commercial name, for streaming exports"""
+    return db.query(
+        Client.id, Client.full_name, Client.email, Client.phone, Client.company_name,
+        Client.date_created, Client.last_contact, Client.commercial_id, User.name.label("commercial_name"),
+    ).join(User, User.id == Client.commercial_id).order_by(Client.id)
 
 
 def get_clients_by_user(db: Session, user: User):
     if user.role == UserRole.COMMERCIAL:
-        return db.query(Client).filter_by(commercial_id=user.id).all()
-    return db.query(Client).all()
+        return _clients_listing(db).filter_by(commercial_id=user.id).all()
+    return _clients_listing(db).all()
@@ -1,8 +1,28 @@
-from sqlalchemy.orm import Session
+from decimal import Decimal
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.contract import Contract
 from app.models.user import User, UserRole
 from app.models.client import Client
+from app.services.cache import get_staff_by_role
+from app.services.errors import NotFoundError
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from app.services.versioning import apply_changes, loaded_instance, update_returning
+from app.utils.money import MONEY_SCALE, to_money
+
+
+def _contracts_listing(db: Session, commercial_id: int = None):
+    """Query contracts with what the list views display already loaded, those of one commercial if given
+
+    Each row shows its client and commercial. Clients are mostly distinct per
+    contract so they are joined in the same statement; commercials are a handful
+    of staff, batched in a single extra IN query instead of being joined N times.
+    """
+    query = db.query(Contract).options(joinedload(Contract.client), selectinload(Contract.commercial))
+    return query if commercial_id is None else query.filter(Contract.commercial_id == commercial_id)
 
 
 def create_contract(db: Session, client_id: int, commercial_id: int, total_amount: float) -> Contract:
@@ -20,42 +40,109 @@ def create_contract(db: Session, client_id: int, commercial_id: int, total_amoun
 
 
 def update_contract(db: Session, contract_id: int, updater: User, **fields) -> Contract:
-    contract = db.query(Contract).filter_by(id=contract_id).first()
+    """Update a contract, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your own contracts.")
+    contract = loaded_instance(db, Contract, contract_id)
+    if contract is None:
+        ownership = [Contract.commercial_id == updater.id] if updater.role == UserRole.COMMERCIAL else []
+        return update_returning(db, Contract, contract_id, fields, *ownership, permission_error=refusal)
 
     if updater.role == UserRole.COMMERCIAL and contract.commercial_id != updater.id:
-        raise PermissionError("You can only update your own contracts.")
-    for key, value in fields.items():
-        setattr(contract, key, value)
-
+        raise refusal
+    return apply_changes(db, contract, fields)
+
+
+def payment_statement(contract_id: int, amount: Decimal, updater: User):
+    """UPDATE ... RETURNING subtracting a payment in the database, matching no row if it is refused"""
+    statement = update(Contract).where(Contract.id == contract_id, Contract.amount_due >= amount)
+    if updater.role == UserRole.COMMERCIAL:
+        statement = statement.where(Contract.commercial_id == updater.id)
+    # round() is a no-op on NUMERIC, it keeps cents exact on SQLite which computes in floating point.
+    # The version is bumped so that an edit started before the payment cannot overwrite it
+    return statement.values(amount_due=func.round(Contract.amount_due - amount, MONEY_SCALE),
+                            version=Contract.version + 1) \
+        .returning(Contract.amount_due, Contract.version).execution_options(synchronize_session=False)
+
+
+def sync_loaded_contract(identity_map, contract_id: int, amount_due: Decimal, version: int):
+    """Give an already loaded contract the returned values, instead of expiring it for a reload"""
+    contract = identity_map.get(Session.identity_key(Contract, contract_id))
+    if contract is not None:
+        set_committed_value(contract, 'amount_due', amount_due)
+        set_committed_value(contract, 'version', version)
+
+
+def payment_refusal(contract: Contract, contract_id: int, amount: Decimal, updater: User) -> Exception:
+    """Explain why a payment matched no contract"""
+    if contract is None:
+        return NotFoundError("Contract", contract_id)
+    if updater.role == UserRole.COMMERCIAL and contract.commercial_id != updater.id:
+        return PermissionError("You can only update your own contracts.")
+    return ValueError(f"Payment of {amount} exceeds the amount due ({contract.amount_due}).")
+
+
+def record_payment(db: Session, contract_id: int, amount, updater: User) -> Decimal:
+    """Subtract a payment from the amount due in one atomic statement, returning the new amount due
+
+    The subtraction happens in the database, so concurrent payments on the same
+    contract are serialized by the row lock instead of overwriting each other,
+    and no reload is needed to know the balance.
+    """
+    amount = to_money(amount)
+    if amount <= 0:
+        raise ValueError("Payment amount must be positive.")
+
+    row = db.execute(payment_statement(contract_id, amount, updater)).one_or_none()
+    if row is None:
+        refusal = payment_refusal(db.get(Contract, contract_id), contract_id, amount, updater)
+        db.rollback()
+        raise refusal
+    sync_loaded_contract(db.identity_map, contract_id, row.amount_due, row.version)
     db.commit()
-    return contract
+    return row.amount_due
 
 
-def list_unsigned_contracts(db: Session):
-    return db.query(Contract).filter_by(is_signed=False).all()
+def list_unsigned_contracts(db: Session, commercial_id: int = None):
+    return _contracts_listing(db, commercial_id).filter_by(is_signed=False).all()
 
 
-def list_unpaid_contracts(db: Session):
-    return db.query(Contract).filter(Contract.amount_due > 0).all()
+def list_unpaid_contracts(db: Session, commercial_id: int = None):
+    return _contracts_listing(db, commercial_id).filter(Contract.amount_due > 0).all()
 
 
-def list_signed_contracts(db: Session):
-    return db.query(Contract).filter_by(is_signed=True).all()
+def list_signed_contracts(db: Session, commercial_id: int = None):
+    return _contracts_listing(db, commercial_id).filter_by(is_signed=True).all()
 
 
-def list_paid_contracts(db: Session):
-    """Get all paid contracts (amount_due = 0)"""
-    return db.query(Contract).filter_by(amount_due=0).all()
+def list_paid_contracts(db: Session, commercial_id: int = None):
+    """Get all paid contracts (amount_due = 0), only those of commercial_id if given"""
+    return _contracts_listing(db, commercial_id).filter_by(amount_due=0).all()
 
 
 def get_all_contracts(db: Session):
-    return db.query(Contract).all()
+    return _contracts_listing(db).all()
+
+
+def get_contracts_page(db: Session, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of contracts after the given contract id"""
+    return keyset_page(_contracts_listing(db), Contract.id, after_id, limit)
+
+
+def get_contracts_export_query(db: Session):
+    """Query contracts as flat rows with client and commercial names, for streaming exports"""
+    return db.query(
+        Contract.id, Contract.client_id, Client.full_name.label("client_name"),
+        Contract.commercial_id, User.name.label("commercial_name"),
+        Contract.total_amount, Contract.amount_due, Contract.is_signed, Contract.date_created,
+    ).join(Client, Client.id == Contract.client_id) \
+        .join(User, User.id == Contract.commercial_id) \
+        .order_by(Contract.id)
 
 
 def get_contracts_by_user(db: Session, user: User):
     if user.role == UserRole.COMMERCIAL:
-        return db.query(Contract).filter_by(commercial_id=user.id).all()
-    return db.query(Contract).all()
+        return _contracts_listing(db).filter_by(commercial_id=user.id).all()
+    return _contracts_listing(db).all()
 
 
 def get_all_clients(db: Session):
@@ -63,5 +150,5 @@ def get_all_clients(db: Session):
 
 
 def get_commercial_users(db: Session):
-    """Get all commercial users"""
-    return db.query(User).filter_by(role=UserRole.COMMERCIAL).all()
+    """Get all commercial users (cached, see get_staff_by_role)"""
+    return get_staff_by_role(db, UserRole.COMMERCIAL)
@@ -0,0 +1,39 @@
+class StaleDataError(Exception):
+    """Raised when a row was saved or deleted by someone else since it was loaded
+
+    changes holds the fields the caller actually changed, to reapply them on the
+    current version; conflicts maps the fields both sides changed to
+    (caller's value, current value). current is the reloaded row, None if deleted.
+    """
+
+    def __init__(self, entity: str, entity_id: int, changes: dict, conflicts: dict, current=None):
+        self.entity = entity
+        self.entity_id = entity_id
+        self.changes = changes
+        self.conflicts = conflicts
+        self.current = current
+        state = "deleted" if self.deleted else "modified"
+        super().__init__(f"{entity} {entity_id} was {state} by someone else.")
+
+    @property
+    def deleted(self) -> bool:
+        return self.current is None
+
+
+class NotFoundError(ValueError):
+    """Raised when the row to update does not exist"""
+
+    def __init__(self, entity: str, entity_id: int):
+        self.entity = entity
+        self.entity_id = entity_id
+        super().__init__(f"{entity} {entity_id} not found.")
+
+
+class ScheduleConflictError(ValueError):
+    """Raised when an update would give a support user two events at the same time"""
+
+    def __init__(self, support_id: int, event_ids: list):
+        self.support_id = support_id
+        self.event_ids = event_ids
+        super().__init__(f"Support user {support_id} already has event(s) "
+                         f"{', '.join(map(str, event_ids))} at that time.")
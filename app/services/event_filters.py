@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from sqlalchemy import or_
+
+from app.models.contract import Contract
+from app.models.event import Event
+
+
+def _contains(text: str) -> str:
+    """LIKE pattern matching text anywhere, with wildcards in text escaped"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class EventFilter:
+    """Composable filters over events, applied as a single SQL WHERE clause
+
+    Every method adds a condition and returns the filter, so criteria chain:
+    EventFilter().unassigned().starts_from(now).apply(query)
+    """
+
+    def __init__(self):
+        self.conditions = []
+        self.needs_contract = False
+
+    def unassigned(self):
+        """Events without a support contact (IS NULL, served by ix_events_unassigned)"""
+        self.conditions.append(Event.support_id.is_(None))
+        return self
+
+    def assigned(self):
+        """Events with a support contact"""
+        self.conditions.append(Event.support_id.isnot(None))
+        return self
+
+    def support(self, support_id: int):
+        """Events assigned to one support user"""
+        self.conditions.append(Event.support_id == support_id)
+        return self
+
+    def support_or_unassigned(self, support_id: int):
+        """Events assigned to one support user or to nobody"""
+        self.conditions.append(or_(Event.support_id == support_id, Event.support_id.is_(None)))
+        return self
+
+    def commercial(self, commercial_id: int):
+        """Events whose contract belongs to one commercial"""
+        self.needs_contract = True
+        self.conditions.append(Contract.commercial_id == commercial_id)
+        return self
+
+    def starts_from(self, start: datetime):
+        """Events starting at or after start"""
+        self.conditions.append(Event.date_start >= start)
+        return self
+
+    def starts_before(self, end: datetime):
+        """Events starting before end"""
+        self.conditions.append(Event.date_start < end)
+        return self
+
+    def ends_from(self, start: datetime):
+        """Events ending at or after start"""
+        self.conditions.append(Event.date_end >= start)
+        return self
+
+    def ends_before(self, end: datetime):
+        """Events ending before end"""
+        self.conditions.append(Event.date_end < end)
+        return self
+
+    def location(self, text: str):
+        """Events whose location contains text, case-insensitive"""
+        self.conditions.append(Event.location.ilike(_contains(text), escape="\\"))
+        return self
+
+    def text(self, text: str):
+        """Events whose name or notes contain text, case-insensitive"""
+        pattern = _contains(text)
+        self.conditions.append(or_(Event.name.ilike(pattern, escape="\\"),
+                                   Event.notes.ilike(pattern, escape="\\")))
+        return self
+
+    def apply(self, query):
+        """Add the joins and conditions of this filter to an events query"""
+        if self.needs_contract:
+            query = query.join(Contract, Contract.id == Event.contract_id)
+        if self.conditions:
+            query = query.filter(*self.conditions)
+        return query
+
+    @classmethod
+    def from_dict(cls, filters: dict) -> "EventFilter":
+        """Build a filter from the criteria dict produced by the events view"""
+        event_filter = cls()
+
+        for filter_key, filter_value in filters.items():
+            if filter_key == "support_contact_id":
+                if filter_value is None:
+                    event_filter.unassigned()
+                else:
+                    event_filter.support(filter_value)
+            elif filter_key == "support_contact_id_not_null":
+                event_filter.assigned()
+            elif filter_key == "commercial_contact_id":
+                event_filter.commercial(filter_value)
+            elif filter_key == "start_date_gte":
+                event_filter.starts_from(filter_value)
+            elif filter_key == "start_date_lt":
+                event_filter.starts_before(filter_value)
+            elif filter_key == "end_date_gte":
+                event_filter.ends_from(filter_value)
+            elif filter_key == "end_date_lt":
+                event_filter.ends_before(filter_value)
+            elif filter_key == "location":
+                event_filter.location(filter_value)
+            elif filter_key == "text":
+                event_filter.text(filter_value)
+            else:
+                raise ValueError(f"Unknown event filter: {filter_key}")
+
+        return event_filter
@@ -1,10 +1,24 @@
+from itertools import islice
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import case, select, update
 from sqlalchemy.orm import Session, joinedload
 
+from app.models.client import Client
 from app.models.contract import Contract
 from app.models.event import Event
 from app.models.user import User, UserRole
+from app.services.errors import NotFoundError
+from app.services.event_filters import EventFilter
+from app.services.cache import get_staff_by_role
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from app.services.schedule_service import check_event_schedule, plan_assignments
+from app.services.versioning import apply_changes, loaded_instance, update_returning
+from app.utils.config import env_int
 from datetime import datetime
 
+DEFAULT_ASSIGN_BATCH_SIZE = 1000
+
 
 def create_event(db: Session, client_id: int, contract_id: int, name: str, start: datetime, end: datetime,
                  location: str, attendees: int, notes: str) -> Event:
@@ -25,20 +39,27 @@ def create_event(db: Session, client_id: int, contract_id: int, name: str, start
 
 
 def assign_support_to_event(db: Session, event_id: int, support_user_id: int) -> Event:
-    event = db.query(Event).filter_by(id=event_id).first()
-    event.support_id = support_user_id
-    db.commit()
-    return event
+    """Assign a support user to an event, a concurrent change of the event raising StaleDataError"""
+    check_event_schedule(db, event_id, {'support_id': support_user_id})
+    event = db.get(Event, event_id)
+    if event is None:
+        raise NotFoundError("Event", event_id)
+    return apply_changes(db, event, {'support_id': support_user_id})
 
 
 def update_event(db: Session, event_id: int, updater: User, **fields) -> Event:
-    event = db.query(Event).filter_by(id=event_id).first()
-    if updater.role == UserRole.SUPPORT and event.support_id != updater.id:
-        raise PermissionError("You can only update your assigned events.")
-    for key, value in fields.items():
-        setattr(event, key, value)
-    db.commit()
-    return event
+    """Update an event, in a single UPDATE ... RETURNING unless the session already holds it"""
+    refusal = PermissionError("You can only update your assigned events.")
+    owner_id = updater.id if updater.role == UserRole.SUPPORT else None
+    event = loaded_instance(db, Event, event_id)
+    if event is not None and owner_id is not None and event.support_id != owner_id:
+        raise refusal
+    # Restricted to the updater's own events, the check cannot reveal the schedule of other supports
+    check_event_schedule(db, event_id, fields, owner_id)
+    if event is None:
+        ownership = [Event.support_id == owner_id] if owner_id is not None else []
+        return update_returning(db, Event, event_id, fields, *ownership, permission_error=refusal)
+    return apply_changes(db, event, fields)
 
 
 def list_unassigned_events(db: Session):
@@ -53,33 +74,41 @@ def get_all_events(db: Session):
     return db.query(Event).all()
 
 
+def get_events_page(db: Session, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of events after the given event id"""
+    return keyset_page(db.query(Event), Event.id, after_id, limit)
+
+
 def get_events_with_details(db: Session):
     return db.query(Event).options(joinedload(Event.contract).joinedload(Contract.client),
                                    joinedload(Event.support_contact)).all()
 
 
+def get_events_with_details_page(db: Session, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of events with their contract, client and support loaded"""
+    query = db.query(Event).options(joinedload(Event.contract).joinedload(Contract.client),
+                                    joinedload(Event.support_contact))
+    return keyset_page(query, Event.id, after_id, limit)
+
+
+def get_events_export_query(db: Session, filters: dict = None):
+    """Query events as flat rows with client and support names, for streaming exports"""
+    query = db.query(
+        Event.id, Event.name, Event.contract_id, Event.client_id,
+        Client.full_name.label("client_name"), Event.support_id, User.name.label("support_name"),
+        Event.date_start, Event.date_end, Event.location, Event.attendees, Event.notes,
+    ).join(Client, Client.id == Event.client_id).outerjoin(User, User.id == Event.support_id)
+    if filters:
+        query = EventFilter.from_dict(filters).apply(query)
+    return query.order_by(Event.id)
+
+
 def get_filtered_events(db: Session, filters: dict):
     query = db.query(Event).options(
         joinedload(Event.contract).joinedload(Contract.client),
         joinedload(Event.support_contact)
     )
-
-    for filter_key, filter_value in filters.items():
-        if filter_key == "support_contact_id":
-            if filter_value is None:
-                query = query.filter(Event.support_id is None)
-            else:
-                query = query.filter(Event.support_id == filter_value)
-        elif filter_key == "support_contact_id_not_null":
-            query = query.filter(Event.support_id is not None)
-        elif filter_key == "commercial_contact_id":
-            query = query.join(Contract).filter(Contract.commercial_id == filter_value)
-        elif filter_key == "start_date_gte":
-            query = query.filter(Event.date_start >= filter_value)
-        elif filter_key == "end_date_lt":
-            query = query.filter(Event.date_end < filter_value)
-
-    return query.all()
+    return EventFilter.from_dict(filters).apply(query).all()
 
 
 def get_signed_contracts_for_commercial(db: Session, commercial_id: int):
@@ -90,13 +119,14 @@ def get_signed_contracts_for_commercial(db: Session, commercial_id: int):
 
 def get_contract_by_id(db: Session, contract_id: int):
     """Get a contract by its ID"""
-    return db.query(Contract).filter_by(id=contract_id).first()
+    return db.get(Contract, contract_id)
 
 
 def get_events_for_support_user(db: Session, support_user_id: int):
     """Get events that a support user can update (assigned to them or unassigned)"""
-    return db.query(Event).filter((Event.support_id == support_user_id) | (Event.support_id is None)).options(
-        joinedload(Event.contract).joinedload(Contract.client), joinedload(Event.support_contact)).all()
+    query = db.query(Event).options(joinedload(Event.contract).joinedload(Contract.client),
+                                    joinedload(Event.support_contact))
+    return EventFilter().support_or_unassigned(support_user_id).apply(query).all()
 
 
 def get_all_events_for_management(db: Session):
@@ -106,5 +136,79 @@ def get_all_events_for_management(db: Session):
 
 
 def get_support_users(db: Session):
-    """Get all support users"""
-    return db.query(User).filter_by(role=UserRole.SUPPORT).all()
+    """Get all support users (cached, see get_staff_by_role)"""
+    return get_staff_by_role(db, UserRole.SUPPORT)
+
+
+def get_assign_batch_size() -> int:
+    """Get the number of events assigned per statement from ASSIGN_BATCH_SIZE"""
+    batch_size = env_int("ASSIGN_BATCH_SIZE", DEFAULT_ASSIGN_BATCH_SIZE)
+    if batch_size < 1:
+        raise ValueError(f"ASSIGN_BATCH_SIZE must be positive, got {batch_size}")
+    return batch_size
+
+
+def _check_assigner(db: Session, updater: User, support_ids: Iterable[Optional[int]]):
+    """Only management assigns, and only to support users (None unassigns)"""
+    if updater.role != UserRole.GESTION:
+        raise PermissionError("Only management can assign support staff.")
+    supports = {support.id for support in get_support_users(db)}
+    for support_id in support_ids:
+        if support_id is not None and support_id not in supports:
+            raise ValueError(f"User {support_id} is not a support user.")
+
+
+def _assignment(support_id):
+    """SET clause of an assignment, bumping the version so that edits loaded before it become stale"""
+    return {'support_id': support_id, 'version': Event.version + 1}
+
+
+def assign_supports(db: Session, assignments: Iterable[Tuple[int, Optional[int]]], updater: User,
+                    batch_size: int = None) -> dict:
+    """Assign support users to many events, one UPDATE ... CASE and one transaction per batch
+
+    assignments yields (event_id, support_id) pairs, the last pair of an event
+    in a batch wins. Each batch is first checked against the supports'
+    schedules (see plan_assignments): assignments overlapping another event of
+    the same support are skipped. Returns the number of requested and updated
+    events, the ids that matched no event and the conflicts.
+    """
+    batch_size = batch_size or get_assign_batch_size()
+    report = {'requested': 0, 'updated': 0, 'batches': 0, 'missing': [], 'conflicts': {}}
+    iterator = iter(assignments)
+    while batch := dict(islice(iterator, batch_size)):
+        _check_assigner(db, updater, set(batch.values()))
+        accepted, conflicts = plan_assignments(db, batch)
+        updated = set()
+        if accepted:
+            statement = update(Event).where(Event.id.in_(accepted)) \
+                .values(_assignment(case(accepted, value=Event.id))) \
+                .returning(Event.id).execution_options(synchronize_session="fetch")
+            updated = set(db.scalars(statement).all())
+        db.commit()
+        report['requested'] += len(batch)
+        report['updated'] += len(updated)
+        report['batches'] += 1
+        report['missing'].extend(event_id for event_id in accepted if event_id not in updated)
+        report['conflicts'].update(conflicts)
+    return report
+
+
+def assign_support_matching(db: Session, filters: dict, support_id: Optional[int], updater: User) -> dict:
+    """Assign one support user to the events matching the filters, in a single UPDATE
+
+    Events are taken in start order and skipped when they overlap one already
+    in the support's schedule. Returns the number of matched and updated events
+    and the conflicts.
+    """
+    _check_assigner(db, updater, [support_id])
+    matching = EventFilter.from_dict(filters).apply(select(Event.id, Event.date_start, Event.date_end))
+    periods = {event_id: (start, end) for event_id, start, end in db.execute(matching.order_by(Event.date_start))}
+    accepted, conflicts = plan_assignments(db, dict.fromkeys(periods, support_id), periods)
+    updated = 0
+    if accepted:
+        statement = update(Event).where(Event.id.in_(accepted)).values(_assignment(support_id)) \
+            .execution_options(synchronize_session="fetch")
+        updated = db.execute(statement).rowcount
+    db.commit()
+    return {'matched': len(periods), 'updated': updated, 'conflicts': conflicts}
@@ -0,0 +1,150 @@
+import csv
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator, List, Sequence
+
+from sqlalchemy import types
+from sqlalchemy.orm import Query, Session
+
+from app.services.client_service import get_clients_export_query
+from app.services.contract_service import get_contracts_export_query
+from app.services.event_service import get_events_export_query
+from app.utils.config import env_int
+
+DEFAULT_CHUNK_SIZE = 5000
+
+EXPORTS = {
+    'clients': get_clients_export_query,
+    'contracts': get_contracts_export_query,
+    'events': get_events_export_query,
+}
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def get_chunk_size() -> int:
+    """Get the number of rows fetched per round trip from EXPORT_CHUNK_SIZE"""
+    chunk_size = env_int("EXPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    if chunk_size < 1:
+        raise ValueError(f"EXPORT_CHUNK_SIZE must be positive, got {chunk_size}")
+    return chunk_size
+
+
+def get_format(path, fmt: str = None) -> str:
+    """Get the export format, from the file extension when not given"""
+    fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+    if fmt == "ndjson":
+        fmt = "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt or path} (expected csv, jsonl or parquet)")
+    return fmt
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _write_csv(path: Path, columns: List[str], column_types: list, chunks: Iterable[Sequence]) -> int:
+    count = 0
+    with path.open("w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_jsonl(path: Path, columns: List[str], column_types: list, chunks: Iterable[Sequence]) -> int:
+    count = 0
+    with path.open("w", encoding="utf-8") as file:
+        for chunk in chunks:
+            file.writelines(
+                json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+                for row in chunk
+            )
+            count += len(chunk)
+    return count
+
+
+def _arrow_type(pa, column_type):
+    """Arrow type of a SQL column, so every chunk shares the same schema"""
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Numeric) and column_type.asdecimal and column_type.precision:
+        return pa.decimal128(column_type.precision, column_type.scale or 0)
+    if isinstance(column_type, types.Numeric):
+        return pa.float64()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _write_parquet(path: Path, columns: List[str], column_types: list, chunks: Iterable[Sequence]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install -r requirements.txt)")
+
+    schema = pa.schema([(name, _arrow_type(pa, column_type)) for name, column_type in zip(columns, column_types)])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            count += len(chunk)
+    return count
+
+
+WRITERS = {
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+    'parquet': _write_parquet,
+}
+
+
+def stream_chunks(db: Session, query: Query, chunk_size: int) -> Iterator[list]:
+    """Run a query on a server-side cursor and yield its rows chunk_size at a time"""
+    result = db.execute(query.statement, execution_options={'yield_per': chunk_size})
+    for partition in result.partitions():
+        yield partition
+
+
+def export_query(db: Session, query: Query, path, fmt: str = None, chunk_size: int = None) -> dict:
+    """Write the rows of a column query to a file without holding more than one chunk in memory"""
+    path = Path(path)
+    fmt = get_format(path, fmt)
+    chunk_size = chunk_size or get_chunk_size()
+    columns = [description['name'] for description in query.column_descriptions]
+    column_types = [description['type'] for description in query.column_descriptions]
+
+    start = time.perf_counter()
+    count = WRITERS[fmt](path, columns, column_types, stream_chunks(db, query, chunk_size))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'path': str(path),
+        'format': fmt,
+        'rows': count,
+        'elapsed': elapsed,
+        'rows_per_second': count / elapsed if elapsed else 0.0,
+    }
+
+
+def export_table(db: Session, entity: str, path, fmt: str = None, chunk_size: int = None, **options) -> dict:
+    """Export clients, contracts or events, see export_query"""
+    if entity not in EXPORTS:
+        raise ValueError(f"Unknown export entity: {entity}")
+    return export_query(db, EXPORTS[entity](db, **options), path, fmt, chunk_size)
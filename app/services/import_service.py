@@ -0,0 +1,328 @@
+import csv
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import UserRole
+from app.services.cache import get_staff_by_role
+from app.services.schedule_service import plan_assignments
+from app.utils.config import env_int
+from app.utils.money import to_money
+from app.utils.validators import validate_client_data, validate_event_data
+
+DEFAULT_BATCH_SIZE = 1000
+
+TRUE_VALUES = {"1", "true", "yes", "oui", "y", "o"}
+FALSE_VALUES = {"", "0", "false", "no", "non", "n"}
+
+
+def get_batch_size() -> int:
+    """Get the number of rows inserted per statement from IMPORT_BATCH_SIZE"""
+    batch_size = env_int("IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    if batch_size < 1:
+        raise ValueError(f"IMPORT_BATCH_SIZE must be positive, got {batch_size}")
+    return batch_size
+
+
+class RecordError(ValueError):
+    """A line that could not be read, stands in for its record so it is reported as a row error"""
+
+
+def read_records(path) -> Iterator[Tuple[int, dict]]:
+    """Stream (line number, record) pairs from a .csv or .jsonl file
+
+    A JSONL line that is not valid JSON gives a RecordError instead of a record,
+    the lines after it are still read.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with path.open(newline="", encoding="utf-8-sig") as file:
+        if suffix == ".csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+        elif suffix in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, RecordError(f"JSON invalide: {e.msg} (colonne {e.colno}).")
+        else:
+            raise ValueError(f"Unsupported import format: {path.suffix or path.name} (expected .csv or .jsonl)")
+
+
+def _batches(records: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _text(record: dict, key: str) -> Optional[str]:
+    value = record.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _split_invalid(batch: list) -> Tuple[list, list]:
+    """Separate the records from the lines that could not be read or are not objects"""
+    records, errors = [], []
+    for line_number, record in batch:
+        if isinstance(record, RecordError):
+            errors.append((line_number, str(record)))
+        elif not isinstance(record, dict):
+            errors.append((line_number, f"Enregistrement invalide: objet attendu, {type(record).__name__} reçu."))
+        else:
+            records.append((line_number, record))
+    return records, errors
+
+
+def _parse_date(value) -> Optional[date]:
+    if value in (None, ""):
+        return None
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value in (None, ""):
+        return None
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def _parse_amount(value) -> Optional[Decimal]:
+    if value in (None, ""):
+        return None
+    return to_money(value)
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value or "").strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Booléen invalide: {value!r}")
+
+
+def _staff_ids(db: Session, role: UserRole) -> dict:
+    """Map staff emails to user ids (read through the staff cache)"""
+    return {user.email.lower(): user.id for user in get_staff_by_role(db, role)}
+
+
+def _resolve_staff(record: dict, key: str, staff: dict, default: Optional[int]) -> Optional[int]:
+    email = _text(record, key)
+    if email is None:
+        return default
+    if email.lower() not in staff:
+        raise ValueError(f"Utilisateur inconnu: {email}")
+    return staff[email.lower()]
+
+
+def _prepare_clients(db: Session, batch: list, commercial_email: Optional[str] = None):
+    """Turn client records into insert rows, keyed by the commercial email"""
+    staff = _staff_ids(db, UserRole.COMMERCIAL)
+    default_commercial = _resolve_staff({'email': commercial_email}, 'email', staff, None)
+    today = date.today()
+    rows, errors = [], []
+
+    for line_number, record in batch:
+        try:
+            data = {key: _text(record, key) for key in ('full_name', 'email', 'phone', 'company_name')}
+            errors_found = validate_client_data(data)
+            if errors_found:
+                raise ValueError(" ".join(errors_found))
+            commercial_id = _resolve_staff(record, 'commercial_email', staff, default_commercial)
+            if commercial_id is None:
+                raise ValueError("Commercial manquant (colonne commercial_email).")
+            rows.append({
+                **data,
+                'date_created': _parse_date(record.get('date_created')) or today,
+                'last_contact': _parse_date(record.get('last_contact')) or today,
+                'commercial_id': commercial_id,
+            })
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+    return rows, errors
+
+
+def _prepare_contracts(db: Session, batch: list):
+    """Turn contract records into insert rows, keyed by the client email"""
+    staff = _staff_ids(db, UserRole.COMMERCIAL)
+    emails = {(_text(record, 'client_email') or '').lower() for _, record in batch}
+    clients = {
+        email.lower(): (client_id, commercial_id)
+        for client_id, email, commercial_id in db.query(Client.id, Client.email, Client.commercial_id)
+        .filter(func.lower(Client.email).in_(emails))
+    }
+    rows, errors = [], []
+
+    for line_number, record in batch:
+        try:
+            client_email = _text(record, 'client_email')
+            if client_email is None or client_email.lower() not in clients:
+                raise ValueError(f"Client inconnu: {client_email}")
+            client_id, client_commercial_id = clients[client_email.lower()]
+            total_amount = _parse_amount(record.get('total_amount'))
+            if total_amount is None:
+                raise ValueError("Le montant total est obligatoire.")
+            amount_due = _parse_amount(record.get('amount_due'))
+            rows.append({
+                'client_id': client_id,
+                'commercial_id': _resolve_staff(record, 'commercial_email', staff, client_commercial_id),
+                'total_amount': total_amount,
+                'amount_due': total_amount if amount_due is None else amount_due,
+                'is_signed': _parse_bool(record.get('is_signed')),
+                'date_created': _parse_date(record.get('date_created')) or date.today(),
+            })
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+    return rows, errors
+
+
+def _prepare_events(db: Session, batch: list):
+    """Turn event records into insert rows, the client coming from the contract
+
+    Rows giving a support are checked against the support's schedule, see _check_schedules.
+    """
+    staff = _staff_ids(db, UserRole.SUPPORT)
+    contract_ids = set()
+    for _, record in batch:
+        try:
+            contract_ids.add(int(record.get('contract_id')))
+        except (TypeError, ValueError):
+            pass
+    contracts = dict(db.query(Contract.id, Contract.client_id).filter(Contract.id.in_(contract_ids)))
+    rows, errors = {}, []
+
+    for line_number, record in batch:
+        try:
+            contract_id = int(record.get('contract_id') or 0)
+            if contract_id not in contracts:
+                raise ValueError(f"Contrat inconnu: {record.get('contract_id')}")
+            data = {
+                'name': _text(record, 'name'),
+                'start_date': _parse_datetime(record.get('date_start')),
+                'end_date': _parse_datetime(record.get('date_end')),
+            }
+            if data['start_date'] is None or data['end_date'] is None:
+                raise ValueError("Les dates de début et de fin sont obligatoires.")
+            errors_found = validate_event_data(data)
+            if errors_found:
+                raise ValueError(" ".join(errors_found))
+            attendees = record.get('attendees')
+            rows[line_number] = {
+                'name': data['name'],
+                'contract_id': contract_id,
+                'client_id': contracts[contract_id],
+                'support_id': _resolve_staff(record, 'support_email', staff, None),
+                'date_start': data['start_date'],
+                'date_end': data['end_date'],
+                'location': _text(record, 'location'),
+                'attendees': 0 if attendees in (None, "") else int(attendees),
+                'notes': _text(record, 'notes'),
+            }
+        except (TypeError, ValueError) as e:
+            errors.append((line_number, str(e)))
+    return _check_schedules(db, rows, errors)
+
+
+def _check_schedules(db: Session, rows: dict, errors: list):
+    """Reject the event rows overlapping an event of their support, stored or in an earlier row of the file"""
+    # Rows have no id yet: they are planned under their line label, which stored event ids cannot collide with
+    labels = {f"ligne {line_number}": line_number for line_number in rows}
+    assignments = {label: rows[line_number]['support_id'] for label, line_number in labels.items()
+                   if rows[line_number]['support_id'] is not None}
+    if assignments:
+        periods = {label: (rows[labels[label]]['date_start'], rows[labels[label]]['date_end'])
+                   for label in assignments}
+        _, conflicts = plan_assignments(db, assignments, periods)
+        for label, overlapping in conflicts.items():
+            events = ", ".join(key if isinstance(key, str) else f"événement {key}" for key in overlapping)
+            errors.append((labels[label], f"Conflit de planning du support: {events}."))
+            del rows[labels[label]]
+    return list(rows.values()), errors
+
+
+IMPORTERS = {
+    'clients': (Client, _prepare_clients),
+    'contracts': (Contract, _prepare_contracts),
+    'events': (Event, _prepare_events),
+}
+
+
+def import_records(db: Session, entity: str, records: Iterable[Tuple[int, dict]], batch_size: int = None,
+                   on_batch: Callable[[dict], None] = None, **options) -> dict:
+    """Insert records in batches, one executemany INSERT and one transaction per batch
+
+    Invalid rows are reported and skipped; a batch refused by the database is
+    rolled back and reported as a whole, the following batches are still imported.
+    on_batch receives the report of each batch as soon as it is committed.
+    """
+    if entity not in IMPORTERS:
+        raise ValueError(f"Unknown import entity: {entity}")
+    model, prepare = IMPORTERS[entity]
+    batch_size = batch_size or get_batch_size()
+
+    report = {'rows': 0, 'inserted': 0, 'rejected': 0, 'batches': 0, 'errors': []}
+    start = time.perf_counter()
+
+    for number, batch in enumerate(_batches(records, batch_size), 1):
+        batch_start = time.perf_counter()
+        records, errors = _split_invalid(batch)
+        rows, row_errors = prepare(db, records, **options) if records else ([], [])
+        errors = sorted(errors + row_errors, key=lambda error: error[0])
+        batch_error = None
+        if rows:
+            try:
+                db.execute(insert(model), rows)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                batch_error = str(e.orig if getattr(e, 'orig', None) is not None else e).strip()
+                rows = []
+
+        elapsed = time.perf_counter() - batch_start
+        batch_report = {
+            'batch': number,
+            'first_line': batch[0][0],
+            'last_line': batch[-1][0],
+            'inserted': len(rows),
+            'rejected': len(batch) - len(rows),
+            'errors': errors,
+            'batch_error': batch_error,
+            'rows_per_second': len(batch) / elapsed if elapsed else 0.0,
+        }
+        report['rows'] += len(batch)
+        report['inserted'] += batch_report['inserted']
+        report['rejected'] += batch_report['rejected']
+        report['batches'] += 1
+        report['errors'].extend(errors)
+        if batch_error:
+            report['errors'].append((batch_report['first_line'], f"Lot {number} annulé: {batch_error}"))
+        if on_batch:
+            on_batch(batch_report)
+
+    report['elapsed'] = time.perf_counter() - start
+    report['rows_per_second'] = report['rows'] / report['elapsed'] if report['elapsed'] else 0.0
+    return report
+
+
+def import_file(db: Session, entity: str, path, batch_size: int = None,
+                on_batch: Callable[[dict], None] = None, **options) -> dict:
+    """Stream a CSV or JSONL file into the database, see import_records"""
+    return import_records(db, entity, read_records(path), batch_size, on_batch, **options)
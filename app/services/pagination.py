@@ -0,0 +1,51 @@
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List
+
+from app.db.instrumentation import PAGED
+from app.db.unit_of_work import KEEP_LOADED
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def keyset_select(query, id_column, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Restrict a Query or select() to the rows following after_id, ordered by id"""
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    return query.order_by(id_column).limit(limit)
+
+
+def keyset_page(query, id_column, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE) -> List:
+    """Get the rows following after_id, ordered by id (keyset pagination)
+
+    The rows are not kept by a unit of work: a listing streamed page by page
+    only holds the current page. The query is marked PAGED, running it once per
+    page is not an N+1 pattern.
+    """
+    page = keyset_select(query, id_column, after_id, limit)
+    return page.execution_options(**{KEEP_LOADED: False, PAGED: True}).all()
+
+
+def iter_pages(fetch_page: Callable[..., List], page_size: int = DEFAULT_PAGE_SIZE) -> Iterator:
+    """Iterate over a whole listing, fetching it one page at a time
+
+    fetch_page is called with after_id and limit keyword arguments, as the
+    *_page service functions accept.
+    """
+    after_id = None
+    while True:
+        page = fetch_page(after_id=after_id, limit=page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1].id
+
+
+async def aiter_pages(fetch_page: Callable[..., Awaitable[List]], page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator:
+    """Async counterpart of iter_pages, for the *_page functions of app.services.aio"""
+    after_id = None
+    while True:
+        page = await fetch_page(after_id=after_id, limit=page_size)
+        for row in page:
+            yield row
+        if len(page) < page_size:
+            return
+        after_id = page[-1].id
@@ -0,0 +1,64 @@
+from sqlalchemy import Float, case, cast, func
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.user import User
+
+
+def _contract_aggregates() -> list:
+    """Aggregate columns shared by every contract report"""
+    total_value = func.coalesce(func.sum(Contract.total_amount), 0)
+    outstanding = func.coalesce(func.sum(Contract.amount_due), 0)
+    signed_count = func.coalesce(func.sum(case((Contract.is_signed == True, 1), else_=0)), 0)  # noqa: E712
+
+    return [
+        func.count(Contract.id).label("contract_count"),
+        total_value.label("total_value"),
+        outstanding.label("outstanding"),
+        signed_count.label("signed_count"),
+        (func.count(Contract.id) - signed_count).label("unsigned_count"),
+        # Share of the contract value already paid, NULL when there is no value. A ratio rather than
+        # money, so computed in floating point (SQLite would otherwise divide whole amounts as integers)
+        (cast(total_value - outstanding, Float) / func.nullif(total_value, 0)).label("paid_ratio"),
+    ]
+
+
+def _month_of(db: Session, column):
+    """SQL expression formatting a date column as YYYY-MM"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def get_contract_totals(db: Session):
+    """Get the totals over all contracts as a single row"""
+    return db.query(*_contract_aggregates()).one()
+
+
+def get_contract_totals_by_commercial(db: Session):
+    """Get the contract totals of each commercial, computed by the database"""
+    return db.query(Contract.commercial_id, User.name.label("commercial_name"), *_contract_aggregates()) \
+        .join(User, User.id == Contract.commercial_id) \
+        .group_by(Contract.commercial_id, User.name) \
+        .order_by(User.name) \
+        .all()
+
+
+def get_contract_totals_by_client(db: Session, commercial_id: int = None):
+    """Get the contract totals of each client, optionally for one commercial only"""
+    query = db.query(Contract.client_id, Client.full_name.label("client_name"), *_contract_aggregates()) \
+        .join(Client, Client.id == Contract.client_id)
+    if commercial_id is not None:
+        query = query.filter(Contract.commercial_id == commercial_id)
+    return query.group_by(Contract.client_id, Client.full_name).order_by(Client.full_name).all()
+
+
+def get_contract_totals_by_month(db: Session):
+    """Get the contract totals per creation month (YYYY-MM)"""
+    month = _month_of(db, Contract.date_created).label("month")
+    return db.query(month, *_contract_aggregates()) \
+        .filter(Contract.date_created.isnot(None)) \
+        .group_by(month) \
+        .order_by(month) \
+        .all()
@@ -0,0 +1,196 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.models.event import Event
+from app.models.user import User
+from app.services.errors import ScheduleConflictError
+
+SCHEDULE_FIELDS = {'support_id', 'date_start', 'date_end'}
+
+
+def overlaps(events, start, end, dialect_name: str):
+    """Condition on events running during [start, end)
+
+    On PostgreSQL it is written as the range overlap served by the GiST index
+    ix_events_support_period, elsewhere as two comparisons served by the
+    (support_id, date_start) index.
+    """
+    if dialect_name == "postgresql":
+        return func.tsrange(events.date_start, events.date_end).op("&&")(func.tsrange(start, end))
+    return and_(events.date_start < end, events.date_end > start)
+
+
+def find_conflicts(db: Session, support_id: int, start: datetime, end: datetime,
+                   exclude_event_id: int = None) -> List[Event]:
+    """Get the events of a support user overlapping [start, end)"""
+    query = select(Event).where(Event.support_id == support_id,
+                                overlaps(Event, start, end, db.get_bind().dialect.name))
+    if exclude_event_id is not None:
+        query = query.where(Event.id != exclude_event_id)
+    return list(db.scalars(query.order_by(Event.date_start)))
+
+
+def is_support_free(db: Session, support_id: int, start: datetime, end: datetime,
+                    exclude_event_id: int = None) -> bool:
+    """Check that a support user has no event between start and end, one index lookup"""
+    return not find_conflicts(db, support_id, start, end, exclude_event_id)
+
+
+def changes_schedule(fields: dict) -> bool:
+    """Whether updating fields can give the event's support an overlapping event"""
+    return bool(SCHEDULE_FIELDS & fields.keys()) and fields.get('support_id', 0) is not None
+
+
+def lock_support_query(event_id: int, fields: dict):
+    """SELECT ... FOR UPDATE of the support whose schedule the update changes
+
+    Held until the update commits, the lock serializes the transactions checking
+    the same support, so two of them cannot both find the schedule free and
+    double-book it. SQLite has no row locks: it only lets one transaction write
+    at a time, a writer that read before another one committed is refused.
+    """
+    stored_support = select(Event.support_id).where(Event.id == event_id).scalar_subquery()
+    return select(User.id).where(User.id == fields.get('support_id', stored_support)).with_for_update()
+
+
+def schedule_conflicts_query(event_id: int, fields: dict, dialect_name: str, owner_id: int = None):
+    """Query the events the update of fields would overlap for the event's support, None if it cannot
+
+    The values the update does not change are read from the stored event in the
+    same query, so checking costs a single SELECT whether the event is loaded or not.
+    With owner_id, only an event of that support is checked: the schedule of
+    other supports is not revealed to someone who may not update the event.
+    """
+    if not changes_schedule(fields):
+        return None
+    stored = aliased(Event)
+    support_id = fields.get('support_id', stored.support_id)
+    start, end = fields.get('date_start', stored.date_start), fields.get('date_end', stored.date_end)
+    query = select(Event.id, Event.support_id).join(stored, stored.id == event_id).where(
+        Event.id != event_id, Event.support_id == support_id, overlaps(Event, start, end, dialect_name))
+    if owner_id is not None:
+        query = query.where(stored.support_id == owner_id)
+    return query
+
+
+def _raise_conflicts(conflicts: list):
+    if conflicts:
+        raise ScheduleConflictError(conflicts[0].support_id, [row.id for row in conflicts])
+
+
+def check_event_schedule(db: Session, event_id: int, fields: dict, owner_id: int = None):
+    """Refuse an update that would give the event's support two events at once
+
+    The support stays locked until the caller commits the update (see lock_support_query).
+    """
+    query = schedule_conflicts_query(event_id, fields, db.get_bind().dialect.name, owner_id)
+    if query is not None:
+        db.execute(lock_support_query(event_id, fields))
+        _raise_conflicts(db.execute(query).all())
+
+
+async def check_event_schedule_async(db: AsyncSession, event_id: int, fields: dict, owner_id: int = None):
+    """Refuse an update that would give the event's support two events at once, as check_event_schedule"""
+    query = schedule_conflicts_query(event_id, fields, db.get_bind().dialect.name, owner_id)
+    if query is not None:
+        await db.execute(lock_support_query(event_id, fields))
+        _raise_conflicts((await db.execute(query)).all())
+
+
+class BusySchedule:
+    """In-memory index of the time a support user is busy, for checking many assignments at once
+
+    Events are grouped into disjoint blocks of overlapping events, kept sorted:
+    block starts and ends are then both ordered, so the blocks overlapping a
+    period are found by two binary searches. For n events:
+    - is_free is O(log n)
+    - conflicts is O(log n + k), k being the number of events in the blocks
+      found, which can include events of the block outside the period
+    - add is O(n): inserting into the sorted lists shifts the blocks after it,
+      a memory move, cheap next to the database round trip of a batch
+    """
+
+    def __init__(self, events: Iterable[Tuple[int, datetime, datetime]] = ()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.blocks: List[List[Tuple[int, datetime, datetime]]] = []
+        for event_id, start, end in sorted(events, key=lambda event: event[1]):
+            self.add(event_id, start, end)
+
+    def _overlapping_blocks(self, start: datetime, end: datetime) -> Tuple[int, int]:
+        return bisect_right(self.ends, start), bisect_left(self.starts, end)
+
+    def conflicts(self, start: datetime, end: datetime, exclude_event_id: int = None) -> List[int]:
+        """Ids of the events overlapping [start, end)"""
+        first, last = self._overlapping_blocks(start, end)
+        return [event_id for block in self.blocks[first:last] for event_id, event_start, event_end in block
+                if event_start < end and event_end > start and event_id != exclude_event_id]
+
+    def is_free(self, start: datetime, end: datetime, exclude_event_id: int = None) -> bool:
+        """Check that no event overlaps [start, end)"""
+        if exclude_event_id is not None:
+            return not self.conflicts(start, end, exclude_event_id)
+        # Blocks have no gaps, a period overlapping one overlaps one of its events
+        first, last = self._overlapping_blocks(start, end)
+        return first == last
+
+    def add(self, event_id: int, start: datetime, end: datetime):
+        """Add an event, merging the blocks it overlaps"""
+        first, last = self._overlapping_blocks(start, end)
+        merged = [event for block in self.blocks[first:last] for event in block] + [(event_id, start, end)]
+        self.starts[first:last] = [min([start] + self.starts[first:last])]
+        self.ends[first:last] = [max([end] + self.ends[first:last])]
+        self.blocks[first:last] = [merged]
+
+
+def load_schedules(db: Session, support_ids: Iterable[int]) -> Dict[int, BusySchedule]:
+    """Build the busy schedule of each support user from their events, in one query"""
+    events: Dict[int, list] = {support_id: [] for support_id in support_ids if support_id is not None}
+    if events:
+        rows = db.execute(select(Event.support_id, Event.id, Event.date_start, Event.date_end)
+                          .where(Event.support_id.in_(events)))
+        for support_id, event_id, start, end in rows:
+            events[support_id].append((event_id, start, end))
+    return {support_id: BusySchedule(support_events) for support_id, support_events in events.items()}
+
+
+def event_periods(db: Session, event_ids: Iterable[int]) -> Dict[int, Tuple[datetime, datetime]]:
+    """Get the start and end of the given events, in one query"""
+    rows = db.execute(select(Event.id, Event.date_start, Event.date_end).where(Event.id.in_(list(event_ids))))
+    return {event_id: (start, end) for event_id, start, end in rows}
+
+
+def plan_assignments(db: Session, assignments: Dict[int, Optional[int]], periods: dict = None) -> Tuple[dict, dict]:
+    """Split assignments into those that keep every support's schedule free of overlaps and the conflicting ones
+
+    Returns (accepted, conflicts): accepted maps event ids to support ids,
+    conflicts maps each refused event id to the ids of the events it overlaps.
+    Assignments of the same batch are checked against each other too. periods
+    are the events' (start, end) when the caller already has them, they also
+    plan events not stored yet, keyed by anything but a stored event id.
+    """
+    periods = event_periods(db, assignments) if periods is None else periods
+    support_ids = {support_id for support_id in assignments.values() if support_id is not None}
+    if support_ids:
+        # Locked until the caller commits the batch, in id order so that batches cannot deadlock
+        db.execute(select(User.id).where(User.id.in_(support_ids)).order_by(User.id).with_for_update())
+    schedules = load_schedules(db, support_ids)
+    accepted, conflicts = {}, {}
+    for event_id, support_id in assignments.items():
+        if event_id not in periods or support_id is None:
+            accepted[event_id] = support_id
+            continue
+        start, end = periods[event_id]
+        schedule = schedules[support_id]
+        overlapping = schedule.conflicts(start, end, exclude_event_id=event_id)
+        if overlapping:
+            conflicts[event_id] = overlapping
+        else:
+            accepted[event_id] = support_id
+            schedule.add(event_id, start, end)
+    return accepted, conflicts
@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+from sqlalchemy import and_, case, func, literal, literal_column, or_, select
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from app.models.client import Client, search_vector
+from app.models.contract import Contract
+from app.models.event import Event
+from app.services.event_filters import EventFilter
+from app.utils.config import env_int
+
+DEFAULT_SEARCH_LIMIT = 20
+
+
+def get_search_limit() -> int:
+    """Get the maximum number of results of a search from SEARCH_LIMIT"""
+    limit = env_int("SEARCH_LIMIT", DEFAULT_SEARCH_LIMIT)
+    if limit < 1:
+        raise ValueError(f"SEARCH_LIMIT must be positive, got {limit}")
+    return limit
+
+
+def _terms(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _ranked(db: Session, query, entity, terms: str, limit: Optional[int], *alternatives):
+    """Keep the rows whose client matches the terms (or one of the alternatives), best matches first
+
+    On PostgreSQL a client matches on a substring, a whole word or a close
+    spelling of the terms (pg_trgm word similarity), all served by the GIN
+    indexes of the clients table, and is ranked by similarity and word rank.
+    Elsewhere every word of the terms must appear in the client, clients whose
+    name starts with the terms come first. Without terms the latest rows come first.
+    """
+    limit = limit or get_search_limit()
+    if not terms:
+        return list(db.scalars(query.order_by(entity.id.desc()).limit(limit)))
+
+    document = Client.search_document()
+    if db.get_bind().dialect.name == "postgresql":
+        words = func.plainto_tsquery(literal_column("'simple'"), terms)
+        condition = or_(document.contains(terms, autoescape=True),
+                        literal(terms).op("<%")(document),
+                        search_vector(document).op("@@")(words), *alternatives)
+        rank = func.word_similarity(terms, document) + func.ts_rank(search_vector(document), words)
+        order = [rank.desc(), entity.id]
+    else:
+        condition = or_(and_(*(document.contains(word, autoescape=True) for word in terms.split())),
+                        *alternatives)
+        order = [case((func.lower(Client.full_name).startswith(terms, autoescape=True), 0), else_=1),
+                 Client.full_name, entity.id]
+    return list(db.scalars(query.where(condition).order_by(*order).limit(limit)))
+
+
+def search_clients(db: Session, text: str = "", commercial_id: int = None, limit: int = None) -> List[Client]:
+    """Find clients by name, email, company or phone, optionally among a commercial's clients"""
+    query = select(Client).options(selectinload(Client.commercial))
+    if commercial_id is not None:
+        query = query.where(Client.commercial_id == commercial_id)
+    return _ranked(db, query, Client, _terms(text), limit)
+
+
+def search_contracts(db: Session, text: str = "", commercial_id: int = None, limit: int = None) -> List[Contract]:
+    """Find contracts by their client, optionally among a commercial's contracts"""
+    query = select(Contract).join(Contract.client).options(contains_eager(Contract.client))
+    if commercial_id is not None:
+        query = query.where(Contract.commercial_id == commercial_id)
+    return _ranked(db, query, Contract, _terms(text), limit)
+
+
+def search_events(db: Session, text: str = "", support_id: int = None, limit: int = None) -> List[Event]:
+    """Find events by name or by client, optionally among those a support user may update"""
+    terms = _terms(text)
+    query = select(Event).join(Event.client).options(
+        joinedload(Event.contract).joinedload(Contract.client), joinedload(Event.support_contact))
+    if support_id is not None:
+        query = EventFilter().support_or_unassigned(support_id).apply(query)
+    return _ranked(db, query, Event, terms, limit, func.lower(Event.name).contains(terms, autoescape=True))
@@ -6,7 +6,10 @@ from app.models.user import User, UserRole
 from app.models.client import Client
 from app.models.contract import Contract
 from app.models.event import Event
-from app.utils.password import hash_password
+from app.services.cache import invalidate_staff
+from app.services.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from app.services.versioning import loaded_instance, update_returning
+from app.utils.password import hash_password, hash_passwords
 
 
 def create_user(db: Session, name: str, email: str, role: UserRole, password: str) -> User:
@@ -14,34 +17,59 @@ def create_user(db: Session, name: str, email: str, role: UserRole, password: st
     user = User(name=name, email=email, role=role, password=hashed)
     db.add(user)
     db.commit()
+    invalidate_staff()
     db.refresh(user)
     return user
 
 
-def update_user(db: Session, user_id: int, **fields) -> User:
-    user = db.query(User).filter_by(id=user_id).first()
-    for key, value in fields.items():
-        setattr(user, key, value)
+def create_users(db: Session, users_data: list) -> list:
+    """Create several users in one transaction, hashing their passwords in parallel"""
+    hashed_passwords = hash_passwords([data['password'] for data in users_data])
+    users = [
+        User(name=data['name'], email=data['email'], role=data['role'], password=hashed)
+        for data, hashed in zip(users_data, hashed_passwords)
+    ]
+    db.add_all(users)
     db.commit()
+    invalidate_staff()
+    return users
+
+
+def update_user(db: Session, user_id: int, **fields) -> User:
+    """Update a user, in a single UPDATE ... RETURNING unless the session already holds it"""
+    user = loaded_instance(db, User, user_id)
+    if user is None:
+        user = update_returning(db, User, user_id, fields)
+    else:
+        for key, value in fields.items():
+            setattr(user, key, value)
+        db.commit()
+    invalidate_staff()
     return user
 
 
 def delete_user(db: Session, user_id: int) -> None:
-    user = db.query(User).filter_by(id=user_id).first()
+    user = db.get(User, user_id)
     db.delete(user)
     db.commit()
+    invalidate_staff()
 
 
 def list_all_users(db: Session):
     return db.query(User).all()
 
 
+def list_users_page(db: Session, after_id: int = None, limit: int = DEFAULT_PAGE_SIZE):
+    """Get the next page of users after the given user id"""
+    return keyset_page(db.query(User), User.id, after_id, limit)
+
+
 def get_user_by_email(db: Session, email: str) -> Type[User] | None:
     return db.query(User).filter_by(email=email).first()
 
 
 def get_user_by_id(db: Session, user_id: int) -> Type[User] | None:
-    return db.query(User).filter_by(id=user_id).first()
+    return db.get(User, user_id)
 
 
 def check_user_associations(db: Session, user_id: int) -> dict:
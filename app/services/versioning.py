@@ -0,0 +1,124 @@
+from typing import Callable, Optional, TypeVar, Union
+
+from sqlalchemy import inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError as OrmStaleDataError
+
+from app.services.errors import NotFoundError, StaleDataError
+
+T = TypeVar("T")
+
+
+def _set_fields(instance, fields: dict) -> dict:
+    """Set the fields on the instance, returning the values they had"""
+    seen = {key: getattr(instance, key) for key in fields}
+    for key, value in fields.items():
+        setattr(instance, key, value)
+    return seen
+
+
+def _stale_error(instance, seen: dict, fields: dict, current) -> StaleDataError:
+    """Compare what the caller saw, changed and what is now stored"""
+    changes = {key: value for key, value in fields.items() if value != seen[key]}
+    conflicts = {}
+    if current is not None:
+        conflicts = {key: (value, getattr(current, key)) for key, value in changes.items()
+                     if getattr(current, key) != seen[key] and getattr(current, key) != value}
+    return StaleDataError(type(instance).__name__, inspect(instance).identity[0], changes, conflicts, current)
+
+
+def apply_changes(db: Session, instance: T, fields: dict) -> T:
+    """Set fields on a versioned instance and commit
+
+    The UPDATE only matches the version that was loaded: if someone else saved
+    the row meanwhile nothing is overwritten and StaleDataError is raised, the
+    session then holding the current version.
+    """
+    seen = _set_fields(instance, fields)
+    try:
+        db.commit()
+    except OrmStaleDataError:
+        db.rollback()
+        current = db.get(type(instance), inspect(instance).identity, populate_existing=True)
+        raise _stale_error(instance, seen, fields, current) from None
+    return instance
+
+
+async def apply_changes_async(db: AsyncSession, instance: T, fields: dict) -> T:
+    """Set fields on a versioned instance and commit, as apply_changes"""
+    seen = _set_fields(instance, fields)
+    try:
+        await db.commit()
+    except OrmStaleDataError:
+        await db.rollback()
+        current = await db.get(type(instance), inspect(instance).identity, populate_existing=True)
+        raise _stale_error(instance, seen, fields, current) from None
+    return instance
+
+
+def loaded_instance(db: Union[Session, AsyncSession], model, entity_id: int):
+    """Get the instance the session already holds, without querying, None if it is not loaded"""
+    return db.identity_map.get(Session.identity_key(model, entity_id))
+
+
+def update_statement(model, entity_id: int, fields: dict, *conditions):
+    """UPDATE ... RETURNING the row in one statement, matching nothing unless the conditions hold
+
+    The version of a versioned model is bumped so that edits of copies loaded
+    elsewhere become stale.
+    """
+    statement = update(model).where(model.id == entity_id, *conditions).values(**fields)
+    version = model.__mapper__.version_id_col
+    if version is not None:
+        statement = statement.values({version: version + 1})
+    return statement.returning(model).execution_options(synchronize_session=False)
+
+
+def update_refusal(current, model, entity_id: int, permission_error: PermissionError) -> Exception:
+    """Explain why a direct update matched no row, given the row as it is now"""
+    if current is None or permission_error is None:
+        return NotFoundError(model.__name__, entity_id)
+    return permission_error
+
+
+def update_returning(db: Session, model, entity_id: int, fields: dict, *conditions,
+                     permission_error: PermissionError = None):
+    """Update a row that was not loaded in a single round trip, the ownership check folded into the WHERE clause
+
+    When nothing matches, the row is read once to tell a missing row
+    (NotFoundError) from one the updater may not change (permission_error).
+    """
+    instance = db.scalars(update_statement(model, entity_id, fields, *conditions)).one_or_none()
+    if instance is None:
+        db.rollback()
+        raise update_refusal(db.get(model, entity_id), model, entity_id, permission_error)
+    db.commit()
+    return instance
+
+
+async def update_returning_async(db: AsyncSession, model, entity_id: int, fields: dict, *conditions,
+                                 permission_error: PermissionError = None):
+    """Update a row that was not loaded in a single round trip, as update_returning"""
+    instance = (await db.scalars(update_statement(model, entity_id, fields, *conditions))).one_or_none()
+    if instance is None:
+        await db.rollback()
+        raise update_refusal(await db.get(model, entity_id), model, entity_id, permission_error)
+    await db.commit()
+    return instance
+
+
+def retry_on_stale(update: Callable[[dict], T], fields: dict,
+                   confirm: Callable[[StaleDataError], bool]) -> Optional[T]:
+    """Run update(fields), offering after each conflict to reapply the caller's changes on the current version
+
+    Only the fields the caller changed are reapplied, so the other changes made
+    meanwhile are kept. Returns None if the row was deleted or the retry declined.
+    """
+    while True:
+        try:
+            return update(fields)
+        except StaleDataError as e:
+            if e.deleted or not confirm(e):
+                return None
+            fields = e.changes
@@ -0,0 +1,20 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Amounts are stored as NUMERIC(12, 2): whole cents, up to 9 999 999 999.99
+MONEY_PRECISION = 12
+MONEY_SCALE = 2
+CENT = Decimal("0.01")
+
+
+def to_money(value) -> Decimal:
+    """Convert an amount (str, int, float or Decimal) to an exact Decimal rounded to the cent"""
+    if isinstance(value, float):
+        # repr gives the shortest decimal that round-trips, 0.1 stays 0.1 instead of 0.1000000000000000055...
+        value = repr(value)
+    try:
+        amount = Decimal(str(value).strip().replace(",", "."))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Montant invalide: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Montant invalide: {value!r}")
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
@@ -1,9 +1,94 @@
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from typing import Iterable, List, Optional, Tuple
+
 import bcrypt
 
+from app.utils.config import env_int, env_str
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_rounds() -> int:
+    """Get the bcrypt cost factor from BCRYPT_ROUNDS"""
+    rounds = env_int("BCRYPT_ROUNDS", DEFAULT_ROUNDS)
+    if not MIN_ROUNDS <= rounds <= MAX_ROUNDS:
+        raise ValueError(f"BCRYPT_ROUNDS must be between {MIN_ROUNDS} and {MAX_ROUNDS}, got {rounds}")
+    return rounds
+
 
-def hash_password(plain_password: str) -> str:
-    return bcrypt.hashpw(plain_password.encode(), bcrypt.gensalt()).decode()
+def hash_password(plain_password: str, rounds: int = None) -> str:
+    return bcrypt.hashpw(plain_password.encode(), bcrypt.gensalt(rounds or get_rounds())).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Get the cost factor stored in a bcrypt hash ($2b$<cost>$...), None if unreadable"""
+    parts = hashed_password.split("$")
+    if len(parts) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str, rounds: int = None) -> bool:
+    """Check if a stored hash was made with another cost than the configured one"""
+    stored_rounds = get_hash_rounds(hashed_password)
+    return stored_rounds is not None and stored_rounds != (rounds or get_rounds())
+
+
+def get_executor() -> Executor:
+    """Get the shared pool used for batch hashing and verification
+
+    PASSWORD_HASH_EXECUTOR selects "thread" (default, bcrypt releases the GIL
+    while hashing) or "process"; PASSWORD_HASH_WORKERS sets its size.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = env_int("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+            kind = env_str("PASSWORD_HASH_EXECUTOR", "thread")
+            if kind == "thread":
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            elif kind == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                raise ValueError(f"PASSWORD_HASH_EXECUTOR must be 'thread' or 'process', got {kind!r}")
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the shared hashing pool (a new one is created on next use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def hash_passwords(plain_passwords: Iterable[str], rounds: int = None) -> List[str]:
+    """Hash several passwords in parallel, results in input order"""
+    rounds = rounds or get_rounds()
+    return list(get_executor().map(hash_password, plain_passwords, repeat(rounds)))
+
+
+def verify_passwords(candidates: Iterable[Tuple[str, str]]) -> List[bool]:
+    """Verify several (plain_password, hashed_password) pairs in parallel"""
+    candidates = list(candidates)
+    plain_passwords = [plain for plain, _ in candidates]
+    hashed_passwords = [hashed for _, hashed in candidates]
+    return list(get_executor().map(verify_password, plain_passwords, hashed_passwords))
+
+
+def verify_password_async(plain_password: str, hashed_password: str) -> Future:
+    """Verify a password on the shared pool without blocking the caller"""
+    return get_executor().submit(verify_password, plain_password, hashed_password)
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.utils.config import env_float, env_str
+
+DEFAULT_TOKEN_TTL = 8 * 3600
+DEFAULT_TOKEN_FILE = "~/.epic_events_session"
+HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(signing_input: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest())
+
+
+def get_secret() -> Optional[str]:
+    """Get the signing key from SESSION_SECRET, session tokens are disabled without it"""
+    return env_str("SESSION_SECRET")
+
+
+def get_token_path() -> Path:
+    """Get the file holding the session token from SESSION_TOKEN_FILE"""
+    return Path(env_str("SESSION_TOKEN_FILE", DEFAULT_TOKEN_FILE)).expanduser()
+
+
+def password_fingerprint(hashed_password: str) -> str:
+    """Short digest of the stored hash, a password change invalidates the tokens made before it"""
+    return hashlib.sha256(hashed_password.encode()).hexdigest()[:16]
+
+
+def create_token(user_id: int, hashed_password: str, secret: str, ttl: float = None) -> str:
+    """Create a signed token (JWT layout, HMAC-SHA256) for the user, expiring after ttl seconds"""
+    now = int(time.time())
+    ttl = env_float("SESSION_TOKEN_TTL", DEFAULT_TOKEN_TTL) if ttl is None else ttl
+    payload = {"sub": user_id, "iat": now, "exp": now + int(ttl), "pwd": password_fingerprint(hashed_password)}
+    signing_input = f"{_b64encode(json.dumps(HEADER).encode())}.{_b64encode(json.dumps(payload).encode())}"
+    return f"{signing_input}.{_sign(signing_input, secret)}"
+
+
+def decode_token(token: str, secret: str) -> Optional[dict]:
+    """Get the payload of a token, None if it is malformed, forged or expired"""
+    try:
+        header, payload, signature = token.strip().split(".")
+        if not hmac.compare_digest(signature, _sign(f"{header}.{payload}", secret)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time():
+        return None
+    return claims
+
+
+def save_token(token: str, path: Path = None):
+    """Store the token in a file only readable by its owner"""
+    path = path or get_token_path()
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as file:
+        file.write(token)
+
+
+def load_token(path: Path = None) -> Optional[str]:
+    """Read the stored token, None if there is none"""
+    try:
+        return (path or get_token_path()).read_text().strip() or None
+    except OSError:
+        return None
+
+
+def has_stored_token(path: Path = None) -> bool:
+    """Check, without touching the database, whether a stored session could be restored"""
+    return bool(get_secret()) and (path or get_token_path()).is_file()
+
+
+def clear_token(path: Path = None):
+    """Remove the stored token"""
+    (path or get_token_path()).unlink(missing_ok=True)
@@ -0,0 +1,132 @@
+import atexit
+import threading
+from collections import Counter
+from contextlib import nullcontext
+
+from app.utils.config import env_float, env_int, env_str
+
+DEFAULT_TRACES_SAMPLE_RATE = 0.1
+DEFAULT_METRICS_BATCH_SIZE = 50
+
+# Everything below is a no-op until init_telemetry() has initialized Sentry: the check
+# is a module global, Sentry itself is only imported when a DSN is configured
+_enabled = False
+
+
+def _rate(name: str, default: float) -> float:
+    rate = env_float(name, default)
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+    return rate
+
+
+def get_traces_sample_rate() -> float:
+    """Get the share of actions traced from SENTRY_TRACES_SAMPLE_RATE (0.1 by default)"""
+    return _rate("SENTRY_TRACES_SAMPLE_RATE", DEFAULT_TRACES_SAMPLE_RATE)
+
+
+def make_traces_sampler(rate: float):
+    """Sampler keeping the decision of a parent trace, sampling new traces at rate"""
+    def traces_sampler(sampling_context: dict) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return float(parent_sampled)
+        return rate
+    return traces_sampler
+
+
+def init_telemetry(dsn: str = None, environment: str = None) -> bool:
+    """Initialize Sentry when a DSN is configured (SENTRY_DSN), returns whether telemetry is enabled
+
+    Errors are sent according to SENTRY_SAMPLE_RATE (all by default), traces
+    according to SENTRY_TRACES_SAMPLE_RATE.
+    """
+    global _enabled
+    dsn = dsn or env_str("SENTRY_DSN")
+    if not dsn:
+        return False
+    import sentry_sdk
+    sentry_sdk.init(
+        dsn=dsn,
+        environment=environment or env_str("ENV", "development"),
+        sample_rate=_rate("SENTRY_SAMPLE_RATE", 1.0),
+        traces_sampler=make_traces_sampler(get_traces_sample_rate()),
+    )
+    _enabled = True
+    atexit.register(metrics.flush)
+    return True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class MetricsBuffer:
+    """Thread-safe counters sent to Sentry in batches rather than one event per increment
+
+    A flush adds one breadcrumb with the counts since the previous flush and
+    keeps the running totals in the "metrics" context: both travel with the
+    next error or sampled trace, nothing is sent over the network by itself.
+    """
+
+    def __init__(self, batch_size: int = None):
+        self.batch_size = env_int("TELEMETRY_BATCH_SIZE", DEFAULT_METRICS_BATCH_SIZE) if batch_size is None \
+            else batch_size
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._totals = Counter()
+
+    def increment(self, name: str, value: int = 1):
+        """Count value occurrences of name, flushing once batch_size increments are pending"""
+        with self._lock:
+            self._pending[name] += value
+            full = sum(self._pending.values()) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Hand the pending counts to Sentry"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._totals.update(pending)
+            totals = dict(self._totals)
+        if pending and _enabled:
+            import sentry_sdk
+            sentry_sdk.add_breadcrumb(category="metrics", message="counters", level="info", data=dict(pending))
+            sentry_sdk.set_context("metrics", totals)
+
+    def totals(self) -> dict:
+        """Get the counts flushed or not"""
+        with self._lock:
+            return dict(self._totals + self._pending)
+
+
+metrics = MetricsBuffer()
+
+
+def record_event(category: str, message: str, **data):
+    """Record what the user did as a breadcrumb and a counter, instead of an event sent at once
+
+    The breadcrumb stays in memory and is attached to the next error, the
+    counter is batched by the metrics buffer.
+    """
+    if not _enabled:
+        return
+    import sentry_sdk
+    sentry_sdk.add_breadcrumb(category=category, message=message, level="info", data=data or None)
+    metrics.increment(category)
+
+
+def capture_exception(error: BaseException):
+    """Report an error to Sentry, if enabled"""
+    if _enabled:
+        import sentry_sdk
+        sentry_sdk.capture_exception(error)
+
+
+def start_transaction(name: str, op: str = "action"):
+    """Trace a block as a Sentry transaction, subject to sampling, a null context when disabled"""
+    if not _enabled:
+        return nullcontext()
+    import sentry_sdk
+    return sentry_sdk.start_transaction(op=op, name=name)
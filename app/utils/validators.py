@@ -0,0 +1,30 @@
+from typing import List
+
+
+def is_valid_email(email: str) -> bool:
+    """Basic email format check shared by the forms and the imports"""
+    return '@' in email and '.' in email
+
+
+def validate_client_data(data: dict) -> List[str]:
+    """Get the reasons why client data cannot be saved, empty if it is valid"""
+    errors = []
+    if not (data.get('full_name') or '').strip():
+        errors.append("Le nom complet est obligatoire.")
+
+    email = (data.get('email') or '').strip()
+    if not email:
+        errors.append("L'email est obligatoire.")
+    elif not is_valid_email(email):
+        errors.append("Format d'email invalide.")
+    return errors
+
+
+def validate_event_data(data: dict) -> List[str]:
+    """Get the reasons why event data cannot be saved, empty if it is valid"""
+    errors = []
+    if not (data.get('name') or '').strip():
+        errors.append("Le nom de l'événement est obligatoire.")
+    if data.get('start_date') and data.get('end_date') and data['end_date'] <= data['start_date']:
+        errors.append("La date de fin doit être postérieure à la date de début.")
+    return errors
@@ -1,5 +1,7 @@
 import click
 from app.models.user import UserRole
+from app.utils.validators import is_valid_email
+from app.views.utils_view import prompt_search
 
 
 class ClientMenuView:
@@ -51,7 +53,7 @@ class ClientMenuView:
                 return None
 
             # Validate basic email format
-            if '@' not in data['email'] or '.' not in data['email']:
+            if not is_valid_email(data['email']):
                 click.echo("❌ Format d'email invalide.")
                 return None
 
@@ -102,7 +104,7 @@ class ClientMenuView:
             new_email = click.prompt("Email", default=current_email, type=str).strip()
             if new_email and new_email != current_email:
                 # Validate basic email format
-                if '@' not in new_email or '.' not in new_email:
+                if not is_valid_email(new_email):
                     click.echo("❌ Format d'email invalide.")
                     return None
                 data['email'] = new_email
@@ -158,17 +160,14 @@ class ClientMenuView:
             return None
 
     def display_clients_list(self, clients):
-        """Display list of clients"""
+        """Display list of clients (any iterable, printed as it is consumed)"""
         click.echo()
         click.echo("📋 LISTE DES CLIENTS")
         click.echo("=" * 100)
 
-        if not clients:
-            click.echo("Aucun client trouvé.")
-            return
-
-        for i, client in enumerate(clients, 1):
-            click.echo(f"{i}. ID: {client.id}")
+        count = 0
+        for count, client in enumerate(clients, 1):
+            click.echo(f"{count}. ID: {client.id}")
             click.echo(f"   👤 {client.full_name}")
             click.echo(f"   🏢 {client.company_name or 'Entreprise non renseignée'}")
             click.echo(f"   📧 {client.email}")
@@ -188,7 +187,15 @@ class ClientMenuView:
 
             click.echo("-" * 100)
 
-        click.echo(f"\n Total: {len(clients)} client(s)")
+        if not count:
+            click.echo("Aucun client trouvé.")
+            return
+
+        click.echo(f"\n Total: {count} client(s)")
+
+    def search_client(self, search):
+        """Search clients with search(text) and let the user pick one of the results"""
+        return self.get_client_selection(search(prompt_search("un client (nom, email, entreprise, téléphone)")))
 
     def get_client_selection(self, clients):
         """Get client selection from user"""
@@ -1,5 +1,7 @@
 import click
 from app.models.user import UserRole
+from app.utils.money import to_money
+from app.views.utils_view import prompt_search
 
 
 class ContractMenuView:
@@ -26,32 +28,37 @@ class ContractMenuView:
             click.echo("3. ✏️  Modifier un contrat")
 
         click.echo("4. 🔍 Filtrer les contrats")
+
+        # COMMERCIAL and GESTION record payments
+        if current_user.role in [UserRole.COMMERCIAL, UserRole.GESTION]:
+            click.echo("5. 💳 Enregistrer un paiement")
+
         click.echo("0. ⬅️  Retour au menu principal")
         click.echo()
 
         return click.prompt("Votre choix", type=str).strip()
 
-    def get_contract_data(self, clients):
-        """Get contract data from user input"""
+    def get_contract_data(self, search_clients):
+        """Get contract data from user input, the client being found with search_clients(text)"""
         click.echo()
         click.echo("📝 CRÉATION D'UN NOUVEAU CONTRAT")
         click.echo("-" * 40)
 
         # Select client
-        client = self.get_client_selection(clients)
+        client = self.search_client(search_clients)
         if not client:
             return None
 
         try:
             data = {}
             data['client_id'] = client.id
-            data['total_amount'] = click.prompt("Montant total du contrat (€)", type=float)
+            data['total_amount'] = click.prompt("Montant total du contrat (€)", type=to_money)
 
             # Amount due defaults to total amount
             default_amount_due = data['total_amount']
             data['amount_due'] = click.prompt(
                 "Montant restant à payer (€)",
-                type=float,
+                type=to_money,
                 default=default_amount_due
             )
 
@@ -63,45 +70,53 @@ class ContractMenuView:
             return None
 
     def get_contract_update_data(self, contract):
-        """Get updated contract data from user input"""
+        """Get the contract fields the user changed, the amount due only changing through payments"""
         click.echo()
         click.echo(f"✏️  MODIFICATION DU CONTRAT ID: {contract.id}")
         click.echo(f"    Client: {contract.client.full_name}")
+        click.echo(f"    Reste à payer: {contract.amount_due}€ (modifié par les paiements)")
         click.echo("-" * 50)
 
         try:
             data = {}
             data['total_amount'] = click.prompt(
                 "Montant total du contrat (€)",
-                default=float(contract.total_amount),
-                type=float
-            )
-            data['amount_due'] = click.prompt(
-                "Montant restant à payer (€)",
-                default=float(contract.amount_due),
-                type=float
+                default=contract.total_amount,
+                type=to_money
             )
             data['is_signed'] = click.confirm(
                 "Le contrat est-il signé ?",
                 default=contract.is_signed
             )
 
-            return data
+            # Unchanged fields are left out, they cannot overwrite a concurrent change
+            return {key: value for key, value in data.items() if value != getattr(contract, key)}
         except (ValueError, click.Abort):
             click.echo("Modification annulée.")
             return None
 
+    def get_payment_amount(self, contract):
+        """Get the amount of a payment on the contract"""
+        click.echo()
+        click.echo(f"💳 PAIEMENT DU CONTRAT ID: {contract.id}")
+        click.echo(f"    Client: {contract.client.full_name}")
+        click.echo(f"    Reste à payer: {contract.amount_due}€")
+        click.echo("-" * 50)
+
+        try:
+            return click.prompt("Montant du paiement (€)", type=to_money)
+        except click.Abort:
+            click.echo("Paiement annulé.")
+            return None
+
     def display_contracts_list(self, contracts):
-        """Display list of contracts"""
+        """Display list of contracts (any iterable, printed as it is consumed)"""
         click.echo()
         click.echo("📋 LISTE DES CONTRATS")
         click.echo("=" * 100)
 
-        if not contracts:
-            click.echo("Aucun contrat trouvé.")
-            return
-
-        for contract in contracts:
+        count = 0
+        for count, contract in enumerate(contracts, 1):
             status = "✅ Signé" if contract.is_signed else "⏳ En attente"
             amount_due_status = "💰 Payé" if contract.amount_due == 0 else f"💸 Reste {contract.amount_due}€"
 
@@ -116,6 +131,13 @@ class ContractMenuView:
 
             click.echo("-" * 100)
 
+        if not count:
+            click.echo("Aucun contrat trouvé.")
+
+    def search_contract(self, search):
+        """Search contracts with search(text) and let the user pick one of the results"""
+        return self.get_contract_selection(search(prompt_search("un contrat (client, email, entreprise)")))
+
     def get_contract_selection(self, contracts):
         """Get contract selection from user"""
         if not contracts:
@@ -145,6 +167,10 @@ class ContractMenuView:
             click.echo("Sélection annulée.")
             return None
 
+    def search_client(self, search):
+        """Search clients with search(text) and let the user pick one of the results"""
+        return self.get_client_selection(search(prompt_search("un client (nom, email, entreprise, téléphone)")))
+
     def get_client_selection(self, clients):
         """Get client selection from user"""
         if not clients:
@@ -1,6 +1,8 @@
 import click
 from datetime import datetime
 from app.models.user import UserRole
+from app.utils.validators import validate_event_data
+from app.views.utils_view import prompt_search
 
 
 class EvenMenuView:
@@ -53,8 +55,9 @@ class EvenMenuView:
         data['end_date'] = self.get_datetime_input("Date et heure de fin (DD/MM/YYYY HH:MM)")
 
         # Validate dates
-        if data['end_date'] <= data['start_date']:
-            click.echo("❌ La date de fin doit être postérieure à la date de début.")
+        errors = validate_event_data(data)
+        if errors:
+            click.echo(f"❌ {errors[0]}")
             return None
 
         data['location'] = click.prompt("Lieu de l'événement", type=str).strip()
@@ -80,8 +83,9 @@ class EvenMenuView:
                                                    default=event.date_end)
 
         # Validate dates
-        if data['end_date'] <= data['start_date']:
-            click.echo("❌ La date de fin doit être postérieure à la date de début.")
+        errors = validate_event_data(data)
+        if errors:
+            click.echo(f"❌ {errors[0]}")
             return None
 
         data['location'] = click.prompt("Lieu de l'événement", default=event.location, type=str).strip()
@@ -111,16 +115,13 @@ class EvenMenuView:
                 click.echo("❌ Format invalide. Utilisez le format DD/MM/YYYY HH:MM (ex: 25/12/2023 14:30)")
 
     def display_events_list(self, events):
-        """Display list of events"""
+        """Display list of events (any iterable, printed as it is consumed)"""
         click.echo()
         click.echo("📋 LISTE DES ÉVÉNEMENTS")
         click.echo("=" * 120)
 
-        if not events:
-            click.echo("Aucun événement trouvé.")
-            return
-
-        for event in events:
+        count = 0
+        for count, event in enumerate(events, 1):
             support_name = event.support_contact.name if event.support_contact else "Non assigné"
             support_status = "👤" if event.support_contact else "⚠️"
 
@@ -134,9 +135,17 @@ class EvenMenuView:
                 click.echo(f"   📝 Notes: {event.notes}")
             click.echo("-" * 120)
 
+        if not count:
+            click.echo("Aucun événement trouvé.")
+            return
+
         click.echo()
         click.pause("Appuyez sur Entrée pour continuer...")
 
+    def search_event(self, search):
+        """Search events with search(text) and let the user pick one of the results"""
+        return self.get_event_selection(search(prompt_search("un événement (nom, client, email, entreprise)")))
+
     def get_event_selection(self, events):
         """Get event selection from user"""
         if not events:
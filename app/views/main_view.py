@@ -1,9 +1,13 @@
 import click
-from app.models.user import User, UserRole
+from typing import TYPE_CHECKING
+from app.models.roles import UserRole
+
+if TYPE_CHECKING:
+    from app.models.user import User
 
 
 class MainView:
-    def show_main_menu(self, user: User) -> str:
+    def show_main_menu(self, user: "User") -> str:
         """Display main menu based on user role"""
         click.clear()
         click.echo("=" * 50)
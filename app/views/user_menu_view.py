@@ -115,16 +115,13 @@ class UserMenuView:
             return None
 
     def display_users_list(self, users):
-        """Display list of users"""
+        """Display list of users (any iterable, printed as it is consumed)"""
         click.echo()
         click.echo("📋 LISTE DES UTILISATEURS")
         click.echo("=" * 80)
 
-        if not users:
-            click.echo("Aucun utilisateur trouvé.")
-            return
-
-        for user in users:
+        count = 0
+        for count, user in enumerate(users, 1):
             role_display = user.role.value.title()
 
             click.echo(f"ID: {user.id} | {user.name}")
@@ -132,6 +129,10 @@ class UserMenuView:
             click.echo(f"   👤 Rôle: {role_display}")
             click.echo("-" * 80)
 
+        if not count:
+            click.echo("Aucun utilisateur trouvé.")
+            return
+
         click.echo()
         click.pause("Appuyez sur Entrée pour continuer...")
 
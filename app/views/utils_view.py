@@ -29,6 +29,30 @@ def show_warning(message):
     click.echo()
 
 
+STALE_ENTITY_NAMES = {'Client': "Ce client", 'Contract': "Ce contrat", 'Event': "Cet événement"}
+
+
+def confirm_stale_retry(error) -> bool:
+    """Explain a concurrent modification (StaleDataError) and ask whether to reapply the changes"""
+    entity = STALE_ENTITY_NAMES.get(error.entity, error.entity)
+    if error.deleted:
+        show_error(f"{entity} a été supprimé par un autre utilisateur.")
+        return False
+
+    show_warning(f"{entity} a été modifié par un autre utilisateur pendant votre saisie.")
+    for field, (mine, current) in error.conflicts.items():
+        click.echo(f"   {field} : votre valeur {mine}, valeur actuelle {current}")
+    if not error.conflicts:
+        click.echo("   Ses modifications ne portent pas sur les champs que vous avez changés.")
+    return click.confirm(click.style("Appliquer vos modifications à la version actuelle ?"), default=True)
+
+
+def prompt_search(subject: str) -> str:
+    """Ask for the text to search, empty for the most recent ones"""
+    return click.prompt(f"🔍 Rechercher {subject} (vide pour les plus récents)",
+                        default="", show_default=False).strip()
+
+
 def wait_for_user():
     """Wait for user to press Enter"""
     click.prompt(click.style("Appuyez sur Entrée pour continuer..."), default="", show_default=False)
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.async_connection import build_async_engine
+from app.db.connection import DATABASE_URL, build_engine
+from app.services import contract_service, event_service
+from app.services.aio import contract_service as async_contract_service, event_service as async_event_service
+
+UNASSIGNED = {'support_contact_id': None}
+
+
+def sync_request(session_factory):
+    """One request of the sync API: a page of contracts and the unassigned events"""
+    with session_factory() as db:
+        contract_service.get_contracts_page(db)
+        event_service.get_filtered_events(db, UNASSIGNED)
+
+
+async def async_request(session_factory, semaphore):
+    """The same request on the async API"""
+    async with semaphore, session_factory() as db:
+        await async_contract_service.get_contracts_page(db)
+        await async_event_service.get_filtered_events(db, UNASSIGNED)
+
+
+def run_sync(url, requests: int, concurrency: int) -> float:
+    """Serve the requests from a thread pool, as a threaded server would"""
+    engine = build_engine(url)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        sync_request(session_factory)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda _: sync_request(session_factory), range(requests)))
+        return time.perf_counter() - start
+    finally:
+        engine.dispose()
+
+
+async def run_async(url, requests: int, concurrency: int) -> float:
+    """Serve the requests as concurrent tasks on one event loop"""
+    engine = build_async_engine(url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        await async_request(session_factory, semaphore)
+        start = time.perf_counter()
+        await asyncio.gather(*(async_request(session_factory, semaphore) for _ in range(requests)))
+        return time.perf_counter() - start
+    finally:
+        await engine.dispose()
+
+
+@click.command()
+@click.option("--url", default=DATABASE_URL, show_default="DATABASE_URL",
+              help="Base à interroger (le pilote async est déduit de l'URL).")
+@click.option("--requests", "requests_count", type=click.IntRange(min=1), default=500, show_default=True)
+@click.option("--concurrency", type=click.IntRange(min=1), default=20, show_default=True)
+def main(url, requests_count, concurrency):
+    """Compare le débit des services sync et async sous requêtes concurrentes."""
+    click.echo(f"{requests_count} requêtes, {concurrency} en parallèle "
+               f"(pensez à DB_POOL_SIZE + DB_MAX_OVERFLOW >= {concurrency})")
+    for mode, elapsed in (("sync", run_sync(url, requests_count, concurrency)),
+                          ("async", asyncio.run(run_async(url, requests_count, concurrency)))):
+        click.echo(f"{mode:>5} : {elapsed:.2f} s, {requests_count / elapsed:.0f} requêtes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
-from app.models.base import Base
-from app.models.user import User
-from app.models.client import Client
-from app.models.contract import Contract
-from app.models.event import Event
-from app.db.connection import engine
+from app.db.schema import create_missing_columns, create_schema, upgrade_money_columns
+from app.db.connection import get_engine
 
-Base.metadata.create_all(bind=engine)
+# Columns first: the indexes created next may cover them
+for column_name in create_missing_columns(get_engine()):
+    print(f"✅ Column {column_name} added")
+created_indexes = create_schema(get_engine())
 print("✅ Database and tables created")
+for index_name in created_indexes:
+    print(f"✅ Index {index_name} created")
+for column_name in upgrade_money_columns(get_engine()):
+    print(f"✅ Column {column_name} converted to NUMERIC")
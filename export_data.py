@@ -0,0 +1,29 @@
+import click
+
+from app.db.connection import SessionLocal
+from app.services.export_service import EXPORTS, FORMATS, export_table
+
+
+@click.command()
+@click.argument("entity", type=click.Choice(sorted(EXPORTS)))
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(FORMATS), default=None,
+              help="Format du fichier (déduit de l'extension par défaut).")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=None,
+              help="Lignes lues par aller-retour (EXPORT_CHUNK_SIZE, 5000 par défaut).")
+def main(entity, path, fmt, chunk_size):
+    """Exporte les clients, contrats ou événements vers un fichier CSV, JSONL ou Parquet."""
+    db = SessionLocal()
+    try:
+        report = export_table(db, entity, path, fmt, chunk_size)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    finally:
+        db.close()
+
+    click.echo(f"📤 {report['rows']} ligne(s) exportée(s) vers {report['path']} en "
+               f"{report['elapsed']:.2f} s ({report['rows_per_second']:.0f} lignes/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import click
+
+from app.db.connection import SessionLocal
+from app.services.import_service import IMPORTERS, import_file
+
+
+@click.command()
+@click.argument("entity", type=click.Choice(sorted(IMPORTERS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", type=click.IntRange(min=1), default=None,
+              help="Lignes insérées par lot (IMPORT_BATCH_SIZE, 1000 par défaut).")
+@click.option("--commercial-email", default=None,
+              help="Commercial des clients sans colonne commercial_email.")
+def main(entity, path, batch_size, commercial_email):
+    """Importe des clients, contrats ou événements depuis un fichier CSV ou JSONL."""
+    options = {'commercial_email': commercial_email} if entity == "clients" else {}
+
+    def show_batch(batch):
+        status = "❌" if batch['batch_error'] or batch['errors'] else "✅"
+        click.echo(f"{status} Lot {batch['batch']} (lignes {batch['first_line']}-{batch['last_line']}) : "
+                   f"{batch['inserted']} insérée(s), {batch['rejected']} rejetée(s), "
+                   f"{batch['rows_per_second']:.0f} lignes/s")
+        for line_number, message in batch['errors']:
+            click.echo(f"   ligne {line_number} : {message}")
+        if batch['batch_error']:
+            click.echo(f"   lot annulé : {batch['batch_error']}")
+
+    db = SessionLocal()
+    try:
+        report = import_file(db, entity, path, batch_size, on_batch=show_batch, **options)
+    finally:
+        db.close()
+
+    click.echo(f"📦 {report['inserted']}/{report['rows']} ligne(s) importée(s) en {report['batches']} lot(s), "
+               f"{report['elapsed']:.2f} s ({report['rows_per_second']:.0f} lignes/s)")
+    if report['rejected']:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,28 @@
 import sys
 import os
 from dotenv import load_dotenv
-import sentry_sdk
-from app.controllers.main_controller import MainController
 
 
 load_dotenv()
 
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
-# Initialize Sentry if DSN is present
-if SENTRY_DSN:
-    sentry_sdk.init(
-        dsn=SENTRY_DSN,
-        traces_sample_rate=1.0,
-        environment=os.getenv("ENV", "development"),
-    )
-    print("✅ Sentry initialized")
-else:
-    print("⚠️ Sentry not initialized (missing SENTRY_DSN)")
+
+def init_sentry():
+    """Initialize Sentry if DSN is present (sentry_sdk is only imported in that case)
+
+    The status goes to stderr, stdout carrying the TSV/CSV output of the commands.
+    """
+    from app.utils.telemetry import init_telemetry
+    if init_telemetry(SENTRY_DSN, os.getenv("ENV", "development")):
+        print("✅ Sentry initialized", file=sys.stderr)
+    else:
+        print("⚠️ Sentry not initialized (missing SENTRY_DSN)", file=sys.stderr)
 
 
 def main():
+    # The main controller only loads the login screen, menus are imported when first opened
+    from app.controllers.main_controller import MainController
     try:
         controller = MainController()
         controller.run()
@@ -29,10 +30,16 @@ def main():
         print("\n👋 Application fermée par l'utilisateur.")
     except Exception as e:
         print(f"❌ Erreur critique: {e}")
-        if SENTRY_DSN:
-            sentry_sdk.capture_exception(e)
+        from app.utils.telemetry import capture_exception
+        capture_exception(e)
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    init_sentry()
+    if len(sys.argv) > 1:
+        # Arguments select the non-interactive mode: python main.py clients list
+        from app.cli import main as cli_main
+        cli_main(sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,158 @@
+import json
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.user import User, UserRole
+from app.utils.config import env_bool, env_float, env_int, env_str
+from tests.benchmarks.synthetic_data import generate, staff_ids
+
+BASELINES = Path(__file__).with_name("baselines.json")
+# A slowdown of less than 5 ms is timer and scheduler noise, never a regression
+NOISE_FLOOR = 0.005
+CALIBRATION_QUERY = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10000) " \
+                    "SELECT count(*), sum(i) FROM n"
+
+RESULTS = {}
+
+
+def calibrate() -> float:
+    """Time a fixed mix of Python and SQLite work, the unit benchmark timings are measured in"""
+    start = time.perf_counter()
+    with sqlite3.connect(":memory:") as connection:
+        connection.execute(CALIBRATION_QUERY).fetchone()
+    sorted({str(i): i * i for i in range(10000)}.items(), reverse=True)
+    return time.perf_counter() - start
+
+
+def scales() -> list:
+    """Scales to benchmark from BENCHMARK_SCALES, 10000 by default (10000,100000,1000000 for the full run)"""
+    return [int(scale) for scale in env_str("BENCHMARK_SCALES", "10000").split(",")]
+
+
+def load_baselines() -> dict:
+    return json.loads(BASELINES.read_text(encoding="utf-8")) if BASELINES.exists() else {}
+
+
+class Benchmark:
+    """Time a service call over several rounds and compare its cost to the stored baseline
+
+    Every round starts from the same data: it runs in a fresh session inside a
+    savepoint of the benchmark connection, rolled back afterwards, so writes do
+    not accumulate and nothing is served from a previous round's identity map.
+    setup(db), when given, prepares the first arguments of each round outside
+    of the timing: fn(db, *setup(db), *args, **kwargs) is what gets timed.
+
+    Each round is measured in calibration units (see calibrate), timed right
+    before it: a host busier or slower than the one that recorded the baseline
+    slows both down, so the baseline still holds. Baselines are the median cost
+    in these units.
+    """
+
+    def __init__(self, key: str, connection, baselines: dict):
+        self.key = key
+        self.connection = connection
+        self.baseline = baselines.get(key)
+        self.rounds = env_int("BENCHMARK_ROUNDS", 5)
+        self.tolerance = env_float("BENCHMARK_TOLERANCE", 0.5)
+
+    def _round(self, fn, args, kwargs, setup):
+        savepoint = self.connection.begin_nested()
+        db = Session(bind=self.connection, join_transaction_mode="create_savepoint")
+        try:
+            round_args = tuple(setup(db) if setup else ()) + args
+            start = time.perf_counter()
+            result = fn(db, *round_args, **kwargs)
+            return time.perf_counter() - start, result
+        finally:
+            db.close()
+            savepoint.rollback()
+
+    def __call__(self, fn, *args, setup=None, **kwargs):
+        self._round(fn, args, kwargs, setup)
+        timings, costs, units, result = [], [], [], None
+        for _ in range(self.rounds):
+            unit = calibrate()
+            elapsed, result = self._round(fn, args, kwargs, setup)
+            timings.append(elapsed)
+            units.append(unit)
+            costs.append(elapsed / unit)
+
+        cost, unit = statistics.median(costs), statistics.median(units)
+        RESULTS[self.key] = {'median': statistics.median(timings), 'min': min(timings), 'cost': cost,
+                             'baseline': self.baseline}
+        if self.baseline is not None and cost > self.baseline * (1 + self.tolerance) \
+                and (cost - self.baseline) * unit > NOISE_FLOOR:
+            pytest.fail(f"{self.key}: cost {cost:.2f}, baseline {self.baseline:.2f} calibration units "
+                        f"(+{(cost / self.baseline - 1) * 100:.0f} %, tolerance {self.tolerance * 100:.0f} %, "
+                        f"unit {unit * 1000:.1f} ms)")
+        return result
+
+
+@pytest.fixture(scope="session", params=scales(), ids=lambda scale: f"{scale}")
+def dataset(request, tmp_path_factory):
+    """A database filled with the synthetic data of one scale
+
+    SQLite in a temporary file by default; BENCHMARK_DATABASE_URL points the
+    suite at another database, which must be empty and is emptied afterwards.
+    """
+    scale = request.param
+    url = env_str("BENCHMARK_DATABASE_URL", f"sqlite:///{tmp_path_factory.mktemp('benchmarks') / 'crm.db'}")
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(bind=engine) as db:
+        generate(db, scale)
+    yield {'engine': engine, 'scale': scale}
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def connection(dataset):
+    """A connection whose transaction is rolled back after the benchmark"""
+    with dataset['engine'].connect() as connection:
+        transaction = connection.begin()
+        yield connection
+        transaction.rollback()
+
+
+@pytest.fixture
+def staff(dataset, connection) -> dict:
+    """One user of each role, loaded and detached"""
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as db:
+        users = {role: db.get(User, staff_ids(dataset['scale'], role)[0]) for role in UserRole}
+        db.expunge_all()
+    return users
+
+
+@pytest.fixture
+def benchmark(request, dataset, connection):
+    """Benchmark a service function against the data of the current scale"""
+    # The node id ends with the parameters, the scale included: test_reports[get_contract_totals-10000]
+    key = f"{dataset['engine'].dialect.name}/{request.node.nodeid.split('::', 1)[1]}"
+    return Benchmark(key, connection, load_baselines())
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<90} {'median':>10} {'min':>10} {'cost':>10} {'baseline':>10}")
+    for key, result in sorted(RESULTS.items()):
+        baseline = "-" if result['baseline'] is None else f"{result['baseline']:.2f}"
+        terminalreporter.write_line(f"{key:<90} {result['median'] * 1000:>10.2f} {result['min'] * 1000:>10.2f} "
+                                    f"{result['cost']:>10.2f} {baseline:>10}")
+    terminalreporter.write_line("(median and min in ms, cost and baseline in calibration units)")
+
+
+def pytest_sessionfinish(session):
+    if RESULTS and env_bool("BENCHMARK_SAVE", False):
+        baselines = load_baselines()
+        baselines.update({key: round(result['cost'], 4) for key, result in RESULTS.items()})
+        BASELINES.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,255 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select
+
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services import (
+    client_service, contract_service, event_service, export_service, import_service, report_service,
+    schedule_service, search_service, user_service
+)
+from app.services.cache import get_staff_by_role, invalidate_staff
+from app.utils.config import env_bool
+
+pytestmark = pytest.mark.skipif(not env_bool("RUN_BENCHMARKS", False),
+                                reason="benchmarks run with RUN_BENCHMARKS=1")
+
+START = datetime(2025, 3, 1)
+END = datetime(2025, 4, 1)
+
+
+def new_user(db, role: UserRole = UserRole.SUPPORT) -> User:
+    """A user of the round, with no client, contract or event"""
+    user = User(name="Benchmark", email=f"benchmark-{role.value}@epic-events.test", password="synthetic", role=role)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def cold_staff_cache(db) -> tuple:
+    """Empty the staff cache so the round measures the query behind it"""
+    invalidate_staff()
+    return ()
+
+
+def unassigned_events(db, count: int) -> list:
+    return list(db.scalars(select(Event.id).where(Event.support_id.is_(None)).order_by(Event.id).limit(count)))
+
+
+class TestClientServiceBenchmarks:
+    """Benchmarks of the client service"""
+
+    def test_get_all_clients(self, benchmark):
+        benchmark(client_service.get_all_clients)
+
+    def test_get_clients_page(self, benchmark):
+        benchmark(client_service.get_clients_page)
+
+    def test_get_clients_export_query(self, benchmark):
+        benchmark(lambda db: client_service.get_clients_export_query(db).all())
+
+    def test_get_clients_by_user(self, benchmark, staff):
+        benchmark(client_service.get_clients_by_user, staff[UserRole.COMMERCIAL])
+
+    def test_create_client(self, benchmark, staff):
+        benchmark(client_service.create_client, staff[UserRole.COMMERCIAL].id,
+                  full_name="Benchmark Client", email="benchmark@client.test")
+
+    def test_update_client(self, benchmark, staff):
+        benchmark(client_service.update_client, 1, staff[UserRole.GESTION], phone="0102030405")
+
+
+class TestContractServiceBenchmarks:
+    """Benchmarks of the contract service"""
+
+    def test_get_all_contracts(self, benchmark):
+        benchmark(contract_service.get_all_contracts)
+
+    def test_get_contracts_page(self, benchmark):
+        benchmark(contract_service.get_contracts_page)
+
+    def test_get_contracts_export_query(self, benchmark):
+        benchmark(lambda db: contract_service.get_contracts_export_query(db).all())
+
+    def test_get_contracts_by_user(self, benchmark, staff):
+        benchmark(contract_service.get_contracts_by_user, staff[UserRole.COMMERCIAL])
+
+    @pytest.mark.parametrize("listing", ["list_unsigned_contracts", "list_unpaid_contracts",
+                                         "list_signed_contracts", "list_paid_contracts"])
+    def test_contract_listings(self, benchmark, listing):
+        benchmark(getattr(contract_service, listing))
+
+    def test_get_commercial_users(self, benchmark):
+        benchmark(contract_service.get_commercial_users, setup=cold_staff_cache)
+
+    def test_get_all_clients(self, benchmark):
+        benchmark(contract_service.get_all_clients)
+
+    def test_create_contract(self, benchmark, staff):
+        benchmark(contract_service.create_contract, 1, staff[UserRole.COMMERCIAL].id, 1000)
+
+    def test_update_contract(self, benchmark, staff):
+        benchmark(contract_service.update_contract, 1, staff[UserRole.GESTION], is_signed=True)
+
+    def test_record_payment(self, benchmark, staff):
+        benchmark(contract_service.record_payment, Decimal("0.01"), staff[UserRole.GESTION],
+                  setup=lambda db: (db.scalar(select(Contract.id).where(Contract.amount_due > 1)),))
+
+
+class TestEventServiceBenchmarks:
+    """Benchmarks of the event service"""
+
+    def test_get_all_events(self, benchmark):
+        benchmark(event_service.get_all_events)
+
+    def test_get_events_page(self, benchmark):
+        benchmark(event_service.get_events_page)
+
+    def test_get_events_with_details(self, benchmark):
+        benchmark(event_service.get_events_with_details)
+
+    def test_get_events_with_details_page(self, benchmark):
+        benchmark(event_service.get_events_with_details_page)
+
+    def test_get_events_export_query(self, benchmark):
+        benchmark(lambda db: event_service.get_events_export_query(db).all())
+
+    @pytest.mark.parametrize("filters", [
+        {'support_contact_id': None},
+        {'support_contact_id_not_null': True, 'start_date_gte': START, 'start_date_lt': END},
+        {'location': "lyon"},
+    ], ids=["unassigned", "assigned_in_month", "location"])
+    def test_get_filtered_events(self, benchmark, filters):
+        benchmark(event_service.get_filtered_events, filters)
+
+    def test_get_filtered_events_by_commercial(self, benchmark, staff):
+        benchmark(event_service.get_filtered_events, {'commercial_contact_id': staff[UserRole.COMMERCIAL].id})
+
+    def test_list_unassigned_events(self, benchmark):
+        benchmark(event_service.list_unassigned_events)
+
+    def test_list_events_by_support(self, benchmark, staff):
+        benchmark(event_service.list_events_by_support, staff[UserRole.SUPPORT].id)
+
+    def test_get_events_for_support_user(self, benchmark, staff):
+        benchmark(event_service.get_events_for_support_user, staff[UserRole.SUPPORT].id)
+
+    def test_get_all_events_for_management(self, benchmark):
+        benchmark(event_service.get_all_events_for_management)
+
+    def test_get_signed_contracts_for_commercial(self, benchmark, staff):
+        benchmark(event_service.get_signed_contracts_for_commercial, staff[UserRole.COMMERCIAL].id)
+
+    def test_get_contract_by_id(self, benchmark):
+        benchmark(event_service.get_contract_by_id, 1)
+
+    def test_get_support_users(self, benchmark):
+        benchmark(event_service.get_support_users, setup=cold_staff_cache)
+
+    def test_create_event(self, benchmark):
+        benchmark(event_service.create_event, 1, 1, "Benchmark", START, END, "Paris", 100, "")
+
+    def test_update_event(self, benchmark, staff):
+        benchmark(event_service.update_event, 1, staff[UserRole.GESTION], notes="Benchmark")
+
+    def test_assign_support_to_event(self, benchmark):
+        benchmark(event_service.assign_support_to_event,
+                  setup=lambda db: (unassigned_events(db, 1)[0], new_user(db).id))
+
+    def test_assign_supports(self, benchmark, staff):
+        def assignments(db):
+            support_id = new_user(db).id
+            return [(event_id, support_id) for event_id in unassigned_events(db, 1000)],
+
+        benchmark(event_service.assign_supports, staff[UserRole.GESTION], setup=assignments)
+
+    def test_assign_support_matching(self, benchmark, staff):
+        benchmark(lambda db, support_id: event_service.assign_support_matching(
+            db, {'support_contact_id': None, 'location': "lyon"}, support_id, staff[UserRole.GESTION]),
+                  setup=lambda db: (new_user(db).id,))
+
+
+class TestUserServiceBenchmarks:
+    """Benchmarks of the user service"""
+
+    def test_list_all_users(self, benchmark):
+        benchmark(user_service.list_all_users)
+
+    def test_list_users_page(self, benchmark):
+        benchmark(user_service.list_users_page)
+
+    def test_get_user_by_email(self, benchmark, staff):
+        benchmark(user_service.get_user_by_email, staff[UserRole.SUPPORT].email)
+
+    def test_get_user_by_id(self, benchmark, staff):
+        benchmark(user_service.get_user_by_id, staff[UserRole.SUPPORT].id)
+
+    def test_check_user_associations(self, benchmark, staff):
+        benchmark(user_service.check_user_associations, staff[UserRole.COMMERCIAL].id)
+
+    def test_email_exists_for_different_user(self, benchmark, staff):
+        benchmark(user_service.email_exists_for_different_user, staff[UserRole.SUPPORT].email, 1)
+
+    def test_create_user(self, benchmark):
+        benchmark(user_service.create_user, "Benchmark", "benchmark@epic-events.test", UserRole.SUPPORT, "secret")
+
+    def test_update_user(self, benchmark, staff):
+        benchmark(user_service.update_user, staff[UserRole.SUPPORT].id, name="Benchmark")
+
+    def test_delete_user(self, benchmark):
+        benchmark(user_service.delete_user, setup=lambda db: (new_user(db).id,))
+
+    def test_get_staff_by_role(self, benchmark):
+        benchmark(get_staff_by_role, UserRole.COMMERCIAL, setup=cold_staff_cache)
+
+
+class TestReportServiceBenchmarks:
+    """Benchmarks of the contract reports"""
+
+    @pytest.mark.parametrize("report", ["get_contract_totals", "get_contract_totals_by_commercial",
+                                        "get_contract_totals_by_client", "get_contract_totals_by_month"])
+    def test_reports(self, benchmark, report):
+        benchmark(getattr(report_service, report))
+
+
+class TestSearchServiceBenchmarks:
+    """Benchmarks of the client, contract and event search"""
+
+    def test_search_clients(self, benchmark):
+        benchmark(search_service.search_clients, "dupont acme")
+
+    def test_search_contracts(self, benchmark, staff):
+        benchmark(search_service.search_contracts, "martin", staff[UserRole.COMMERCIAL].id)
+
+    def test_search_events(self, benchmark, staff):
+        benchmark(search_service.search_events, "salon", staff[UserRole.SUPPORT].id)
+
+
+class TestScheduleServiceBenchmarks:
+    """Benchmarks of the support schedule checks"""
+
+    def test_find_conflicts(self, benchmark, staff):
+        benchmark(schedule_service.find_conflicts, staff[UserRole.SUPPORT].id, START, END)
+
+    def test_check_event_schedule(self, benchmark, staff):
+        benchmark(schedule_service.check_event_schedule, 1, {'date_start': START, 'date_end': START})
+
+    def test_plan_assignments(self, benchmark, staff):
+        benchmark(lambda db, event_ids: schedule_service.plan_assignments(
+            db, {event_id: staff[UserRole.SUPPORT].id for event_id in event_ids}),
+                  setup=lambda db: (unassigned_events(db, 1000),))
+
+
+class TestImportExportBenchmarks:
+    """Benchmarks of the bulk import and export"""
+
+    @pytest.mark.parametrize("entity", ["clients", "contracts", "events"])
+    def test_export_table(self, benchmark, entity, tmp_path):
+        benchmark(export_service.export_table, entity, tmp_path / f"{entity}.csv")
+
+    def test_import_clients(self, benchmark, staff):
+        records = [(line, {'full_name': f"Import {line}", 'email': f"import{line}@client.test",
+                           'commercial_email': staff[UserRole.COMMERCIAL].email}) for line in range(1000)]
+        benchmark(import_service.import_records, "clients", records)
@@ -0,0 +1,179 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import click
+from sqlalchemy import func, insert, select, text
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+
+DEFAULT_SEED = 2025
+INSERT_BATCH_SIZE = 10_000
+# Not a real bcrypt hash: generated staff cannot log in, benchmarks do not need them to
+PASSWORD = "synthetic"
+
+FIRST_NAMES = ("Jean", "Marie", "Pierre", "Sophie", "Luc", "Camille", "Paul", "Julie", "Hugo", "Léa",
+               "Louis", "Emma", "Nicolas", "Chloé", "Thomas", "Sarah")
+LAST_NAMES = ("Martin", "Bernard", "Dubois", "Durand", "Lefebvre", "Moreau", "Laurent", "Simon",
+              "Michel", "Garcia", "Roux", "Fournier", "Girard", "Bonnet", "Dupont", "Lambert")
+COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Cyberdyne",
+             "Soylent", "Tyrell", "Aperture", "Vandelay")
+CITIES = ("Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes", "Toulouse", "Strasbourg")
+EVENT_KINDS = ("Salon", "Gala", "Séminaire", "Conférence", "Mariage", "Lancement")
+
+START = datetime(2024, 1, 1, 8)
+
+
+def counts(scale: int) -> dict:
+    """Rows generated per table for a scale, the number of contracts and of events"""
+    staff = max(2, scale // 500)
+    return {
+        'commercials': staff,
+        'supports': staff,
+        'gestion': 1,
+        'clients': max(1, scale // 2),
+        'contracts': scale,
+        'events': scale,
+    }
+
+
+def users(scale: int) -> list:
+    """Staff rows: one gestion user then the commercials and the supports, ids from 1"""
+    numbers = counts(scale)
+    roles = ([UserRole.GESTION] * numbers['gestion'] + [UserRole.COMMERCIAL] * numbers['commercials']
+             + [UserRole.SUPPORT] * numbers['supports'])
+    return [{'id': user_id, 'name': f"{role.value.capitalize()} {user_id}",
+             'email': f"{role.value}{user_id}@epic-events.test", 'password': PASSWORD, 'role': role}
+            for user_id, role in enumerate(roles, 1)]
+
+
+def staff_ids(scale: int, role: UserRole) -> list:
+    return [user['id'] for user in users(scale) if user['role'] == role]
+
+
+def clients(scale: int, rng: random.Random):
+    commercials = staff_ids(scale, UserRole.COMMERCIAL)
+    for client_id in range(1, counts(scale)['clients'] + 1):
+        created = date(2023, 1, 1) + timedelta(days=rng.randrange(730))
+        yield {
+            'id': client_id,
+            'full_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'email': f"client{client_id}@{rng.choice(COMPANIES).lower()}.test",
+            'phone': f"0{rng.randrange(100_000_000, 999_999_999)}",
+            'company_name': f"{rng.choice(COMPANIES)} {client_id % 97}",
+            'date_created': created,
+            'last_contact': created + timedelta(days=rng.randrange(365)),
+            'commercial_id': commercials[client_id % len(commercials)],
+        }
+
+
+def contracts(scale: int, rng: random.Random):
+    """Contracts, three quarters signed and about half of them paid off"""
+    commercials = staff_ids(scale, UserRole.COMMERCIAL)
+    client_count = counts(scale)['clients']
+    for contract_id in range(1, scale + 1):
+        client_id = (contract_id - 1) % client_count + 1
+        total = Decimal(rng.randrange(1_000, 50_000))
+        yield {
+            'id': contract_id,
+            'client_id': client_id,
+            'commercial_id': commercials[client_id % len(commercials)],
+            'total_amount': total,
+            'amount_due': Decimal(0) if rng.random() < 0.5 else (total * Decimal(rng.randrange(1, 100)) / 100),
+            'date_created': date(2023, 1, 1) + timedelta(days=rng.randrange(730)),
+            'is_signed': rng.random() < 0.75,
+        }
+
+
+def events(scale: int, rng: random.Random):
+    """One event per contract over two years, seven in ten assigned
+
+    Each support works on its events one after the other, so the generated
+    schedules have no overlapping events, as the services guarantee.
+    """
+    supports = staff_ids(scale, UserRole.SUPPORT)
+    client_count = counts(scale)['clients']
+    support_free_from = {support_id: START for support_id in supports}
+    span = timedelta(days=730)
+    for event_id in range(1, scale + 1):
+        start = START + span * event_id / scale + timedelta(hours=rng.randrange(12))
+        end = start + timedelta(hours=rng.randrange(2, 10))
+        support_id = rng.choice(supports) if rng.random() < 0.7 else None
+        if support_id is not None:
+            if start < support_free_from[support_id]:
+                support_id = None
+            else:
+                support_free_from[support_id] = end
+        yield {
+            'id': event_id,
+            'name': f"{rng.choice(EVENT_KINDS)} {event_id}",
+            'contract_id': event_id,
+            'client_id': (event_id - 1) % client_count + 1,
+            'support_id': support_id,
+            'date_start': start,
+            'date_end': end,
+            'location': rng.choice(CITIES),
+            'attendees': rng.randrange(10, 2_000),
+            'notes': None,
+        }
+
+
+def _insert(db, model, rows, batch_size: int) -> int:
+    """Insert rows with one executemany INSERT per batch"""
+    count, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.execute(insert(model), batch)
+            count, batch = count + len(batch), []
+    if batch:
+        db.execute(insert(model), batch)
+        count += len(batch)
+    return count
+
+
+def generate(db, scale: int, seed: int = DEFAULT_SEED, batch_size: int = INSERT_BATCH_SIZE) -> dict:
+    """Fill an empty database with the synthetic data of a scale, the same rows for the same seed
+
+    Ids are given explicitly, starting from 1 in every table. Returns the number
+    of rows inserted per table.
+    """
+    if db.scalar(select(func.count()).select_from(User)):
+        raise ValueError("The database must be empty to generate synthetic data.")
+    rng = random.Random(seed)
+    inserted = {
+        'users': _insert(db, User, users(scale), batch_size),
+        'clients': _insert(db, Client, clients(scale, rng), batch_size),
+        'contracts': _insert(db, Contract, contracts(scale, rng), batch_size),
+        'events': _insert(db, Event, events(scale, rng), batch_size),
+    }
+    if db.get_bind().dialect.name == "postgresql":
+        # Explicit ids leave the sequences behind, rows created afterwards would reuse them
+        for model in (User, Client, Contract, Event):
+            table = model.__tablename__
+            db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                            f"(SELECT max(id) FROM {table}))"))
+    db.commit()
+    return inserted
+
+
+@click.command()
+@click.option("--scale", type=click.IntRange(min=1), default=10_000, show_default=True,
+              help="Nombre de contrats et d'événements (clients : la moitié, équipe : 1/500 chacun).")
+@click.option("--seed", type=int, default=DEFAULT_SEED, show_default=True)
+def main(scale, seed):
+    """Remplit une base vide (DB_*) de données synthétiques pour les benchmarks."""
+    from app.db.connection import SessionLocal
+    with SessionLocal() as db:
+        try:
+            inserted = generate(db, scale, seed)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    click.echo(", ".join(f"{count} {table}" for table, count in inserted.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 import pytest
 from unittest.mock import Mock
 from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from app.models.base import Base
 from app.models.user import User, UserRole
 from app.models.client import Client
 from app.models.contract import Contract
 from app.models.event import Event
+from app.services.cache import staff_cache
 
 
 @pytest.fixture
@@ -65,8 +70,8 @@ def mock_contract():
     contract.id = 1
     contract.client_id = 1
     contract.commercial_id = 1
-    contract.total_amount = 10000.0
-    contract.amount_due = 5000.0
+    contract.total_amount = Decimal("10000.00")
+    contract.amount_due = Decimal("5000.00")
     contract.date_created = date.today()
     contract.is_signed = False
     return contract
@@ -148,3 +153,60 @@ def sample_user_credentials():
         "email": "test@example.com",
         "password": "test_password_123"
     }
+
+
+@pytest.fixture
+def sqlite_engine():
+    """Create an in-memory SQLite engine with the application schema"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(sqlite_engine):
+    """Create a real session bound to the in-memory SQLite database"""
+    session = Session(bind=sqlite_engine)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statement_counter(sqlite_engine):
+    """Count the SQL statements executed on the in-memory SQLite engine"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(sqlite_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolate_slow_query_log(tmp_path_factory):
+    """Send the slow query log of the engines built by tests to a temporary file, not the working directory
+
+    Session scoped, so it is set before the session engines are built.
+    """
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SLOW_QUERY_LOG", str(tmp_path_factory.mktemp("logs") / "slow_queries.log"))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_staff_cache():
+    """Start every test with an empty staff cache"""
+    staff_cache.invalidate()
+    staff_cache.reset_stats()
+    yield
+    staff_cache.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def isolate_session_token(monkeypatch, tmp_path):
+    """Keep session tokens disabled and away from the real home directory"""
+    monkeypatch.delenv("SESSION_SECRET", raising=False)
+    monkeypatch.setenv("SESSION_TOKEN_FILE", str(tmp_path / "session"))
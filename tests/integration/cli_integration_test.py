@@ -0,0 +1,30 @@
+from click.testing import CliRunner
+
+from app.cli import cli
+from app.models.user import UserRole
+
+
+def invoke(user, password, *args):
+    return CliRunner().invoke(cli, ["--email", user.email, "--password", password, *args], catch_exceptions=False)
+
+
+class TestCliIntegration:
+    """Test cases for commands running end to end: login, unit of work and services"""
+
+    def test_pay_and_list(self, staff, password, contract, monkeypatch):
+        """Test that a payment made by one command is seen by the next one"""
+        monkeypatch.setenv("BCRYPT_ROUNDS", "4")
+
+        paid = invoke(staff[UserRole.GESTION], password, "contracts", "pay", str(contract.id), "500")
+        listed = invoke(staff[UserRole.COMMERCIAL], password, "contracts", "filter", "--paid")
+
+        assert paid.exit_code == 0
+        assert [line.split("\t")[:5] for line in listed.output.splitlines()[1:]] == \
+            [[str(contract.id), "Jean Dupont", "Commercial", "1000.00", "0.00"]]
+
+    def test_wrong_password(self, staff):
+        """Test that the password is checked against the stored hash"""
+        result = CliRunner().invoke(cli, ["--email", "gestion@mail.com", "--password", "wrong", "clients", "list"])
+
+        assert result.exit_code == 1
+        assert "Email ou mot de passe incorrect." in result.output
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.db.connection import build_engine
+from app.models.base import Base
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.utils.config import env_str
+from app.utils.password import hash_password
+
+PASSWORD = "secret"
+
+
+@pytest.fixture(scope="session")
+def integration_engine():
+    """The application engine on INTEGRATION_DATABASE_URL (SQLite in memory by default), schema created once"""
+    engine = build_engine(env_str("INTEGRATION_DATABASE_URL", "sqlite://"))
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def connection(integration_engine):
+    """A connection whose transaction is rolled back after the test, whatever the services committed"""
+    with integration_engine.connect() as connection:
+        transaction = connection.begin()
+        yield connection
+        transaction.rollback()
+
+
+@pytest.fixture
+def session_factory(connection, monkeypatch):
+    """Sessions inside the test transaction, also used by the unit of work and the login
+
+    Their commits only release a savepoint of the test transaction.
+    """
+    factory = sessionmaker(bind=connection, join_transaction_mode="create_savepoint")
+    monkeypatch.setattr("app.db.unit_of_work.SessionLocal", factory)
+    monkeypatch.setattr("app.services.auth_service.SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def password() -> str:
+    return PASSWORD
+
+
+@pytest.fixture
+def staff(db) -> dict:
+    """One user of each role, all with the password PASSWORD"""
+    hashed = hash_password(PASSWORD, rounds=4)
+    users = {role: User(name=role.value.capitalize(), email=f"{role.value}@mail.com", password=hashed, role=role)
+             for role in UserRole}
+    db.add_all(users.values())
+    db.commit()
+    return users
+
+
+@pytest.fixture
+def contract(db, staff) -> Contract:
+    """A signed contract of the commercial, half paid"""
+    client = Client(full_name="Jean Dupont", email="jean@acme.fr", company_name="Acme",
+                    commercial=staff[UserRole.COMMERCIAL])
+    contract = Contract(client=client, commercial=staff[UserRole.COMMERCIAL], total_amount=1000,
+                        amount_due=500, is_signed=True)
+    db.add(contract)
+    db.commit()
+    return contract
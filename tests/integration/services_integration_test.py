@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.client import Client
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.client_service import create_client, update_client
+from app.services.contract_service import create_contract, record_payment
+from app.services.errors import ScheduleConflictError
+from app.services.event_service import assign_support_to_event, assign_supports, create_event
+from app.services.report_service import get_contract_totals
+from app.services.search_service import search_clients
+from app.services.user_service import delete_user
+
+
+def event_on(db, contract, day: int, hours=(10, 12)) -> Event:
+    return create_event(db, contract.client_id, contract.id, f"Salon {day}", datetime(2025, 6, day, hours[0]),
+                        datetime(2025, 6, day, hours[1]), "Paris", 50, "")
+
+
+class TestIsolation:
+    """Test cases for the transaction rolled back after every test"""
+
+    @pytest.mark.parametrize("attempt", [1, 2])
+    def test_commits_do_not_leak(self, db, staff, attempt):
+        """Test that users committed by a previous test are gone (emails are unique)"""
+        assert db.scalar(select(func.count(User.id))) == len(UserRole)
+
+    def test_foreign_keys_are_enforced(self, db, staff, contract):
+        """Test that SQLite refuses to delete a commercial who still has clients"""
+        with pytest.raises(IntegrityError):
+            delete_user(db, staff[UserRole.COMMERCIAL].id)
+
+
+class TestClientsAndContracts:
+    """Test cases for clients and contracts against real queries"""
+
+    def test_client_lifecycle(self, db, staff):
+        """Test creating, updating and finding a client, only its commercial may update it"""
+        commercial = staff[UserRole.COMMERCIAL]
+        other = User(name="Other", email="other@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+        db.add(other)
+        client = create_client(db, commercial.id, full_name="Marie Curie", email="marie@radium.fr")
+
+        update_client(db, client.id, commercial, company_name="Radium")
+        with pytest.raises(PermissionError):
+            update_client(db, client.id, other, phone="0102030405")
+
+        assert [found.company_name for found in search_clients(db, "radium")] == ["Radium"]
+        assert db.get(Client, client.id).version == 2
+
+    def test_payments_and_totals(self, db, staff, contract):
+        """Test that payments are applied in the database and show in the totals"""
+        gestion = staff[UserRole.GESTION]
+        create_contract(db, contract.client_id, contract.commercial_id, 300)
+
+        assert record_payment(db, contract.id, "200.50", gestion) == Decimal("299.50")
+        with pytest.raises(ValueError, match="exceeds the amount due"):
+            record_payment(db, contract.id, 300, gestion)
+
+        totals = get_contract_totals(db)
+        assert (totals.contract_count, totals.total_value, totals.outstanding) == (2, 1300, Decimal("599.50"))
+
+
+class TestEvents:
+    """Test cases for the support schedule against real queries"""
+
+    def test_overlapping_assignment_is_refused(self, db, staff, contract):
+        """Test that a support cannot be given two events at once, one by one or in bulk"""
+        support = staff[UserRole.SUPPORT]
+        first, overlapping, later = (event_on(db, contract, 1), event_on(db, contract, 1, (11, 13)),
+                                     event_on(db, contract, 2))
+        assign_support_to_event(db, first.id, support.id)
+
+        with pytest.raises(ScheduleConflictError):
+            assign_support_to_event(db, overlapping.id, support.id)
+        report = assign_supports(db, [(overlapping.id, support.id), (later.id, support.id)], staff[UserRole.GESTION])
+
+        assert report['updated'] == 1
+        assert report['conflicts'] == {overlapping.id: [first.id]}
+        assert db.scalars(select(Event.id).where(Event.support_id == support.id).order_by(Event.id)).all() == \
+            [first.id, later.id]
@@ -0,0 +1,244 @@
+import asyncio
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.db.async_connection import build_async_engine, to_async_url
+from app.models.base import Base
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.aio import auth_service, client_service, contract_service, event_service, user_service
+from app.services.errors import ScheduleConflictError, StaleDataError
+from app.services.pagination import aiter_pages
+from app.utils.password import hash_password
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def run_async(tmp_path):
+    """Run a coroutine taking an AsyncSession on a fresh SQLite database"""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    engine = build_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def setup():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    async def run(coroutine_function):
+        async with session_factory() as db:
+            return await coroutine_function(db)
+
+    def runner(coroutine_function, with_factory=False):
+        async def main():
+            try:
+                if with_factory:
+                    return await coroutine_function(session_factory)
+                return await run(coroutine_function)
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+
+    asyncio.run(setup())
+    return runner
+
+
+async def seed(db):
+    alice = User(name="Alice", email="alice@mail.com", password=hash_password("secret", rounds=4),
+                 role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    acme = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    globex = Client(full_name="Globex", email="globex@mail.com", commercial=bob)
+    signed = Contract(client=acme, commercial=alice, total_amount=1000, amount_due=0, is_signed=True)
+    unsigned = Contract(client=globex, commercial=bob, total_amount=500, amount_due=500, is_signed=False)
+    db.add_all([
+        sam, unsigned,
+        Event(name="Gala", contract=signed, client=acme, support_contact=sam,
+              date_start=datetime(2025, 6, 1, 10), date_end=datetime(2025, 6, 1, 12)),
+        Event(name="Expo", contract=signed, client=acme,
+              date_start=datetime(2025, 7, 1, 10), date_end=datetime(2025, 7, 1, 12)),
+    ])
+    await db.commit()
+    return {'alice': alice, 'bob': bob, 'sam': sam}
+
+
+class TestAsyncConnection:
+    """Test cases for the async engine configuration"""
+
+    def test_to_async_url(self):
+        """Test that the sync drivers are swapped for their asyncio counterparts"""
+        assert to_async_url("postgresql+psycopg2://u:p@db:5432/crm").drivername == "postgresql+asyncpg"
+        assert to_async_url("sqlite:///crm.db").drivername == "sqlite+aiosqlite"
+        with pytest.raises(ValueError, match="No async driver"):
+            to_async_url("mysql://u:p@db/crm")
+
+
+class TestAsyncServices:
+    """Test cases for the async service layer"""
+
+    def test_listings_load_relationships_eagerly(self, run_async):
+        """Test that listings can be displayed without lazy loads, which asyncio forbids"""
+        async def scenario(db):
+            await seed(db)
+            db.expunge_all()
+            contracts = await contract_service.get_all_contracts(db)
+            events = [event async for event in aiter_pages(
+                lambda **page: event_service.get_events_with_details_page(db, **page), page_size=1)]
+            clients = await client_service.get_clients_page(db)
+            return ([(c.client.full_name, c.commercial.name) for c in contracts],
+                    [(e.name, e.contract.client.full_name, e.support_contact and e.support_contact.name)
+                     for e in events],
+                    [(c.full_name, c.commercial.name) for c in clients])
+
+        contracts, events, clients = run_async(scenario)
+
+        assert sorted(contracts) == [("Acme", "Alice"), ("Globex", "Bob")]
+        assert events == [("Gala", "Acme", "Sam"), ("Expo", "Acme", None)]
+        assert sorted(clients) == [("Acme", "Alice"), ("Globex", "Bob")]
+
+    def test_filters_and_permissions(self, run_async):
+        """Test the filtered listings and the permission checks of updates"""
+        async def scenario(db):
+            staff = await seed(db)
+            unassigned = await event_service.get_filtered_events(db, {'support_contact_id': None})
+            unpaid = await contract_service.list_unpaid_contracts(db)
+            mine = await contract_service.get_contracts_by_user(db, staff['bob'])
+            supports = await event_service.get_support_users(db)
+            with pytest.raises(PermissionError):
+                await contract_service.update_contract(db, unpaid[0].id, staff['alice'], is_signed=True)
+            updated = await contract_service.update_contract(db, unpaid[0].id, staff['bob'], is_signed=True)
+            return unassigned, unpaid, mine, supports, updated
+
+        unassigned, unpaid, mine, supports, updated = run_async(scenario)
+
+        assert [event.name for event in unassigned] == ["Expo"]
+        assert [contract.client.full_name for contract in unpaid] == ["Globex"]
+        assert [contract.commercial_id for contract in mine] == [updated.commercial_id]
+        assert [support.name for support in supports] == ["Sam"]
+        assert updated.is_signed is True
+
+    def test_record_payment(self, run_async):
+        """Test that payments are applied by the database and refused for other commercials"""
+        async def scenario(db):
+            staff = await seed(db)
+            contract = (await contract_service.list_unpaid_contracts(db))[0]
+            amount_due = await contract_service.record_payment(db, contract.id, "499.99", staff['bob'])
+            loaded_amount_due = contract.amount_due
+            with pytest.raises(PermissionError):
+                await contract_service.record_payment(db, contract.id, "0.01", staff['alice'])
+            return amount_due, loaded_amount_due
+
+        assert run_async(scenario) == (Decimal("0.01"), Decimal("0.01"))
+
+    def test_user_service(self, run_async):
+        """Test creating users and counting their associations in one query"""
+        async def scenario(db):
+            staff = await seed(db)
+            with patch("app.services.aio.user_service.hash_password", return_value="hashed"):
+                carol = await user_service.create_user(db, "Carol", "carol@mail.com", UserRole.SUPPORT, "pw")
+            return (await user_service.check_user_associations(db, staff['alice'].id),
+                    await user_service.check_user_associations(db, carol.id),
+                    await user_service.email_exists_for_different_user(db, "carol@mail.com", staff['alice'].id),
+                    [support.name for support in await event_service.get_support_users(db)])
+
+        alice_associations, carol_associations, email_taken, supports = run_async(scenario)
+
+        assert (alice_associations['clients_count'], alice_associations['contracts_count']) == (1, 1)
+        assert carol_associations['has_associations'] is False
+        assert email_taken is True
+        assert supports == ["Carol", "Sam"]
+
+    def test_login_user(self, run_async):
+        """Test that login verifies the password off the event loop"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                await seed(db)
+            return (await auth_service.login_user("alice@mail.com", "secret", session_factory),
+                    await auth_service.login_user("alice@mail.com", "wrong", session_factory))
+
+        with patch.dict("os.environ", {"BCRYPT_ROUNDS": "4"}):
+            user, refused = run_async(scenario, with_factory=True)
+
+        assert user.name == "Alice"
+        assert refused is None
+
+    def test_concurrent_update_is_stale(self, run_async):
+        """Test that an update from an outdated version raises StaleDataError"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                staff = await seed(db)
+            async with session_factory() as first, session_factory() as second:
+                client = (await client_service.get_clients_by_user(first, staff['alice']))[0]
+                await client_service.update_client(second, client.id, staff['alice'], phone="0600000000")
+                with pytest.raises(StaleDataError) as stale:
+                    await client_service.update_client(first, client.id, staff['alice'], phone="0700000000")
+                return stale.value.conflicts
+
+        assert run_async(scenario, with_factory=True) == {'phone': ("0700000000", "0600000000")}
+
+    def test_direct_update_checks_support(self, run_async):
+        """Test that an event the session has not loaded is updated only by its support"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                staff = await seed(db)
+                ids = {event.name: event.id for event in await event_service.get_events_page(db)}
+            async with session_factory() as db:
+                with pytest.raises(PermissionError):
+                    await event_service.update_event(db, ids['Expo'], staff['sam'], notes="mine")
+                gala = await event_service.update_event(db, ids['Gala'], staff['sam'], notes="ready")
+                return gala.notes, gala.version
+
+        assert run_async(scenario, with_factory=True) == ("ready", 2)
+
+    def test_overlapping_assignment_is_refused(self, run_async, mock_gestion_user):
+        """Test that a support cannot be given two events at once"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                staff = await seed(db)
+                ids = {event.name: event.id for event in await event_service.get_events_page(db)}
+            async with session_factory() as db:
+                with pytest.raises(ScheduleConflictError):
+                    await event_service.update_event(db, ids['Expo'], mock_gestion_user, support_id=staff['sam'].id,
+                                                     date_start=datetime(2025, 6, 1, 11))
+                expo = await event_service.update_event(db, ids['Expo'], mock_gestion_user, support_id=staff['sam'].id)
+                return expo.support_id == staff['sam'].id
+
+        assert run_async(scenario, with_factory=True) is True
+
+    def test_event_listings_and_assignment(self, run_async):
+        """Test the unpaginated event listings and assigning a support, as in the sync service"""
+        async def scenario(db):
+            staff = await seed(db)
+            db.expunge_all()
+            details = await event_service.get_events_with_details(db)
+            names = [(event.name, event.contract.client.full_name) for event in details]
+            expo, = await event_service.list_unassigned_events(db)
+            await event_service.assign_support_to_event(db, expo.id, staff['sam'].id)
+            assigned = await event_service.list_events_by_support(db, staff['sam'].id)
+            return names, sorted(event.name for event in assigned), len(await event_service.get_all_events(db))
+
+        names, assigned, count = run_async(scenario)
+
+        assert sorted(names) == [("Expo", "Acme"), ("Gala", "Acme")]
+        assert assigned == ["Expo", "Gala"]
+        assert count == 2
+
+    def test_concurrent_requests(self, run_async):
+        """Test that requests run concurrently on separate sessions of one engine"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                await seed(db)
+
+            async def request():
+                async with session_factory() as db:
+                    return len(await event_service.get_all_events_for_management(db))
+
+            return await asyncio.gather(*(request() for _ in range(10)))
+
+        assert run_async(scenario, with_factory=True) == [2] * 10
@@ -8,7 +8,7 @@ class TestAuthController:
     def setup_method(self):
         self.auth_controller = AuthController()
 
-    @patch('app.controllers.auth_controller.login_user')
+    @patch('app.services.auth_service.login_user')
     @patch('app.controllers.auth_controller.show_success')
     def test_login_successful(self, mock_show_success, mock_login_user, mock_user):
         """Test successful login"""
@@ -25,7 +25,7 @@ class TestAuthController:
         mock_login_user.assert_called_once_with(mock_user.email, "password123")
         mock_show_success.assert_called_once_with(f"Connexion réussie ! Bienvenue {mock_user.name}")
 
-    @patch('app.controllers.auth_controller.login_user')
+    @patch('app.services.auth_service.login_user')
     @patch('app.controllers.auth_controller.show_error')
     def test_login_invalid_credentials(self, mock_show_error, mock_login_user):
         """Test login with invalid credentials"""
@@ -78,6 +78,46 @@ class TestAuthController:
         assert result is None
         self.auth_controller.view.show_goodbye.assert_called_once()
 
+    @patch('app.controllers.auth_controller.has_stored_token', Mock(return_value=True))
+    @patch('app.services.auth_service.restore_session')
+    @patch('app.services.auth_service.login_user')
+    @patch('app.controllers.auth_controller.show_success')
+    def test_login_restores_session(self, mock_show_success, mock_login_user, mock_restore_session, mock_user):
+        """Test that a valid session token skips the login menu"""
+        mock_restore_session.return_value = mock_user
+        self.auth_controller.view.show_login_menu = Mock()
+
+        result = self.auth_controller.login()
+
+        assert result == mock_user
+        mock_login_user.assert_not_called()
+        self.auth_controller.view.show_login_menu.assert_not_called()
+        mock_show_success.assert_called_once_with(f"Session restaurée. Bienvenue {mock_user.name}")
+
+    @patch('app.services.auth_service.remember_session')
+    @patch('app.services.auth_service.login_user')
+    @patch('app.controllers.auth_controller.show_success')
+    def test_login_remembers_session(self, mock_show_success, mock_login_user, mock_remember_session, mock_user):
+        """Test that a password login stores a session token"""
+        mock_login_user.return_value = mock_user
+        self.auth_controller.view.show_welcome = Mock()
+        self.auth_controller.view.show_login_menu = Mock(return_value="1")
+        self.auth_controller.view.get_login_credentials = Mock(return_value=(mock_user.email, "password123"))
+
+        self.auth_controller.login()
+
+        mock_remember_session.assert_called_once_with(mock_user)
+
+    @patch('app.controllers.auth_controller.clear_token')
+    @patch('app.controllers.auth_controller.show_success')
+    def test_logout_forgets_session(self, mock_show_success, mock_forget_session, mock_user):
+        """Test that logging out removes the session token"""
+        self.auth_controller.current_user = mock_user
+
+        self.auth_controller.logout()
+
+        mock_forget_session.assert_called_once()
+
     @patch('app.controllers.auth_controller.show_success')
     def test_logout_with_user(self, mock_show_success, mock_user):
         """Test logout with logged-in user"""
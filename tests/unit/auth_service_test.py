@@ -58,3 +58,41 @@ class TestAuthService:
             login_user("test@example.com", "password123")
 
         mock_database_session.close.assert_called_once()
+
+    @patch('app.services.auth_service.SessionLocal')
+    @patch('app.services.auth_service.verify_password')
+    @patch('app.services.auth_service.hash_password')
+    @patch('app.services.auth_service.needs_rehash')
+    def test_login_user_rehashes_outdated_hash(self, mock_needs_rehash, mock_hash_password, mock_verify_password,
+                                               mock_session_local, mock_database_session, mock_user):
+        """Test that a hash made with another cost is replaced on login"""
+        mock_session_local.return_value = mock_database_session
+        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_verify_password.return_value = True
+        mock_needs_rehash.return_value = True
+        mock_hash_password.return_value = "new_hash"
+
+        result = login_user("test@example.com", "password123")
+
+        assert result == mock_user
+        assert mock_user.password == "new_hash"
+        mock_hash_password.assert_called_once_with("password123")
+        mock_database_session.commit.assert_called_once()
+        mock_database_session.refresh.assert_called_once_with(mock_user)
+
+    @patch('app.services.auth_service.SessionLocal')
+    @patch('app.services.auth_service.verify_password')
+    @patch('app.services.auth_service.hash_password')
+    @patch('app.services.auth_service.needs_rehash')
+    def test_login_user_keeps_current_hash(self, mock_needs_rehash, mock_hash_password, mock_verify_password,
+                                           mock_session_local, mock_database_session, mock_user):
+        """Test that a hash made with the configured cost is left alone"""
+        mock_session_local.return_value = mock_database_session
+        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_verify_password.return_value = True
+        mock_needs_rehash.return_value = False
+
+        login_user("test@example.com", "password123")
+
+        mock_hash_password.assert_not_called()
+        mock_database_session.commit.assert_not_called()
@@ -0,0 +1,114 @@
+from unittest.mock import Mock, patch
+
+from app.models.user import User, UserRole
+from app.services.cache import TTLCache, get_staff_by_role, get_staff_cache_stats
+from app.services.user_service import create_user, delete_user, update_user
+
+
+class TestTTLCache:
+    """Test cases for the TTL + LRU cache"""
+
+    def test_get_counts_hits_and_misses(self):
+        """Test the hit/miss counters"""
+        cache = TTLCache(maxsize=4, ttl=60)
+
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+        assert stats['hit_ratio'] == 0.5
+
+    def test_entries_expire_after_ttl(self):
+        """Test that an entry older than ttl is a miss"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        with patch("app.services.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+
+        with patch("app.services.cache.time.monotonic", return_value=160.0):
+            assert cache.get("a") is None
+
+        assert cache.stats()['size'] == 0
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the oldest unused entry is dropped when the cache is full"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    def test_get_or_load_calls_loader_once(self):
+        """Test that the loader only runs on a miss"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        load = Mock(return_value=[1, 2])
+
+        assert cache.get_or_load("a", load) == [1, 2]
+        assert cache.get_or_load("a", load) == [1, 2]
+
+        load.assert_called_once()
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that ttl=0 makes every lookup a miss"""
+        cache = TTLCache(maxsize=4, ttl=0)
+        load = Mock(return_value=1)
+
+        cache.get_or_load("a", load)
+        cache.get_or_load("a", load)
+
+        assert load.call_count == 2
+
+    def test_invalidate(self):
+        """Test dropping one entry or all of them"""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+        cache.invalidate()
+        assert cache.stats()['size'] == 0
+
+
+class TestStaffCache:
+    """Test cases for the cached staff lookups"""
+
+    def test_staff_lookup_reads_through_cache(self, db_session, statement_counter):
+        """Test that staff lists are queried once then served from the cache"""
+        db_session.add_all([
+            User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.SUPPORT),
+            User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.SUPPORT),
+            User(name="Carol", email="carol@mail.com", password="hashed", role=UserRole.COMMERCIAL),
+        ])
+        db_session.commit()
+        statement_counter.clear()
+
+        first = get_staff_by_role(db_session, UserRole.SUPPORT)
+        second = get_staff_by_role(db_session, UserRole.SUPPORT)
+
+        assert [user.name for user in first] == ["Alice", "Bob"]
+        assert second == first
+        assert len(statement_counter) == 1
+        assert get_staff_cache_stats()['hits'] == 1
+
+    @patch('app.services.user_service.hash_password', return_value="hashed")
+    def test_user_changes_invalidate_cache(self, mock_hash_password, db_session):
+        """Test that creating, updating and deleting users refreshes the staff lists"""
+        assert get_staff_by_role(db_session, UserRole.SUPPORT) == []
+
+        user = create_user(db_session, "Alice", "alice@mail.com", UserRole.SUPPORT, "secret")
+        assert [row.name for row in get_staff_by_role(db_session, UserRole.SUPPORT)] == ["Alice"]
+
+        update_user(db_session, user.id, role=UserRole.COMMERCIAL)
+        assert get_staff_by_role(db_session, UserRole.SUPPORT) == []
+        assert [row.id for row in get_staff_by_role(db_session, UserRole.COMMERCIAL)] == [user.id]
+
+        delete_user(db_session, user.id)
+        assert get_staff_by_role(db_session, UserRole.COMMERCIAL) == []
@@ -0,0 +1,211 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from click.testing import CliRunner
+from sqlalchemy.orm import sessionmaker
+
+from app.cli import cli, main
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+def crm(sqlite_engine, db_session):
+    """Staff, two clients with one contract each and an unassigned event, sessions bound to SQLite"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    gestion = User(name="Gestion", email="gestion@mail.com", password="hashed", role=UserRole.GESTION)
+    acme = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    globex = Client(full_name="Globex", email="globex@mail.com", commercial=bob)
+    acme_contract = Contract(client=acme, commercial=alice, total_amount=1000, amount_due=500, is_signed=True)
+    globex_contract = Contract(client=globex, commercial=bob, total_amount=800, amount_due=800, is_signed=False)
+    event = Event(name="Gala", contract=acme_contract, client=acme,
+                  date_start=datetime(2025, 6, 1, 10), date_end=datetime(2025, 6, 1, 12))
+    db_session.add_all([gestion, sam, acme_contract, globex_contract, event])
+    db_session.commit()
+
+    users = {user.email: user for user in (alice, bob, sam, gestion)}
+    for user in users.values():
+        db_session.expunge(user)
+
+    with patch("app.db.unit_of_work.SessionLocal", sessionmaker(bind=sqlite_engine)), \
+            patch("app.cli.login_user", side_effect=lambda email, password: users.get(email)) as mock_login:
+        yield {'login': mock_login, 'event_id': event.id, 'acme_contract_id': acme_contract.id}
+
+
+def invoke(*args, input=None):
+    return CliRunner().invoke(cli, list(args), input=input, catch_exceptions=False)
+
+
+class TestCli:
+    """Test cases for the non-interactive command line"""
+
+    def test_clients_list(self, crm):
+        """Test listing clients as tab separated values"""
+        result = invoke("--email", "alice@mail.com", "--password", "x", "clients", "list")
+
+        assert result.exit_code == 0
+        lines = result.output.splitlines()
+        assert lines[0].split("\t") == ["id", "full_name", "email", "phone", "company_name", "commercial"]
+        assert [line.split("\t")[1] for line in lines[1:]] == ["Acme", "Globex"]
+
+    def test_clients_search(self, crm):
+        """Test searching clients, only the commercial's own with --mine"""
+        found = invoke("--email", "alice@mail.com", "--password", "x", "clients", "search", "GLOBEX")
+        mine = invoke("--email", "alice@mail.com", "--password", "x", "clients", "search", "globex", "--mine")
+
+        assert [line.split("\t")[1] for line in found.output.splitlines()[1:]] == ["Globex"]
+        assert mine.output.splitlines()[1:] == []
+
+    def test_credentials_from_environment(self, crm, monkeypatch):
+        """Test that EPIC_EMAIL and EPIC_PASSWORD log in without prompting"""
+        monkeypatch.setenv("EPIC_EMAIL", "alice@mail.com")
+        monkeypatch.setenv("EPIC_PASSWORD", "x")
+
+        result = invoke("contracts", "list")
+
+        assert result.exit_code == 0
+        crm['login'].assert_called_once_with("alice@mail.com", "x")
+
+    def test_wrong_credentials(self, crm):
+        """Test that a failed login stops the command"""
+        result = CliRunner().invoke(cli, ["--email", "nobody@mail.com", "--password", "x", "clients", "list"])
+
+        assert result.exit_code == 1
+        assert "Email ou mot de passe incorrect." in result.output
+
+    def test_contracts_filter_for_commercial(self, crm):
+        """Test that a commercial only sees their own contracts"""
+        result = invoke("--email", "bob@mail.com", "--password", "x", "contracts", "filter", "--unpaid")
+
+        rows = [line.split("\t") for line in result.output.splitlines()[1:]]
+        assert [row[1] for row in rows] == ["Globex"]
+
+    def test_contracts_filter_in_query(self, crm, statement_counter):
+        """Test that the commercial's contracts are selected by the query, not filtered afterwards"""
+        result = invoke("--email", "alice@mail.com", "--password", "x", "contracts", "filter", "--signed")
+
+        assert [line.split("\t")[1] for line in result.output.splitlines()[1:]] == ["Acme"]
+        listing = next(statement for statement in statement_counter if "FROM contracts" in statement)
+        assert "contracts.commercial_id = " in listing
+
+    def test_contracts_update_other_commercial(self, crm):
+        """Test that updating someone else's contract is refused"""
+        result = CliRunner().invoke(cli, ["--email", "bob@mail.com", "--password", "x", "contracts", "update",
+                                          str(crm['acme_contract_id']), "--signed"])
+
+        assert isinstance(result.exception, PermissionError)
+
+    def test_contracts_pay(self, crm):
+        """Test recording a payment, amounts accepting a decimal comma"""
+        result = invoke("--email", "alice@mail.com", "--password", "x",
+                        "contracts", "pay", str(crm['acme_contract_id']), "100,5")
+        refused = invoke("--email", "alice@mail.com", "--password", "x",
+                         "contracts", "pay", str(crm['acme_contract_id']), "abc")
+
+        assert result.output == "Paiement de 100.50 € enregistré, reste dû : 399.50 €.\n"
+        assert refused.exit_code == 2
+
+    def test_events_assign(self, crm, sqlite_engine):
+        """Test assigning a support by email"""
+        result = invoke("--email", "gestion@mail.com", "--password", "x",
+                        "events", "assign", str(crm['event_id']), "SAM@mail.com")
+
+        assert result.output == f"Événement {crm['event_id']} assigné à Sam.\n"
+        with sessionmaker(bind=sqlite_engine)() as session:
+            assert session.get(Event, crm['event_id']).support_contact.name == "Sam"
+
+    def test_events_filter_mine_is_for_support(self, crm):
+        """Test that --mine lists the support's events and is refused to other roles"""
+        mine = invoke("--email", "sam@mail.com", "--password", "x", "events", "filter", "--mine")
+        refused = CliRunner().invoke(cli, ["--email", "alice@mail.com", "--password", "x",
+                                           "events", "filter", "--mine"])
+
+        assert mine.exit_code == 0 and mine.output.splitlines()[1:] == []
+        assert refused.exit_code == 2
+        assert "--mine est réservé aux membres du support." in refused.output
+
+    def test_events_assign_requires_gestion(self, crm):
+        """Test that only gestion can assign supports"""
+        result = CliRunner().invoke(cli, ["--email", "sam@mail.com", "--password", "x",
+                                          "events", "assign", str(crm['event_id']), "sam@mail.com"])
+
+        assert result.exit_code == 1
+        assert "Accès non autorisé." in result.output
+
+    def test_events_assign_many_from_file(self, crm, sqlite_engine, tmp_path):
+        """Test assigning events listed in a CSV file and reporting the missing ones"""
+        assignments = tmp_path / "assignments.csv"
+        assignments.write_text(f"event_id,support_email\n{crm['event_id']},sam@mail.com\n999,sam@mail.com\n",
+                               encoding="utf-8")
+
+        result = CliRunner().invoke(cli, ["--email", "gestion@mail.com", "--password", "x",
+                                          "events", "assign-many", "--file", str(assignments)])
+
+        assert result.exit_code == 1
+        assert "1/2 événement(s) assigné(s) en 1 lot(s)." in result.output
+        assert "Événement(s) introuvable(s) : 999." in result.output
+        with sessionmaker(bind=sqlite_engine)() as session:
+            assert session.get(Event, crm['event_id']).support_contact.name == "Sam"
+
+    def test_events_assign_many_by_filter(self, crm, sqlite_engine):
+        """Test assigning every event matching the filters"""
+        result = invoke("--email", "gestion@mail.com", "--password", "x",
+                        "events", "assign-many", "--unassigned", "--from", "2025-01-01", "--support", "sam@mail.com")
+
+        assert result.output == "1/1 événement(s) assigné(s) à Sam.\n"
+        with sessionmaker(bind=sqlite_engine)() as session:
+            assert session.get(Event, crm['event_id']).support_contact.name == "Sam"
+
+    def test_run_commands_file_logs_in_once(self, crm, tmp_path):
+        """Test that a command file runs every line with one login and one session"""
+        commands = tmp_path / "commands.txt"
+        commands.write_text(
+            "# nightly report\n"
+            "events filter --unassigned\n"
+            f"events assign {crm['event_id']} sam@mail.com\n"
+            "\n"
+            "events filter --unassigned\n"
+            "contracts update 999 --signed\n",
+            encoding="utf-8"
+        )
+
+        with patch("app.db.unit_of_work.UnitOfWork.close") as mock_close:
+            result = CliRunner().invoke(cli, ["--email", "gestion@mail.com", "--password", "x",
+                                              "run", str(commands)])
+
+        crm['login'].assert_called_once()
+        mock_close.assert_called_once()
+        assert result.exit_code == 1
+        assert result.output.count("Gala") == 1
+        assert "ligne 6 : Contrat 999 introuvable." in result.output
+        assert "1 commande(s) en échec." in result.output
+
+    def test_session_token_skips_login(self, crm, sqlite_engine, monkeypatch):
+        """Test that later invocations reuse the session token until logout"""
+        monkeypatch.setenv("SESSION_SECRET", "test-secret")
+
+        with patch("app.services.auth_service.SessionLocal", sessionmaker(bind=sqlite_engine)):
+            first = invoke("--email", "alice@mail.com", "--password", "x", "clients", "list")
+            second = invoke("clients", "list", "--mine")
+            other_user = invoke("--email", "bob@mail.com", "--password", "x", "contracts", "list")
+            invoke("logout")
+            after_logout = invoke("clients", "list", input="\n")
+
+        assert first.exit_code == 0
+        assert [line.split("\t")[1] for line in second.output.splitlines()[1:]] == ["Acme"]
+        assert other_user.exit_code == 0
+        assert after_logout.exit_code != 0
+        assert [call.args[0] for call in crm['login'].call_args_list] == ["alice@mail.com", "bob@mail.com"]
+
+    def test_main_reports_permission_errors(self, crm, capsys):
+        """Test that the entry point turns service permission errors into an exit code"""
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--email", "bob@mail.com", "--password", "x", "contracts", "update",
+                  str(crm['acme_contract_id']), "--signed"])
+
+        assert exit_info.value.code == 1
+        assert "You can only update your own contracts." in capsys.readouterr().err
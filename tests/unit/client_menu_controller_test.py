@@ -15,51 +15,70 @@ class TestClientMenuController:
         self.controller.handle_menu()
         mock_show_error.assert_called_with("Choix invalide ou non autorisé.")
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_all_clients')
-    def test_list_clients_success(self, mock_get_all_clients, mock_session_local, mock_database_session, mock_client):
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.client_menu_controller.get_clients_page')
+    def test_list_clients_success(self, mock_get_clients_page, mock_session_local, mock_database_session,
+                                  mock_client):
         mock_session_local.return_value = mock_database_session
-        mock_get_all_clients.return_value = [mock_client]
+        mock_get_clients_page.return_value = [mock_client]
 
-        self.controller.view.display_clients_list = Mock()
+        self.controller.view.display_clients_list = Mock(side_effect=list)
         self.controller.list_clients()
 
-        mock_get_all_clients.assert_called_once_with(mock_database_session)
-        self.controller.view.display_clients_list.assert_called_once_with([mock_client])
-        mock_database_session.close.assert_called_once()
+        mock_get_clients_page.assert_called_once_with(mock_database_session, after_id=None, limit=100)
+        displayed = self.controller.view.display_clients_list.call_args[0][0]
+        assert not isinstance(displayed, list)
+        mock_database_session.close.assert_not_called()
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_all_clients')
-    @patch('app.controllers.client_menu_controller.show_info')
-    def test_list_clients_empty(self, mock_show_info, mock_get_all_clients, mock_session_local, mock_database_session):
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.client_menu_controller.get_clients_page')
+    def test_list_clients_fetches_following_pages(self, mock_get_clients_page, mock_session_local,
+                                                  mock_database_session):
+        mock_session_local.return_value = mock_database_session
+        first_page = [Mock(id=i) for i in range(1, 101)]
+        mock_get_clients_page.side_effect = [first_page, [Mock(id=101)]]
+        displayed = []
+
+        self.controller.view.display_clients_list = Mock(side_effect=displayed.extend)
+        self.controller.list_clients()
+
+        assert len(displayed) == 101
+        mock_get_clients_page.assert_called_with(mock_database_session, after_id=100, limit=100)
+
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.client_menu_controller.get_clients_page')
+    def test_list_clients_empty(self, mock_get_clients_page, mock_session_local, mock_database_session):
         mock_session_local.return_value = mock_database_session
-        mock_get_all_clients.return_value = []
+        mock_get_clients_page.return_value = []
+        displayed = []
 
+        self.controller.view.display_clients_list = Mock(side_effect=displayed.extend)
         self.controller.list_clients()
 
-        mock_show_info.assert_called_once_with("Aucun client trouvé.")
-        mock_database_session.close.assert_called_once()
+        assert displayed == []
+        mock_database_session.close.assert_not_called()
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_all_clients')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.client_menu_controller.get_clients_page')
     @patch('app.controllers.client_menu_controller.show_error')
-    @patch('app.controllers.client_menu_controller.sentry_sdk')
-    def test_list_clients_exception(self, mock_sentry, mock_show_error, mock_get_all_clients,
+    @patch('app.controllers.client_menu_controller.telemetry')
+    def test_list_clients_exception(self, mock_telemetry, mock_show_error, mock_get_clients_page,
                                     mock_session_local, mock_database_session):
         mock_session_local.return_value = mock_database_session
-        mock_get_all_clients.side_effect = Exception("Database error")
+        mock_get_clients_page.side_effect = Exception("Database error")
 
+        self.controller.view.display_clients_list = Mock(side_effect=list)
         self.controller.list_clients()
 
         mock_show_error.assert_called_once_with("Erreur lors de la récupération des clients: Database error")
-        mock_sentry.capture_exception.assert_called_once()
-        mock_database_session.close.assert_called_once()
+        mock_telemetry.capture_exception.assert_called_once()
+        mock_database_session.close.assert_not_called()
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.client_menu_controller.create_client')
     @patch('app.controllers.client_menu_controller.show_success')
-    @patch('app.controllers.client_menu_controller.sentry_sdk')
-    def test_create_client_success(self, mock_sentry, mock_show_success, mock_create_client,
+    @patch('app.controllers.client_menu_controller.telemetry')
+    def test_create_client_success(self, mock_telemetry, mock_show_success, mock_create_client,
                                    mock_session_local, mock_user, mock_database_session):
         self.controller.current_user = mock_user
         mock_session_local.return_value = mock_database_session
@@ -83,8 +102,8 @@ class TestClientMenuController:
 
         mock_create_client.assert_called_once_with(mock_database_session, mock_user.id, **expected_data)
         mock_show_success.assert_called_once_with("Client 'Test Client' créé avec succès (ID: 1)")
-        mock_sentry.capture_message.assert_called_once()
-        mock_database_session.close.assert_called_once()
+        mock_telemetry.record_event.assert_called_once()
+        mock_database_session.close.assert_not_called()
 
     @patch('app.controllers.client_menu_controller.show_error')
     def test_create_client_unauthorized(self, mock_show_error, mock_support_user):
@@ -103,23 +122,20 @@ class TestClientMenuController:
 
         mock_show_error.assert_called_once_with("Le nom complet et l'email sont obligatoires.")
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_clients_by_user')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.client_menu_controller.update_client')
     @patch('app.controllers.client_menu_controller.show_success')
-    @patch('app.controllers.client_menu_controller.sentry_sdk')
-    def test_update_client_success(self, mock_sentry, mock_show_success, mock_update_client,
-                                   mock_get_clients, mock_session_local,
+    @patch('app.controllers.client_menu_controller.telemetry')
+    def test_update_client_success(self, mock_telemetry, mock_show_success, mock_update_client, mock_session_local,
                                    mock_database_session, mock_user, mock_client):
         self.controller.current_user = mock_user
         mock_session_local.return_value = mock_database_session
 
-        mock_get_clients.return_value = [mock_client]
         updated_data = {'full_name': 'Updated Client', 'email': 'updated@example.com'}
         mock_updated_client = Mock(full_name='Updated Client')
         mock_update_client.return_value = mock_updated_client
 
-        self.controller.view.get_client_selection = Mock(return_value=mock_client)
+        self.controller.view.search_client = Mock(return_value=mock_client)
         self.controller.view.get_client_update_data = Mock(return_value=updated_data)
 
         self.controller.update_client()
@@ -129,8 +145,8 @@ class TestClientMenuController:
 
         mock_update_client.assert_called_once_with(mock_database_session, mock_client.id, mock_user, **expected_data)
         mock_show_success.assert_called_once_with("Client 'Updated Client' modifié avec succès.")
-        mock_sentry.capture_message.assert_called_once()
-        mock_database_session.close.assert_called_once()
+        mock_telemetry.record_event.assert_called_once()
+        mock_database_session.close.assert_not_called()
 
     @patch('app.controllers.client_menu_controller.show_error')
     def test_update_client_unauthorized(self, mock_show_error, mock_support_user):
@@ -139,33 +155,34 @@ class TestClientMenuController:
         mock_show_error.assert_called_once_with("Accès non autorisé. Seuls les commerciaux et"
                                                 " la gestion peuvent modifier des clients.")
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_clients_by_user')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.client_menu_controller.search_clients')
     @patch('app.controllers.client_menu_controller.show_info')
-    def test_update_client_no_clients(self, mock_show_info, mock_get_clients, mock_session_local, mock_database_session,
-                                      mock_user):
+    def test_update_client_no_clients(self, mock_show_info, mock_search_clients, mock_session_local,
+                                      mock_database_session, mock_user):
+        """Test that the search is limited to the commercial's clients and finding none cancels"""
         self.controller.current_user = mock_user
         mock_session_local.return_value = mock_database_session
-        mock_get_clients.return_value = []
+        mock_search_clients.return_value = []
+        self.controller.view.search_client = Mock(side_effect=lambda search: search("acme") or None)
 
         self.controller.update_client()
 
-        mock_show_info.assert_called_once_with("Aucun client disponible pour modification.")
-        mock_database_session.close.assert_called_once()
+        mock_search_clients.assert_called_once_with(mock_database_session, "acme", commercial_id=mock_user.id)
+        mock_show_info.assert_called_once_with("Modification annulée.")
+        mock_database_session.close.assert_not_called()
 
-    @patch('app.controllers.client_menu_controller.SessionLocal')
-    @patch('app.controllers.client_menu_controller.get_clients_by_user')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.client_menu_controller.show_error')
-    def test_update_client_permission_error(self, mock_show_error, mock_get_clients, mock_session_local,
+    def test_update_client_permission_error(self, mock_show_error, mock_session_local,
                                             mock_database_session, mock_client, mock_user):
         self.controller.current_user = mock_user
         mock_client.commercial_id = 999  # Not the same as mock_user.id
 
         mock_session_local.return_value = mock_database_session
-        mock_get_clients.return_value = [mock_client]
-        self.controller.view.get_client_selection = Mock(return_value=mock_client)
+        self.controller.view.search_client = Mock(return_value=mock_client)
 
         self.controller.update_client()
 
         mock_show_error.assert_called_once_with("Vous ne pouvez modifier que vos propres clients.")
-        mock_database_session.close.assert_called_once()
+        mock_database_session.close.assert_not_called()
@@ -137,6 +137,20 @@ class TestClientMenuView:
         for line in expected_lines:
             assert any(line in echoed for echoed in echo_calls), f"Expected line not found: {line}"
 
+    @patch("click.echo")
+    def test_display_clients_list_from_generator(self, mock_echo, client_menu_view, mock_client):
+        """Test displaying clients streamed from a page iterator"""
+        mock_client.commercial = None
+        client_menu_view.display_clients_list(client for client in [mock_client, mock_client])
+
+        mock_echo.assert_any_call("2. ID: 1")
+        mock_echo.assert_any_call("\n Total: 2 client(s)")
+
+    @patch("click.echo")
+    def test_display_clients_list_empty_generator(self, mock_echo, client_menu_view):
+        client_menu_view.display_clients_list(client for client in [])
+        mock_echo.assert_any_call("Aucun client trouvé.")
+
     @patch("click.echo")
     def test_display_clients_list_missing_fields(self, mock_echo, client_menu_view):
         mock_client = Mock()
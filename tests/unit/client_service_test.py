@@ -31,7 +31,7 @@ class TestClientService:
         mock_user.role = mock_client.role = mock_user.role  # COMMERCIAL
         mock_client.commercial_id = mock_user.id
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_client
+        mock_database_session.identity_map.get.return_value = mock_client
 
         update_fields = {"full_name": "New Name", "email": "new@example.com"}
 
@@ -46,14 +46,14 @@ class TestClientService:
         """Test client update permission error for commercial user"""
         mock_client.commercial_id = mock_user.id + 1  # Different from user
         mock_user.role = UserRole.COMMERCIAL
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_client
+        mock_database_session.identity_map.get.return_value = mock_client
 
         with pytest.raises(PermissionError, match="You can only update your own clients."):
             update_client(mock_database_session, 1, mock_user, full_name="New Name")
 
     def test_update_client_success_gestion(self, mock_database_session, mock_gestion_user, mock_client):
         """Test successful client update by gestion user"""
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_client
+        mock_database_session.identity_map.get.return_value = mock_client
         update_fields = {"full_name": "Updated Name"}
 
         result = update_client(mock_database_session, 1, mock_gestion_user, **update_fields)
@@ -65,45 +65,46 @@ class TestClientService:
     def test_get_all_clients(self, mock_database_session):
         """Test getting all clients"""
         mock_clients = [Mock(), Mock()]
-        mock_database_session.query.return_value.all.return_value = mock_clients
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_clients
 
         result = get_all_clients(mock_database_session)
 
         assert result == mock_clients
         mock_database_session.query.assert_called_once_with(Client)
-        mock_database_session.query.return_value.all.assert_called_once()
+        mock_database_session.query.return_value.options.return_value.all.assert_called_once()
 
     def test_get_clients_by_user_commercial(self, mock_database_session, mock_user):
         """Test getting clients for commercial user"""
         mock_user.role = UserRole.COMMERCIAL
         mock_user.id = 1
         mock_clients = [Mock(), Mock()]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_clients
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter_by.return_value.all.return_value = mock_clients
 
         result = get_clients_by_user(mock_database_session, mock_user)
 
         assert result == mock_clients
         mock_database_session.query.assert_called_once_with(Client)
-        mock_database_session.query.return_value.filter_by.assert_called_once_with(commercial_id=1)
+        mock_database_session.query.return_value.options.return_value.filter_by.assert_called_once_with(commercial_id=1)
 
     def test_get_clients_by_user_gestion(self, mock_database_session, mock_gestion_user):
         """Test getting clients for gestion user"""
         mock_clients = [Mock(), Mock()]
-        mock_database_session.query.return_value.all.return_value = mock_clients
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_clients
 
         result = get_clients_by_user(mock_database_session, mock_gestion_user)
 
         assert result == mock_clients
         mock_database_session.query.assert_called_once_with(Client)
-        mock_database_session.query.return_value.all.assert_called_once()
+        mock_database_session.query.return_value.options.return_value.all.assert_called_once()
 
     def test_get_clients_by_user_support(self, mock_database_session, mock_support_user):
         """Test getting clients for support user"""
         mock_clients = [Mock(), Mock()]
-        mock_database_session.query.return_value.all.return_value = mock_clients
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_clients
 
         result = get_clients_by_user(mock_database_session, mock_support_user)
 
         assert result == mock_clients
         mock_database_session.query.assert_called_once_with(Client)
-        mock_database_session.query.return_value.all.assert_called_once()
+        mock_database_session.query.return_value.options.return_value.all.assert_called_once()
@@ -0,0 +1,188 @@
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.client_service import update_client
+from app.services.contract_service import record_payment, update_contract
+from app.services.errors import StaleDataError
+from app.services.event_service import assign_support_to_event, update_event
+from app.services.versioning import retry_on_stale
+from app.views.contract_menu_view import ContractMenuView
+
+UPDATERS = 8
+
+
+@pytest.fixture
+def crm(tmp_path):
+    """A file database shared by the parallel updaters, each using its own session"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}", connect_args={'timeout': 30})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with session_factory() as db:
+        gestion = User(name="Gestion", email="gestion@mail.com", password="hashed", role=UserRole.GESTION)
+        client = Client(full_name="Acme", email="acme@mail.com", commercial=gestion)
+        contract = Contract(client=client, commercial=gestion, total_amount=1000, amount_due=1000)
+        event = Event(name="Gala", contract=contract, client=client,
+                      date_start=datetime(2025, 6, 1, 10), date_end=datetime(2025, 6, 1, 12))
+        db.add(event)
+        db.commit()
+        ids = {'client': client.id, 'contract': contract.id, 'event': event.id}
+    yield {'session_factory': session_factory, 'gestion': gestion, **ids}
+    engine.dispose()
+
+
+def run_updaters(crm, model, update):
+    """Run update(db, instance, n) in parallel sessions that all loaded the row before anyone saved it"""
+    loaded = threading.Barrier(UPDATERS)
+
+    def updater(n):
+        with crm['session_factory']() as db:
+            instance = db.get(model, crm[model.__tablename__[:-1]])
+            loaded.wait()
+            try:
+                return update(db, instance, n)
+            except StaleDataError as e:
+                return e
+
+    with ThreadPoolExecutor(max_workers=UPDATERS) as executor:
+        return list(executor.map(updater, range(UPDATERS)))
+
+
+class TestOptimisticLocking:
+    """Test cases for concurrent updates of versioned rows"""
+
+    def test_only_first_of_parallel_updaters_wins(self, crm):
+        """Test that updaters working from the same version cannot overwrite each other"""
+        results = run_updaters(crm, Event, lambda db, event, n: update_event(
+            db, event.id, crm['gestion'], notes=f"updater {n}"))
+
+        winners = [result for result in results if not isinstance(result, StaleDataError)]
+        conflicts = [result for result in results if isinstance(result, StaleDataError)]
+        assert len(winners) == 1
+        assert len(conflicts) == UPDATERS - 1
+        for error in conflicts:
+            assert error.entity == "Event"
+            assert error.conflicts['notes'][1] == winners[0].notes
+        with crm['session_factory']() as db:
+            assert db.get(Event, crm['event']).notes == winners[0].notes
+            assert db.get(Event, crm['event']).version == 2
+
+    def test_retry_merges_disjoint_changes(self, crm):
+        """Test that reapplying only each updater's own changes keeps everyone's work"""
+        fields = ["full_name", "email", "phone", "company_name"]
+
+        def update(db, client, n):
+            changes = {fields[n % len(fields)]: f"{fields[n % len(fields)]} {n}"}
+            return retry_on_stale(lambda changed: update_client(db, client.id, crm['gestion'], **changed),
+                                  changes, lambda error: True)
+
+        results = run_updaters(crm, Client, update)
+
+        assert not any(isinstance(result, StaleDataError) for result in results)
+        with crm['session_factory']() as db:
+            client = db.get(Client, crm['client'])
+            assert client.version == 1 + UPDATERS
+            for field in fields:
+                assert getattr(client, field).startswith(field)
+
+    def test_stale_edit_cannot_overwrite_payment(self, crm):
+        """Test that a payment made during an edit makes the edit stale instead of being lost"""
+        with crm['session_factory']() as editing, crm['session_factory']() as paying:
+            contract = editing.get(Contract, crm['contract'])
+            record_payment(paying, crm['contract'], 400, crm['gestion'])
+
+            with pytest.raises(StaleDataError) as stale:
+                update_contract(editing, contract.id, crm['gestion'], amount_due=Decimal("900"), is_signed=True)
+
+            assert stale.value.conflicts == {'amount_due': (Decimal("900.00"), Decimal("600.00"))}
+            assert contract.amount_due == Decimal("600.00")
+
+            retried = update_contract(editing, contract.id, crm['gestion'], is_signed=True)
+
+        assert (retried.amount_due, retried.is_signed, retried.version) == (Decimal("600.00"), True, 3)
+
+    def test_menu_edit_keeps_concurrent_payment(self, crm):
+        """Test that ticking "signed" in the menu while a payment is recorded keeps the payment"""
+        with crm['session_factory']() as db:
+            db.get(Contract, crm['contract']).total_amount = db.get(Contract, crm['contract']).amount_due = \
+                Decimal("1000.10")
+            db.commit()
+        with crm['session_factory']() as editing, crm['session_factory']() as paying:
+            contract = editing.get(Contract, crm['contract'])
+            # The user only ticks "signed", pressing enter on the amount keeps its default
+            with patch('click.echo'), patch('click.confirm', return_value=True), \
+                    patch('click.prompt', side_effect=lambda text, default, type: type(default)):
+                changes = ContractMenuView().get_contract_update_data(contract)
+            record_payment(paying, crm['contract'], 100, crm['gestion'])
+
+            updated = retry_on_stale(lambda fields: update_contract(editing, contract.id, crm['gestion'], **fields),
+                                     changes, lambda error: not error.conflicts)
+
+        assert changes == {'is_signed': True}
+        assert (updated.amount_due, updated.is_signed) == (Decimal("900.10"), True)
+
+    def test_assignment_of_stale_event(self, crm):
+        """Test that assigning a support to an event changed meanwhile raises the service StaleDataError"""
+        with crm['session_factory']() as db:
+            support = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+            db.add(support)
+            db.commit()
+        with crm['session_factory']() as assigning, crm['session_factory']() as editing:
+            event = assigning.get(Event, crm['event'])
+            update_event(editing, crm['event'], crm['gestion'], notes="moved")
+
+            with pytest.raises(StaleDataError) as stale:
+                assign_support_to_event(assigning, crm['event'], support.id)
+
+        assert stale.value.changes == {'support_id': support.id}
+        assert event.notes == "moved"
+
+    def test_unchanged_fields_are_not_reapplied(self, crm):
+        """Test that fields submitted with their loaded value are left to the other updater"""
+        with crm['session_factory']() as first, crm['session_factory']() as second:
+            event = first.get(Event, crm['event'])
+            update_event(second, crm['event'], crm['gestion'], location="Paris")
+
+            with pytest.raises(StaleDataError) as stale:
+                update_event(first, event.id, crm['gestion'], location=event.location, attendees=50)
+
+        assert stale.value.changes == {'attendees': 50}
+        assert stale.value.conflicts == {}
+
+    def test_deleted_row(self, crm):
+        """Test that updating a row deleted meanwhile is reported and not retried"""
+        asked = []
+        with crm['session_factory']() as editing, crm['session_factory']() as deleting:
+            client = editing.get(Client, crm['client'])
+            deleting.delete(deleting.get(Event, crm['event']))
+            deleting.delete(deleting.get(Contract, crm['contract']))
+            deleting.delete(deleting.get(Client, crm['client']))
+            deleting.commit()
+
+            result = retry_on_stale(lambda fields: update_client(editing, client.id, crm['gestion'], **fields),
+                                    {'phone': "0102030405"}, asked.append)
+
+        assert result is None
+        assert asked == []
+
+    def test_declined_retry(self, crm):
+        """Test that declining the retry leaves the other update in place"""
+        with crm['session_factory']() as first, crm['session_factory']() as second:
+            client = first.get(Client, crm['client'])
+            update_client(second, crm['client'], crm['gestion'], phone="0600000000")
+
+            result = retry_on_stale(lambda fields: update_client(first, client.id, crm['gestion'], **fields),
+                                    {'phone': "0700000000"}, lambda error: False)
+
+            assert result is None
+            assert first.get(Client, crm['client']).phone == "0600000000"
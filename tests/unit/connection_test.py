@@ -0,0 +1,180 @@
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, exc
+
+from sqlalchemy.pool import StaticPool
+
+from app.db.connection import (
+    LazySessionmaker, build_engine, get_database_url, get_pool_options, get_pool_stats, is_memory_database
+)
+from app.db.pool import MonitoredQueuePool
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """Create a small file-based engine using the monitored pool"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MonitoredQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestPoolOptions:
+    """Test cases for pool configuration"""
+
+    def test_pool_options_defaults(self, monkeypatch):
+        """Test default pool settings"""
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT",
+                     "DB_POOL_RECYCLE", "DB_POOL_PRE_PING"):
+            monkeypatch.delenv(name, raising=False)
+
+        options = get_pool_options()
+
+        assert options['poolclass'] is MonitoredQueuePool
+        assert options['pool_size'] == 5
+        assert options['max_overflow'] == 10
+        assert options['pool_timeout'] == 30.0
+        assert options['pool_recycle'] == 1800
+        assert options['pool_pre_ping'] is True
+
+    def test_pool_options_from_environment(self, monkeypatch):
+        """Test pool settings driven by environment variables"""
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+        monkeypatch.setenv("DB_POOL_RECYCLE", "-1")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+        options = get_pool_options()
+
+        assert options['pool_size'] == 20
+        assert options['max_overflow'] == 0
+        assert options['pool_timeout'] == 2.5
+        assert options['pool_recycle'] == -1
+        assert options['pool_pre_ping'] is False
+
+    def test_pool_options_invalid_value(self, monkeypatch):
+        """Test that a malformed setting is reported"""
+        monkeypatch.setenv("DB_POOL_SIZE", "many")
+
+        with pytest.raises(ValueError, match="DB_POOL_SIZE"):
+            get_pool_options()
+
+
+class TestPoolStats:
+    """Test cases for pool statistics"""
+
+    def test_stats_idle_pool(self, pooled_engine):
+        """Test statistics of a pool that was never used"""
+        stats = pooled_engine.pool.stats()
+
+        assert stats['pool_size'] == 2
+        assert stats['max_overflow'] == 1
+        assert stats['checked_out'] == 0
+        assert stats['overflow'] == 0
+        assert stats['checkouts'] == 0
+        assert stats['avg_wait'] == 0.0
+
+    def test_stats_track_checkouts_and_overflow(self, pooled_engine):
+        """Test that checked-out and overflow connections are reported"""
+        connections = [pooled_engine.connect() for _ in range(3)]
+
+        stats = pooled_engine.pool.stats()
+        assert stats['checked_out'] == 3
+        assert stats['overflow'] == 1
+        assert stats['checkouts'] == 3
+
+        for connection in connections:
+            connection.close()
+
+        stats = pooled_engine.pool.stats()
+        assert stats['checked_out'] == 0
+        assert stats['checked_in'] == 2
+
+    def test_stats_track_timeouts_and_wait(self, pooled_engine):
+        """Test that a checkout timing out is counted with its wait time"""
+        connections = [pooled_engine.connect() for _ in range(3)]
+
+        with pytest.raises(exc.TimeoutError):
+            pooled_engine.connect()
+
+        stats = pooled_engine.pool.stats()
+        assert stats['timeouts'] == 1
+        assert stats['max_wait'] >= 0.1
+        assert stats['total_wait'] >= stats['max_wait']
+
+        for connection in connections:
+            connection.close()
+
+    def test_reset_stats(self, pooled_engine):
+        """Test resetting the counters"""
+        pooled_engine.connect().close()
+        pooled_engine.pool.reset_stats()
+
+        stats = pooled_engine.pool.stats()
+        assert stats['checkouts'] == 0
+        assert stats['max_wait'] == 0.0
+
+    def test_get_pool_stats_application_engine(self):
+        """Test reading the statistics of the application engine"""
+        stats = get_pool_stats()
+
+        assert 'checked_out' in stats
+        assert 'overflow' in stats
+        assert 'avg_wait' in stats
+
+
+class TestLazyEngine:
+    """Test cases for the engine built on first use"""
+
+    def test_session_factory_binds_on_first_session(self, sqlite_engine):
+        """Test that the engine is only requested when a session is opened"""
+        factory = LazySessionmaker()
+
+        with patch("app.db.connection.get_engine", return_value=sqlite_engine) as mock_get_engine:
+            mock_get_engine.assert_not_called()
+            with factory() as first, factory() as second:
+                assert first.get_bind() is sqlite_engine
+                assert second.get_bind() is sqlite_engine
+
+        mock_get_engine.assert_called_once()
+
+
+class TestBackendConfiguration:
+    """Test cases for choosing the database with DATABASE_URL"""
+
+    def test_database_url_override(self, monkeypatch):
+        """Test that DATABASE_URL replaces the URL built from the DB_* settings"""
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        assert get_database_url().startswith("postgresql+psycopg2://")
+
+        monkeypatch.setenv("DATABASE_URL", "sqlite:///epic_events.db")
+        assert get_database_url() == "sqlite:///epic_events.db"
+
+    def test_memory_database(self):
+        """Test that in-memory SQLite shares one connection, without a write-ahead log"""
+        assert is_memory_database("sqlite://") and is_memory_database("sqlite:///:memory:")
+        assert not is_memory_database("sqlite:///crm.db")
+        engine = build_engine("sqlite://")
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "memory"
+        assert isinstance(engine.pool, StaticPool)
+        engine.dispose()
+
+    def test_file_database_pragmas(self, tmp_path):
+        """Test that a SQLite file is opened in WAL mode with the tuned pragmas, behind the monitored pool"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+
+        with engine.connect() as conn:
+            pragmas = {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                       for name in ("journal_mode", "synchronous", "foreign_keys", "busy_timeout")}
+        assert pragmas == {'journal_mode': "wal", 'synchronous': 1, 'foreign_keys': 1, 'busy_timeout': 5000}
+        assert isinstance(engine.pool, MonitoredQueuePool)
+        engine.dispose()
@@ -1,6 +1,8 @@
+from decimal import Decimal
 from unittest.mock import patch, Mock
 from app.controllers.contract_menu_controller import ContractMenuController
 from app.models.user import UserRole
+from app.services.errors import StaleDataError
 from app.views.contract_menu_view import ContractMenuView
 
 
@@ -13,28 +15,30 @@ class TestContractMenuController:
         assert controller.current_user == mock_user
         assert isinstance(controller.view, ContractMenuView)
 
-    @patch('app.controllers.contract_menu_controller.SessionLocal')
-    @patch('app.controllers.contract_menu_controller.get_all_contracts')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.get_contracts_page')
     def test_list_contracts_success(self, mock_get_contracts, mock_session_local, mock_user, mock_contract):
-        """Test successful contract listing"""
+        """Test successful contract listing, fetched page by page"""
         db = Mock()
         mock_session_local.return_value = db
         mock_get_contracts.return_value = [mock_contract]
+        displayed = []
 
         controller = ContractMenuController(mock_user)
         controller.view = Mock()
+        controller.view.display_contracts_list.side_effect = displayed.extend
 
         controller.list_contracts()
 
-        mock_get_contracts.assert_called_once_with(db)
-        controller.view.display_contracts_list.assert_called_once_with([mock_contract])
-        db.close.assert_called_once()
+        mock_get_contracts.assert_called_once_with(db, after_id=None, limit=100)
+        assert displayed == [mock_contract]
+        db.close.assert_not_called()
 
-    @patch('app.controllers.contract_menu_controller.SessionLocal')
-    @patch('app.controllers.contract_menu_controller.get_all_contracts')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.get_contracts_page')
     @patch('app.controllers.contract_menu_controller.show_error')
-    @patch('app.controllers.contract_menu_controller.sentry_sdk')
-    def test_list_contracts_error(self, mock_sentry, mock_show_error, mock_get_contracts,
+    @patch('app.controllers.contract_menu_controller.telemetry')
+    def test_list_contracts_error(self, mock_telemetry, mock_show_error, mock_get_contracts,
                                   mock_session_local, mock_user):
         """Test contract listing with error"""
         db = Mock()
@@ -43,15 +47,16 @@ class TestContractMenuController:
 
         controller = ContractMenuController(mock_user)
         controller.view = Mock()
+        controller.view.display_contracts_list.side_effect = list
 
         controller.list_contracts()
 
         mock_show_error.assert_called_once_with("Erreur lors de la récupération des contrats: Database error")
-        mock_sentry.capture_exception.assert_called_once()
-        db.close.assert_called_once()
+        mock_telemetry.capture_exception.assert_called_once()
+        db.close.assert_not_called()
 
-    @patch('app.controllers.contract_menu_controller.SessionLocal')
-    @patch('app.controllers.contract_menu_controller.get_all_clients')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.search_clients')
     @patch('app.controllers.contract_menu_controller.get_commercial_users')
     @patch('app.controllers.contract_menu_controller.create_contract')
     @patch('app.controllers.contract_menu_controller.show_success')
@@ -83,7 +88,7 @@ class TestContractMenuController:
         mock_create_contract.assert_called_once()
         mock_show_success.assert_called_once_with("Contrat créé avec succès (ID: 1)")
         db.commit.assert_called_once()
-        db.close.assert_called_once()
+        db.close.assert_not_called()
 
     def test_create_contract_unauthorized(self, mock_user):
         """Test contract creation with unauthorized user"""
@@ -96,8 +101,8 @@ class TestContractMenuController:
                 "Accès non autorisé. Seule la gestion peut créer des contrats."
             )
 
-    @patch('app.controllers.contract_menu_controller.SessionLocal')
-    @patch('app.controllers.contract_menu_controller.get_contracts_by_user')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.search_contracts')
     @patch('app.controllers.contract_menu_controller.update_contract')
     @patch('app.controllers.contract_menu_controller.show_success')
     def test_update_contract_success(self, mock_show_success, mock_update_contract,
@@ -114,7 +119,7 @@ class TestContractMenuController:
 
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = mock_contract
+        controller.view.search_contract.return_value = mock_contract
         controller.view.get_contract_update_data.return_value = {
             'total_amount': 15000.0,
             'amount_due': 7500.0,
@@ -125,9 +130,100 @@ class TestContractMenuController:
 
         mock_update_contract.assert_called_once()
         mock_show_success.assert_called_once_with("Contrat 1 modifié avec succès.")
-        db.close.assert_called_once()
+        db.close.assert_not_called()
 
-    @patch('app.controllers.contract_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.search_contracts')
+    @patch('app.controllers.contract_menu_controller.update_contract')
+    @patch('app.controllers.contract_menu_controller.confirm_stale_retry')
+    @patch('app.controllers.contract_menu_controller.show_success')
+    def test_update_contract_modified_meanwhile(self, mock_show_success, mock_confirm, mock_update_contract,
+                                                mock_get_contracts, mock_session_local,
+                                                mock_gestion_user, mock_contract):
+        """Test that a concurrent modification offers to reapply only the user's changes"""
+        mock_get_contracts.return_value = [mock_contract]
+        stale = StaleDataError("Contract", 1, {'is_signed': True}, {}, current=mock_contract)
+        mock_update_contract.side_effect = [stale, Mock(id=1)]
+        mock_confirm.return_value = True
+
+        controller = ContractMenuController(mock_gestion_user)
+        controller.view = Mock()
+        controller.view.search_contract.return_value = mock_contract
+        controller.view.get_contract_update_data.return_value = {'amount_due': 5000.0, 'is_signed': True}
+
+        controller.update_contract()
+
+        mock_confirm.assert_called_once_with(stale)
+        assert mock_update_contract.call_args.kwargs['is_signed'] is True
+        assert 'amount_due' not in mock_update_contract.call_args.kwargs
+        mock_show_success.assert_called_once_with("Contrat 1 modifié avec succès.")
+
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.search_contracts')
+    @patch('app.controllers.contract_menu_controller.update_contract')
+    @patch('app.controllers.contract_menu_controller.confirm_stale_retry')
+    @patch('app.controllers.contract_menu_controller.show_info')
+    def test_update_contract_retry_declined(self, mock_show_info, mock_confirm, mock_update_contract,
+                                            mock_get_contracts, mock_session_local,
+                                            mock_gestion_user, mock_contract):
+        """Test that declining the retry cancels the update"""
+        mock_get_contracts.return_value = [mock_contract]
+        mock_update_contract.side_effect = StaleDataError("Contract", 1, {'is_signed': True},
+                                                          {'is_signed': (True, False)}, current=mock_contract)
+        mock_confirm.return_value = False
+
+        controller = ContractMenuController(mock_gestion_user)
+        controller.view = Mock()
+        controller.view.search_contract.return_value = mock_contract
+        controller.view.get_contract_update_data.return_value = {'is_signed': True}
+
+        controller.update_contract()
+
+        mock_update_contract.assert_called_once()
+        mock_show_info.assert_called_once_with("Modification annulée.")
+
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.search_contracts')
+    @patch('app.controllers.contract_menu_controller.record_payment')
+    @patch('app.controllers.contract_menu_controller.show_success')
+    def test_record_payment(self, mock_show_success, mock_record_payment, mock_search_contracts,
+                            mock_session_local, mock_user, mock_contract):
+        """Test that a payment goes through record_payment, limited to a commercial's own contracts"""
+        db = Mock()
+        mock_session_local.return_value = db
+        mock_user.role = UserRole.COMMERCIAL
+        mock_record_payment.return_value = Decimal("4749.90")
+
+        controller = ContractMenuController(mock_user)
+        controller.view = Mock()
+        controller.view.search_contract.side_effect = lambda search: search("acme") and mock_contract
+        mock_search_contracts.return_value = [mock_contract]
+        controller.view.get_payment_amount.return_value = Decimal("250.10")
+
+        controller.record_payment()
+
+        mock_search_contracts.assert_called_once_with(db, "acme", commercial_id=mock_user.id)
+        mock_record_payment.assert_called_once_with(db, 1, Decimal("250.10"), mock_user)
+        mock_show_success.assert_called_once_with("Paiement de 250.10 € enregistré, reste dû : 4749.90 €.")
+
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.contract_menu_controller.record_payment')
+    @patch('app.controllers.contract_menu_controller.show_error')
+    def test_record_payment_refused(self, mock_show_error, mock_record_payment, mock_session_local,
+                                    mock_gestion_user, mock_contract):
+        """Test that a payment above the amount due is reported"""
+        mock_record_payment.side_effect = ValueError("Payment of 9000.00 exceeds the amount due (5000.00).")
+
+        controller = ContractMenuController(mock_gestion_user)
+        controller.view = Mock()
+        controller.view.search_contract.return_value = mock_contract
+        controller.view.get_payment_amount.return_value = Decimal("9000.00")
+
+        controller.record_payment()
+
+        mock_show_error.assert_called_once_with("Payment of 9000.00 exceeds the amount due (5000.00).")
+
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.contract_menu_controller.list_unsigned_contracts')
     def test_filter_contracts_unsigned(self, mock_list_unsigned, mock_session_local, mock_gestion_user):
         """Test filtering unsigned contracts"""
@@ -144,7 +240,7 @@ class TestContractMenuController:
 
         mock_list_unsigned.assert_called_once_with(db)
         controller.view.display_contracts_list.assert_called_once_with(contracts)
-        db.close.assert_called_once()
+        db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_handle_menu_invalid_choice(self, mock_show_error, mock_user):
@@ -163,14 +259,14 @@ class TestContractMenuController:
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
 
-        with patch("app.controllers.contract_menu_controller.get_all_clients", return_value=[]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.contract_menu_controller.search_clients", return_value=[]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_contract()
             mock_show_error.assert_called_once_with("Aucun client disponible. Créez d'abord des clients.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_create_contract_no_commercials(self, mock_show_error, mock_gestion_user, mock_client):
@@ -181,15 +277,15 @@ class TestContractMenuController:
             'client_id': 1, 'total_amount': 5000.0
         }
 
-        with patch("app.controllers.contract_menu_controller.get_all_clients", return_value=[mock_client]), \
+        with patch("app.controllers.contract_menu_controller.search_clients", return_value=[mock_client]), \
                 patch("app.controllers.contract_menu_controller.get_commercial_users", return_value=[]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_contract()
             mock_show_error.assert_called_once_with("Aucun commercial disponible.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     def test_create_contract_cancelled_by_user(self, mock_gestion_user, mock_client):
         """Test when user cancels contract creation after data input"""
@@ -197,13 +293,13 @@ class TestContractMenuController:
         controller.view = Mock()
         controller.view.get_contract_data.return_value = None  # simulate cancellation
 
-        with patch("app.controllers.contract_menu_controller.get_all_clients", return_value=[mock_client]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.contract_menu_controller.search_clients", return_value=[mock_client]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_contract()
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     def test_create_contract_commercial_selection_cancelled(self, mock_gestion_user, mock_client):
         """Test contract creation cancelled during commercial selection"""
@@ -214,43 +310,45 @@ class TestContractMenuController:
         }
         controller.view.get_commercial_selection.return_value = None
 
-        with patch("app.controllers.contract_menu_controller.get_all_clients", return_value=[mock_client]), \
+        with patch("app.controllers.contract_menu_controller.search_clients", return_value=[mock_client]), \
                 patch("app.controllers.contract_menu_controller.get_commercial_users", return_value=[Mock(id=1)]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_contract()
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
-    @patch("app.controllers.contract_menu_controller.show_error")
-    def test_update_contract_no_contracts(self, mock_show_error, mock_gestion_user):
-        """Test update contract when no contracts found"""
+    @patch("app.controllers.contract_menu_controller.update_contract")
+    def test_update_contract_no_contracts(self, mock_update_contract, mock_gestion_user):
+        """Test that gestion searches all contracts and finding none updates nothing"""
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
+        controller.view.search_contract.side_effect = lambda search: search("acme") or None
 
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user", return_value=[]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.contract_menu_controller.search_contracts", return_value=[]) as mock_search, \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_contract()
-            mock_show_error.assert_called_once_with("Aucun contrat disponible pour modification.")
-            db.close.assert_called_once()
+            mock_search.assert_called_once_with(db, "acme", commercial_id=None)
+            mock_update_contract.assert_not_called()
+            db.close.assert_not_called()
 
     def test_update_contract_cancelled_by_user(self, mock_gestion_user, mock_contract):
         """Test user cancels contract update"""
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = None
+        controller.view.search_contract.return_value = None
 
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user", return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.contract_menu_controller.search_contracts", return_value=[mock_contract]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_contract()
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_update_contract_unauthorized_commercial(self, mock_show_error, mock_user, mock_contract):
@@ -263,12 +361,12 @@ class TestContractMenuController:
         # Create controller with mocked view
         controller = ContractMenuController(mock_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = mock_contract
+        controller.view.search_contract.return_value = mock_contract
 
         # Mock database session and contracts query
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user",
+        with patch("app.controllers.contract_menu_controller.search_contracts",
                    return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             # Mock database session
             db = Mock()
             mock_session.return_value = db
@@ -280,7 +378,7 @@ class TestContractMenuController:
             mock_show_error.assert_called_once_with("Vous ne pouvez modifier que vos propres contrats.")
 
             # Verify session was closed
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.get_contracts_by_user")
     def test_filter_contracts_signed(self, mock_get_contracts, mock_gestion_user):
@@ -289,7 +387,7 @@ class TestContractMenuController:
         controller.view = Mock()
         controller.view.get_contract_filter.return_value = "signed"
 
-        with patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session, \
+        with patch("app.db.unit_of_work.SessionLocal") as mock_session, \
                 patch("app.controllers.contract_menu_controller.list_signed_contracts") as mock_list_signed:
             db = Mock()
             contracts = [Mock()]
@@ -300,7 +398,7 @@ class TestContractMenuController:
 
             mock_list_signed.assert_called_once_with(db)
             controller.view.display_contracts_list.assert_called_once_with(contracts)
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.get_contracts_by_user")
     def test_filter_contracts_paid(self, mock_get_contracts, mock_gestion_user):
@@ -309,7 +407,7 @@ class TestContractMenuController:
         controller.view = Mock()
         controller.view.get_contract_filter.return_value = "paid"
 
-        with patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session, \
+        with patch("app.db.unit_of_work.SessionLocal") as mock_session, \
                 patch("app.controllers.contract_menu_controller.list_paid_contracts") as mock_list_paid:
             db = Mock()
             contracts = [Mock()]
@@ -320,35 +418,35 @@ class TestContractMenuController:
 
             mock_list_paid.assert_called_once_with(db)
             controller.view.display_contracts_list.assert_called_once_with(contracts)
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_update_contract_no_update_data(self, mock_show_error, mock_gestion_user, mock_contract):
         """Test when user provides no update data (lines 98-101)"""
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = mock_contract
+        controller.view.search_contract.return_value = mock_contract
         controller.view.get_contract_update_data.return_value = None  # Simulate cancellation
 
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user", return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.contract_menu_controller.search_contracts", return_value=[mock_contract]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_contract()
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
-    @patch("app.controllers.contract_menu_controller.sentry_sdk")
-    def test_update_contract_exception(self, mock_sentry, mock_show_error, mock_gestion_user, mock_contract):
+    @patch("app.controllers.contract_menu_controller.telemetry")
+    def test_update_contract_exception(self, mock_telemetry, mock_show_error, mock_gestion_user, mock_contract):
         """Test exception handling during contract update"""
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = mock_contract
+        controller.view.search_contract.return_value = mock_contract
         controller.view.get_contract_update_data.return_value = {"total_amount": 15000.0}
 
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user", return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session, \
+        with patch("app.controllers.contract_menu_controller.search_contracts", return_value=[mock_contract]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session, \
                 patch("app.controllers.contract_menu_controller.update_contract") as mock_update:
             db = Mock()
             mock_session.return_value = db
@@ -360,7 +458,7 @@ class TestContractMenuController:
 
             mock_show_error.assert_called_once_with("Erreur lors de la modification du contrat: Update error")
             db.rollback.assert_called_once()
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_filter_contracts_default_case(self, mock_show_error, mock_user):
@@ -375,7 +473,7 @@ class TestContractMenuController:
 
         with patch("app.controllers.contract_menu_controller.get_contracts_by_user",
                    return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
@@ -384,18 +482,18 @@ class TestContractMenuController:
             # The contract should be displayed for COMMERCIAL users since commercial_id matches
             expected_contracts = [mock_contract] if mock_user.role == UserRole.COMMERCIAL else [mock_contract]
             controller.view.display_contracts_list.assert_called_once_with(expected_contracts)
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
-    @patch("app.controllers.contract_menu_controller.sentry_sdk")
-    def test_filter_contracts_error(self, mock_sentry, mock_show_error, mock_user):
+    @patch("app.controllers.contract_menu_controller.telemetry")
+    def test_filter_contracts_error(self, mock_telemetry, mock_show_error, mock_user):
         """Test error handling in filter contracts"""
         controller = ContractMenuController(mock_user)
         controller.view = Mock()
         controller.view.get_contract_filter.return_value = "unsigned"
 
         with patch("app.controllers.contract_menu_controller.list_unsigned_contracts") as mock_list_unsigned, \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session:
+                patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
             mock_list_unsigned.side_effect = Exception("Filter error")
@@ -403,19 +501,19 @@ class TestContractMenuController:
             controller.filter_contracts()
 
             mock_show_error.assert_called_once_with("Erreur lors du filtrage des contrats: Filter error")
-            mock_sentry.capture_exception.assert_called_once()
-            db.close.assert_called_once()
+            mock_telemetry.capture_exception.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.contract_menu_controller.show_error")
     def test_update_contract_permission_error(self, mock_show_error, mock_gestion_user, mock_contract):
         """Test PermissionError handling in update_contract"""
         controller = ContractMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_contract_selection.return_value = mock_contract
+        controller.view.search_contract.return_value = mock_contract
         controller.view.get_contract_update_data.return_value = {"total_amount": 15000.0}
 
-        with patch("app.controllers.contract_menu_controller.get_contracts_by_user", return_value=[mock_contract]), \
-                patch("app.controllers.contract_menu_controller.SessionLocal") as mock_session, \
+        with patch("app.controllers.contract_menu_controller.search_contracts", return_value=[mock_contract]), \
+                patch("app.db.unit_of_work.SessionLocal") as mock_session, \
                 patch("app.controllers.contract_menu_controller.update_contract") as mock_update:
             db = Mock()
             mock_session.return_value = db
@@ -426,4 +524,4 @@ class TestContractMenuController:
             controller.update_contract()
 
             mock_show_error.assert_called_once_with("Permission denied")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
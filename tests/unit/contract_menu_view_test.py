@@ -1,7 +1,9 @@
-from unittest.mock import patch
+from decimal import Decimal
+from unittest.mock import Mock, patch
 
 from app.views.contract_menu_view import ContractMenuView
 from app.models.user import UserRole
+from app.utils.money import to_money
 
 
 class TestContractMenuView:
@@ -29,27 +31,60 @@ class TestContractMenuView:
 
         with patch('click.echo'), patch('click.prompt') as mock_prompt, \
              patch('click.confirm') as mock_confirm, \
-             patch.object(view, 'get_client_selection') as mock_get_client:
-            mock_get_client.return_value = mock_client
+             patch.object(view, 'search_client') as mock_search_client:
+            mock_search_client.return_value = mock_client
             mock_prompt.side_effect = [10000.0, 5000.0]
             mock_confirm.return_value = False
 
-            result = view.get_contract_data([mock_client])
+            result = view.get_contract_data(Mock(return_value=[mock_client]))
 
             assert result['client_id'] == mock_client.id
             assert result['total_amount'] == 10000.0
             assert result['amount_due'] == 5000.0
             assert result['is_signed'] is False
 
+    def test_get_contract_update_data_returns_changes_only(self, mock_contract):
+        """Test that amounts are exact, unchanged fields left out and the amount due not asked"""
+        view = ContractMenuView()
+
+        with patch('click.echo'), patch('click.prompt') as mock_prompt, \
+             patch('click.confirm', return_value=False):
+            mock_prompt.return_value = Decimal("12000.50")
+            result = view.get_contract_update_data(mock_contract)
+
+        assert result == {'total_amount': Decimal("12000.50")}
+        mock_prompt.assert_called_once_with("Montant total du contrat (€)", default=Decimal("10000.00"),
+                                            type=to_money)
+
+    def test_get_payment_amount(self, mock_contract):
+        """Test that the payment is read as an exact amount"""
+        view = ContractMenuView()
+
+        with patch('click.echo'), patch('click.prompt', return_value=Decimal("250.10")) as mock_prompt:
+            assert view.get_payment_amount(mock_contract) == Decimal("250.10")
+
+        assert mock_prompt.call_args.kwargs == {'type': to_money}
+
     def test_get_contract_data_cancelled(self, mock_client):
         view = ContractMenuView()
 
-        with patch.object(view, 'get_client_selection') as mock_get_client:
-            mock_get_client.return_value = None
+        with patch.object(view, 'search_client') as mock_search_client:
+            mock_search_client.return_value = None
 
-            result = view.get_contract_data([mock_client])
+            result = view.get_contract_data(Mock(return_value=[mock_client]))
             assert result is None
 
+    def test_search_client(self, mock_client):
+        """Test that the typed text is searched and the results offered for selection"""
+        view = ContractMenuView()
+        search = Mock(return_value=[mock_client])
+
+        with patch('click.echo'), patch('click.prompt', side_effect=["  Acme ", 1]):
+            result = view.search_client(search)
+
+        search.assert_called_once_with("Acme")
+        assert result == mock_client
+
     def test_display_contracts_list_empty(self):
         view = ContractMenuView()
 
@@ -1,16 +1,22 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from unittest.mock import Mock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
 
 from app.services.contract_service import (
     create_contract, update_contract, list_unsigned_contracts,
     list_unpaid_contracts, list_signed_contracts, list_paid_contracts,
     get_all_contracts, get_contracts_by_user, get_all_clients,
-    get_commercial_users
+    get_commercial_users, record_payment
 )
 from app.models.user import UserRole
 from app.models.contract import Contract
 from app.models.client import Client
 from app.models.user import User
+from app.models.base import Base
+from app.services.errors import NotFoundError, StaleDataError
 
 
 class TestCreateContract:
@@ -53,7 +59,7 @@ class TestUpdateContract:
         mock_contract.id = 1
         mock_contract.commercial_id = 2
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_contract
+        mock_database_session.identity_map.get.return_value = mock_contract
 
         result = update_contract(mock_database_session, 1, mock_gestion_user, total_amount=15000.0, is_signed=True)
 
@@ -67,7 +73,7 @@ class TestUpdateContract:
         mock_contract.id = 1
         mock_contract.commercial_id = mock_user.id
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_contract
+        mock_database_session.identity_map.get.return_value = mock_contract
 
         result = update_contract(mock_database_session, 1, mock_user, is_signed=True)
 
@@ -80,7 +86,7 @@ class TestUpdateContract:
         mock_contract.id = 1
         mock_contract.commercial_id = 999
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_contract
+        mock_database_session.identity_map.get.return_value = mock_contract
 
         with pytest.raises(PermissionError, match="You can only update your own contracts."):
             update_contract(mock_database_session, 1, mock_user, is_signed=True)
@@ -89,7 +95,7 @@ class TestUpdateContract:
         mock_contract = Mock(spec=Contract)
         mock_contract.id = 1
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_contract
+        mock_database_session.identity_map.get.return_value = mock_contract
 
         result = update_contract(mock_database_session, 1, mock_gestion_user,
                                  total_amount=20000.0, amount_due=10000.0, is_signed=True)
@@ -103,17 +109,19 @@ class TestUpdateContract:
 class TestListContracts:
     def test_list_unsigned_contracts(self, mock_database_session):
         mock_contracts = [Mock(spec=Contract) for _ in range(3)]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_contracts
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter_by.return_value.all.return_value = mock_contracts
 
         result = list_unsigned_contracts(mock_database_session)
 
         assert result == mock_contracts
         mock_database_session.query.assert_called_with(Contract)
-        mock_database_session.query.return_value.filter_by.assert_called_with(is_signed=False)
+        mock_database_session.query.return_value.options.return_value.filter_by.assert_called_with(is_signed=False)
 
     def test_list_unpaid_contracts(self, mock_database_session):
         mock_contracts = [Mock(spec=Contract) for _ in range(2)]
-        mock_database_session.query.return_value.filter.return_value.all.return_value = mock_contracts
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter.return_value.all.return_value = mock_contracts
 
         result = list_unpaid_contracts(mock_database_session)
 
@@ -122,27 +130,29 @@ class TestListContracts:
 
     def test_list_signed_contracts(self, mock_database_session):
         mock_contracts = [Mock(spec=Contract) for _ in range(4)]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_contracts
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter_by.return_value.all.return_value = mock_contracts
 
         result = list_signed_contracts(mock_database_session)
 
         assert result == mock_contracts
         mock_database_session.query.assert_called_with(Contract)
-        mock_database_session.query.return_value.filter_by.assert_called_with(is_signed=True)
+        mock_database_session.query.return_value.options.return_value.filter_by.assert_called_with(is_signed=True)
 
     def test_list_paid_contracts(self, mock_database_session):
         mock_contracts = [Mock(spec=Contract) for _ in range(2)]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_contracts
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter_by.return_value.all.return_value = mock_contracts
 
         result = list_paid_contracts(mock_database_session)
 
         assert result == mock_contracts
         mock_database_session.query.assert_called_with(Contract)
-        mock_database_session.query.return_value.filter_by.assert_called_with(amount_due=0)
+        mock_database_session.query.return_value.options.return_value.filter_by.assert_called_with(amount_due=0)
 
     def test_get_all_contracts(self, mock_database_session):
         mock_contracts = [Mock(spec=Contract) for _ in range(5)]
-        mock_database_session.query.return_value.all.return_value = mock_contracts
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_contracts
 
         result = get_all_contracts(mock_database_session)
 
@@ -153,17 +163,18 @@ class TestListContracts:
 class TestGetContractsByRole:
     def test_get_contracts_by_user_commercial(self, mock_database_session, mock_user):
         mock_contracts = [Mock(spec=Contract) for _ in range(3)]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_contracts
+        listing = mock_database_session.query.return_value.options.return_value
+        listing.filter_by.return_value.all.return_value = mock_contracts
 
         result = get_contracts_by_user(mock_database_session, mock_user)
 
         assert result == mock_contracts
         mock_database_session.query.assert_called_with(Contract)
-        mock_database_session.query.return_value.filter_by.assert_called_with(commercial_id=mock_user.id)
+        listing.filter_by.assert_called_with(commercial_id=mock_user.id)
 
     def test_get_contracts_by_user_gestion(self, mock_database_session, mock_gestion_user):
         mock_contracts = [Mock(spec=Contract) for _ in range(5)]
-        mock_database_session.query.return_value.all.return_value = mock_contracts
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_contracts
 
         result = get_contracts_by_user(mock_database_session, mock_gestion_user)
 
@@ -172,7 +183,7 @@ class TestGetContractsByRole:
 
     def test_get_contracts_by_user_support(self, mock_database_session, mock_support_user):
         mock_contracts = [Mock(spec=Contract) for _ in range(5)]
-        mock_database_session.query.return_value.all.return_value = mock_contracts
+        mock_database_session.query.return_value.options.return_value.all.return_value = mock_contracts
 
         result = get_contracts_by_user(mock_database_session, mock_support_user)
 
@@ -190,21 +201,32 @@ class TestGetContractsByRole:
 
     def test_get_commercial_users(self, mock_database_session):
         mock_users = [Mock(spec=User) for _ in range(2)]
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = mock_users
+        mock_database_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = mock_users
 
         result = get_commercial_users(mock_database_session)
 
         assert result == mock_users
-        mock_database_session.query.assert_called_with(User)
-        mock_database_session.query.return_value.filter_by.assert_called_with(role=UserRole.COMMERCIAL)
+        mock_database_session.query.assert_called_once_with(User.id, User.name, User.email, User.role)
+
+    def test_get_commercial_users_cached(self, mock_database_session):
+        mock_database_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = []
+
+        get_commercial_users(mock_database_session)
+        get_commercial_users(mock_database_session)
+
+        mock_database_session.query.assert_called_once()
 
 
 class TestEdgeCases:
     def test_update_contract_nonexistent_contract(self, mock_database_session, mock_gestion_user):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = None
+        mock_database_session.identity_map.get.return_value = None
+        mock_database_session.scalars.return_value.one_or_none.return_value = None
+        mock_database_session.get.return_value = None
 
-        with pytest.raises(AttributeError):
+        with pytest.raises(NotFoundError, match="Contract 999 not found."):
             update_contract(mock_database_session, 999, mock_gestion_user, total_amount=1000)
+        mock_database_session.rollback.assert_called_once()
+        mock_database_session.commit.assert_not_called()
 
     def test_create_contract_negative_amount(self, mock_database_session):
         mock_contract = Mock(spec=Contract)
@@ -218,8 +240,140 @@ class TestEdgeCases:
         assert result.amount_due == -5000.0
 
     def test_empty_contract_lists(self, mock_database_session):
-        mock_database_session.query.return_value.filter_by.return_value.all.return_value = []
+        mock_database_session.query.return_value.options.return_value.filter_by.return_value.all.return_value = []
 
         assert list_unsigned_contracts(mock_database_session) == []
         assert list_signed_contracts(mock_database_session) == []
         assert list_paid_contracts(mock_database_session) == []
+
+
+@pytest.fixture
+def payment_contract(db_session):
+    """A stored contract of 100.00 owned by a commercial, with that commercial and another one"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    client = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    contract = Contract(client=client, commercial=alice, total_amount=Decimal("100.00"),
+                        amount_due=Decimal("100.00"), is_signed=True)
+    db_session.add_all([bob, contract])
+    db_session.commit()
+    return {'contract': contract, 'alice': alice, 'bob': bob}
+
+
+class TestRecordPayment:
+    """Test cases for payments applied by the database"""
+
+    def test_payment_is_one_statement(self, db_session, payment_contract, statement_counter):
+        """Test that a payment is a single UPDATE ... RETURNING, without reloading the row"""
+        db_session.expire_on_commit = False
+        contract, alice = payment_contract['contract'], payment_contract['alice']
+        db_session.refresh(contract)
+        db_session.refresh(alice)
+        statement_counter.clear()
+
+        amount_due = record_payment(db_session, contract.id, "30.10", alice)
+
+        assert amount_due == Decimal("69.90")
+        assert contract.amount_due == Decimal("69.90")
+        assert [statement.split()[0] for statement in statement_counter] == ["UPDATE"]
+        assert "RETURNING" in statement_counter[0]
+
+    def test_payments_reach_exactly_zero(self, db_session, payment_contract):
+        """Test that cents add up exactly and the contract is then listed as paid"""
+        contract = payment_contract['contract']
+
+        for _ in range(10):
+            record_payment(db_session, contract.id, 0.1, payment_contract['alice'])
+        record_payment(db_session, contract.id, 99, payment_contract['alice'])
+
+        assert [paid.id for paid in list_paid_contracts(db_session)] == [contract.id]
+
+    def test_refused_payments(self, db_session, payment_contract, mock_gestion_user):
+        """Test that invalid payments change nothing"""
+        contract_id = payment_contract['contract'].id
+
+        with pytest.raises(ValueError, match="positive"):
+            record_payment(db_session, contract_id, 0, mock_gestion_user)
+        with pytest.raises(ValueError, match="exceeds the amount due"):
+            record_payment(db_session, contract_id, "100.01", mock_gestion_user)
+        with pytest.raises(ValueError, match="not found"):
+            record_payment(db_session, 999, 10, mock_gestion_user)
+        with pytest.raises(PermissionError):
+            record_payment(db_session, contract_id, 10, payment_contract['bob'])
+
+        assert db_session.get(Contract, contract_id).amount_due == Decimal("100.00")
+
+    def test_concurrent_payments_are_not_lost(self, tmp_path, mock_gestion_user):
+        """Test that payments from concurrent sessions all apply"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'payments.db'}", connect_args={'timeout': 30})
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+            contract = Contract(client=Client(full_name="Acme", email="acme@mail.com", commercial=alice),
+                                commercial=alice, total_amount=100, amount_due=100)
+            db.add(contract)
+            db.commit()
+            contract_id = contract.id
+
+        def pay(_):
+            with Session(engine) as db:
+                return record_payment(db, contract_id, "2.50", mock_gestion_user)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            balances = list(executor.map(pay, range(40)))
+
+        with Session(engine) as db:
+            assert db.get(Contract, contract_id).amount_due == 0
+        assert sorted(balances) == [Decimal("2.50") * n for n in range(40)]
+        engine.dispose()
+
+
+class TestUpdateContractInOneStatement:
+    """Test cases for updates of contracts the session has not loaded"""
+
+    def test_update_is_one_statement(self, db_session, payment_contract, statement_counter):
+        """Test that the update, the ownership check and the reload are a single UPDATE ... RETURNING"""
+        db_session.expire_on_commit = False
+        contract_id, alice = payment_contract['contract'].id, payment_contract['alice']
+        db_session.refresh(alice)
+        db_session.expunge(payment_contract['contract'])
+        statement_counter.clear()
+
+        contract = update_contract(db_session, contract_id, alice, amount_due=Decimal("40.00"))
+
+        assert [statement.split()[0] for statement in statement_counter] == ["UPDATE"]
+        assert "commercial_id = ?" in statement_counter[0] and "RETURNING" in statement_counter[0]
+        assert (contract.amount_due, contract.total_amount, contract.version) == \
+            (Decimal("40.00"), Decimal("100.00"), 2)
+
+    def test_refused_updates_change_nothing(self, db_session, payment_contract):
+        """Test that another commercial's contract and a missing one are refused"""
+        contract_id = payment_contract['contract'].id
+        db_session.expunge(payment_contract['contract'])
+
+        with pytest.raises(PermissionError, match="your own contracts"):
+            update_contract(db_session, contract_id, payment_contract['bob'], is_signed=False)
+        with pytest.raises(NotFoundError):
+            update_contract(db_session, 999, payment_contract['bob'], is_signed=False)
+
+        contract = db_session.get(Contract, contract_id)
+        assert (contract.is_signed, contract.version) == (True, 1)
+
+    def test_loaded_copy_becomes_stale(self, tmp_path, mock_gestion_user):
+        """Test that a direct update bumps the version, so an edit of a copy loaded before cannot overwrite it"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'crm.db'}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+            db.add(Contract(client=Client(full_name="Acme", email="acme@mail.com", commercial=alice),
+                            commercial=alice, total_amount=100, amount_due=100))
+            db.commit()
+        with Session(engine) as editing, Session(engine) as direct:
+            contract = editing.get(Contract, 1)
+            update_contract(direct, 1, mock_gestion_user, is_signed=True)
+
+            with pytest.raises(StaleDataError) as stale:
+                update_contract(editing, contract.id, mock_gestion_user, amount_due=50)
+
+        assert stale.value.current.is_signed is True
+        engine.dispose()
@@ -0,0 +1,109 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.event_filters import EventFilter
+
+
+def compiled_where(event_filter):
+    """Render the WHERE clause of a filtered events query"""
+    statement = event_filter.apply(select(Event))
+    return str(statement.compile(compile_kwargs={"literal_binds": True})).split("WHERE", 1)[-1]
+
+
+def query_plan(session, event_filter):
+    """Get the SQLite query plan of a filtered events query"""
+    statement = event_filter.apply(select(Event))
+    sql = str(statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.fixture
+def many_events(db_session):
+    """A few hundred events spread over one contract"""
+    commercial = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    support = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    client = Client(full_name="Acme", email="acme@mail.com", commercial=commercial)
+    contract = Contract(client=client, commercial=commercial, total_amount=100, amount_due=0, is_signed=True)
+    start = datetime(2025, 1, 1, 10)
+
+    db_session.add_all([
+        Event(name=f"Event {i}", contract=contract, client=client, support_contact=support if i % 10 else None,
+              date_start=start + timedelta(days=i), date_end=start + timedelta(days=i, hours=8))
+        for i in range(300)
+    ])
+    db_session.commit()
+    return {'support_id': support.id, 'commercial_id': commercial.id}
+
+
+class TestEventFilterBuilder:
+    """Test cases for the SQL produced by the filter builder"""
+
+    def test_unassigned_is_sql_null_check(self):
+        """Test that unassigned events are filtered with IS NULL, not a Python constant"""
+        assert compiled_where(EventFilter().unassigned()).strip() == "events.support_id IS NULL"
+
+    def test_assigned_is_sql_not_null_check(self):
+        assert compiled_where(EventFilter().assigned()).strip() == "events.support_id IS NOT NULL"
+
+    def test_support_or_unassigned(self):
+        assert compiled_where(EventFilter().support_or_unassigned(2)).strip() == \
+            "events.support_id = 2 OR events.support_id IS NULL"
+
+    def test_conditions_are_combined(self):
+        """Test that chained criteria end up in one WHERE clause"""
+        where = compiled_where(EventFilter().unassigned().starts_from(datetime(2025, 1, 1)).location("Paris"))
+
+        assert where.count(" AND ") == 2
+
+    def test_commercial_joins_contracts(self):
+        """Test that the commercial criterion joins the contracts table"""
+        statement = EventFilter().commercial(1).apply(select(Event))
+
+        assert "JOIN contracts ON contracts.id = events.contract_id" in str(statement)
+
+    def test_text_wildcards_are_escaped(self):
+        """Test that LIKE wildcards typed by the user are matched literally"""
+        where = compiled_where(EventFilter().location("100%_sure"))
+
+        assert "'%100\\%\\_sure%'" in where
+
+    def test_empty_filter_keeps_query(self):
+        query = object()
+        assert EventFilter().apply(query) is query
+
+
+class TestEventFilterQueryPlan:
+    """The filters must be answered from the indexes, never by scanning events"""
+
+    def test_unassigned_uses_index(self, db_session, many_events):
+        plan = query_plan(db_session, EventFilter().unassigned())
+
+        assert plan.startswith("SEARCH events USING INDEX")
+        assert "(support_id=?)" in plan
+
+    def test_support_uses_index(self, db_session, many_events):
+        plan = query_plan(db_session, EventFilter().support(many_events['support_id']))
+
+        assert plan == "SEARCH events USING INDEX ix_events_support_id_date_start (support_id=?)"
+
+    def test_support_and_dates_use_composite_index(self, db_session, many_events):
+        plan = query_plan(db_session, EventFilter().support(many_events['support_id'])
+                          .starts_from(datetime(2025, 10, 1)))
+
+        assert plan == "SEARCH events USING INDEX ix_events_support_id_date_start (support_id=? AND date_start>?)"
+
+    def test_date_range_uses_index(self, db_session, many_events):
+        plan = query_plan(db_session, EventFilter().starts_from(datetime(2025, 10, 1)))
+
+        assert plan == "SEARCH events USING INDEX ix_events_date_start (date_start>?)"
+
+    def test_commercial_uses_indexes(self, db_session, many_events):
+        plan = query_plan(db_session, EventFilter().commercial(many_events['commercial_id']))
+
+        assert "SEARCH contracts USING COVERING INDEX ix_contracts_commercial_id_is_signed" in plan
+        assert "SEARCH events USING INDEX ix_events_contract_id" in plan
@@ -15,27 +15,29 @@ class TestEventMenuController:
         assert controller.current_user == mock_user
         assert isinstance(controller.view, EvenMenuView)
 
-    @patch('app.controllers.event_menu_controller.SessionLocal')
-    @patch('app.controllers.event_menu_controller.get_events_with_details')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.event_menu_controller.get_events_with_details_page')
     def test_list_events_success(self, mock_get_events, mock_session, mock_user, mock_event):
-        """Test successful event listing"""
+        """Test successful event listing, fetched page by page"""
         # Setup mocks
         mock_db = Mock()
         mock_session.return_value = mock_db
         mock_get_events.return_value = [mock_event]
+        displayed = []
 
         controller = EventMenuController(mock_user)
         controller.view = Mock()
+        controller.view.display_events_list.side_effect = displayed.extend
 
         # Execute
         controller.list_events()
 
         # Verify
-        mock_get_events.assert_called_once_with(mock_db)
-        controller.view.display_events_list.assert_called_once_with([mock_event])
-        mock_db.close.assert_called_once()
+        mock_get_events.assert_called_once_with(mock_db, after_id=None, limit=100)
+        assert displayed == [mock_event]
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.event_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.event_menu_controller.get_signed_contracts_for_commercial')
     @patch('app.controllers.event_menu_controller.get_contract_by_id')
     @patch('app.controllers.event_menu_controller.create_event')
@@ -75,7 +77,7 @@ class TestEventMenuController:
         # Verify
         mock_create_event.assert_called_once()
         mock_show_success.assert_called_once_with("Événement créé avec succès (ID: 1)")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
     def test_create_event_unauthorized(self, mock_support_user):
         """Test event creation with unauthorized user"""
@@ -87,8 +89,8 @@ class TestEventMenuController:
                 "Accès non autorisé. Seuls les commerciaux peuvent créer des événements."
             )
 
-    @patch('app.controllers.event_menu_controller.SessionLocal')
-    @patch('app.controllers.event_menu_controller.get_events_for_support_user')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.event_menu_controller.search_events')
     @patch('app.controllers.event_menu_controller.get_support_users')
     @patch('app.controllers.event_menu_controller.update_event')
     @patch('app.controllers.event_menu_controller.show_success')
@@ -108,7 +110,7 @@ class TestEventMenuController:
 
         controller = EventMenuController(mock_support_user)
         controller.view = Mock()
-        controller.view.get_event_selection.return_value = mock_event
+        controller.view.search_event.return_value = mock_event
         controller.view.get_event_update_data.return_value = {
             'name': 'Updated Event',
             'start_date': datetime(2025, 1, 1, 10, 0),
@@ -124,9 +126,9 @@ class TestEventMenuController:
         # Verify
         mock_update_event.assert_called_once()
         mock_show_success.assert_called_once_with("Événement ID 1 modifié avec succès.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.event_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.event_menu_controller.get_filtered_events')
     @patch('app.controllers.event_menu_controller.show_info')
     def test_filter_events_success(self, mock_show_info, mock_get_filtered,
@@ -148,7 +150,7 @@ class TestEventMenuController:
         mock_get_filtered.assert_called_once_with(mock_db, {'support_contact_id': None})
         mock_show_info.assert_called_once_with("1 événement(s) trouvé(s) avec les critères sélectionnés.")
         controller.view.display_events_list.assert_called_once_with([mock_event])
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_error")
     def test_handle_menu_invalid_choice(self, mock_show_error, mock_user):
@@ -167,13 +169,13 @@ class TestEventMenuController:
         controller.view = Mock()
 
         with patch("app.controllers.event_menu_controller.get_signed_contracts_for_commercial", return_value=[]), \
-             patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+             patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_event()
             mock_show_error.assert_called_once_with("Aucun contrat signé disponible pour créer un événement.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_info")
     def test_create_event_cancelled_by_user(self, mock_show_info, mock_user, mock_contract):
@@ -183,13 +185,13 @@ class TestEventMenuController:
         controller.view.get_event_data.return_value = None
 
         with patch("app.controllers.event_menu_controller.get_signed_contracts_for_commercial", return_value=[mock_contract]), \
-             patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+             patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_event()
             mock_show_info.assert_called_once_with("Création d'événement annulée.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_error")
     def test_create_event_contract_not_found(self, mock_show_error, mock_user, mock_contract):
@@ -203,60 +205,63 @@ class TestEventMenuController:
 
         with patch("app.controllers.event_menu_controller.get_signed_contracts_for_commercial", return_value=[mock_contract]), \
              patch("app.controllers.event_menu_controller.get_contract_by_id", return_value=None), \
-             patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+             patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.create_event()
             mock_show_error.assert_called_once_with("Contrat non trouvé.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_info")
     def test_update_event_cancelled_by_user(self, mock_show_info, mock_support_user, mock_event):
         controller = EventMenuController(mock_support_user)
         controller.view = Mock()
-        controller.view.get_event_selection.return_value = None
+        controller.view.search_event.return_value = None
 
-        with patch("app.controllers.event_menu_controller.get_events_for_support_user", return_value=[mock_event]), \
-             patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+        with patch("app.controllers.event_menu_controller.search_events", return_value=[mock_event]), \
+             patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_event()
             mock_show_info.assert_called_once_with("Modification annulée.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_info")
     def test_update_event_cancelled_update_data(self, mock_show_info, mock_gestion_user, mock_event):
         controller = EventMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_event_selection.return_value = mock_event
+        controller.view.search_event.return_value = mock_event
         controller.view.get_event_update_data.return_value = None
 
-        with patch("app.controllers.event_menu_controller.get_all_events_for_management", return_value=[mock_event]), \
+        with patch("app.controllers.event_menu_controller.search_events", return_value=[mock_event]), \
              patch("app.controllers.event_menu_controller.get_support_users", return_value=[]), \
-             patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+             patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_event()
             mock_show_info.assert_called_once_with("Modification annulée.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
 
-    @patch("app.controllers.event_menu_controller.get_all_events_for_management")
-    @patch("app.controllers.event_menu_controller.show_error")
-    def test_update_event_no_events(self, mock_show_error, mock_get_events, mock_gestion_user):
-        controller = EventMenuController(mock_gestion_user)
+    @patch("app.controllers.event_menu_controller.search_events")
+    @patch("app.controllers.event_menu_controller.show_info")
+    def test_update_event_no_events(self, mock_show_info, mock_search_events, mock_support_user):
+        """Test that support users search the events they may update and finding none cancels"""
+        controller = EventMenuController(mock_support_user)
         controller.view = Mock()
-        mock_get_events.return_value = []
+        controller.view.search_event.side_effect = lambda search: search("gala") or None
+        mock_search_events.return_value = []
 
-        with patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+        with patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_event()
-            mock_show_error.assert_called_once_with("Aucun événement disponible pour modification.")
-            db.close.assert_called_once()
+            mock_search_events.assert_called_once_with(db, "gala", support_id=mock_support_user.id)
+            mock_show_info.assert_called_once_with("Modification annulée.")
+            db.close.assert_not_called()
 
     @patch("app.controllers.event_menu_controller.show_error")
     def test_update_event_unauthorized_user(self, mock_show_error, mock_user):
@@ -268,7 +273,7 @@ class TestEventMenuController:
         mock_show_error.assert_called_once_with("Accès non autorisé. Seuls le support et"
                                                 " la gestion peuvent modifier des événements.")
 
-    @patch("app.controllers.event_menu_controller.get_all_events_for_management")
+    @patch("app.controllers.event_menu_controller.search_events")
     @patch("app.controllers.event_menu_controller.get_support_users")
     @patch("app.controllers.event_menu_controller.update_event")
     @patch("app.controllers.event_menu_controller.show_success")
@@ -282,16 +287,16 @@ class TestEventMenuController:
 
         controller = EventMenuController(mock_gestion_user)
         controller.view = Mock()
-        controller.view.get_event_selection.return_value = mock_event
+        controller.view.search_event.return_value = mock_event
         controller.view.get_event_update_data.return_value = {
             'name': 'Updated', 'start_date': datetime.now(), 'end_date': datetime.now(),
             'location': 'New Place', 'attendees': 100, 'notes': 'Note', 'support_contact_id': 99
         }
 
-        with patch("app.controllers.event_menu_controller.SessionLocal") as mock_session:
+        with patch("app.db.unit_of_work.SessionLocal") as mock_session:
             db = Mock()
             mock_session.return_value = db
 
             controller.update_event()
             mock_show_success.assert_called_once_with("Événement ID 42 modifié avec succès.")
-            db.close.assert_called_once()
+            db.close.assert_not_called()
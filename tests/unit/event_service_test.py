@@ -6,9 +6,12 @@ from app.services.event_service import (
     create_event, assign_support_to_event, update_event,
     list_unassigned_events, list_events_by_support, get_all_events,
     get_events_with_details, get_filtered_events, get_signed_contracts_for_commercial,
+    get_events_for_support_user, get_support_users, assign_supports, assign_support_matching,
 )
 from app.models.event import Event
 from app.models.contract import Contract
+from app.models.client import Client
+from app.models.user import User, UserRole
 
 
 class TestCreateEvent:
@@ -82,7 +85,8 @@ class TestAssignSupportToEvent:
         mock_event.id = event_id
         mock_event.support_id = None
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.get.return_value = mock_event
+        mock_database_session.execute.return_value.all.return_value = []
 
         result = assign_support_to_event(mock_database_session, event_id, support_user_id)
 
@@ -99,7 +103,8 @@ class TestAssignSupportToEvent:
         mock_event.id = event_id
         mock_event.support_id = old_support_id
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.get.return_value = mock_event
+        mock_database_session.execute.return_value.all.return_value = []
 
         result = assign_support_to_event(mock_database_session, event_id, new_support_id)
 
@@ -115,7 +120,7 @@ class TestUpdateEvent:
         mock_event.id = event_id
         mock_event.support_id = 2
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.identity_map.get.return_value = mock_event
 
         update_fields = {"name": "Updated Event", "attendees": 150}
 
@@ -132,7 +137,7 @@ class TestUpdateEvent:
         mock_event.id = event_id
         mock_event.support_id = mock_support_user.id
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.identity_map.get.return_value = mock_event
 
         update_fields = {"location": "Updated Location"}
 
@@ -148,7 +153,7 @@ class TestUpdateEvent:
         mock_event.id = event_id
         mock_event.support_id = 999
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.identity_map.get.return_value = mock_event
 
         update_fields = {"location": "Updated Location"}
 
@@ -160,7 +165,7 @@ class TestUpdateEvent:
         mock_event = Mock(spec=Event)
         mock_event.id = event_id
 
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_event
+        mock_database_session.identity_map.get.return_value = mock_event
 
         update_fields = {
             "name": "Updated Event",
@@ -213,73 +218,139 @@ class TestListEvents:
         assert result == mock_events
 
 
-class TestGetFilteredEvents:
-    def test_get_filtered_events_support_contact_id(self, mock_database_session):
-        filters = {"support_contact_id": 2}
-        mock_events = [Mock(spec=Event) for _ in range(2)]
+@pytest.fixture
+def events_data(db_session):
+    """One commercial per contract, two supports and four events"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    sue = User(name="Sue", email="sue@mail.com", password="hashed", role=UserRole.SUPPORT)
+    client = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    alice_contract = Contract(client=client, commercial=alice, total_amount=100, amount_due=0, is_signed=True)
+    bob_contract = Contract(client=client, commercial=bob, total_amount=100, amount_due=0, is_signed=True)
 
-        mock_query = Mock()
-        mock_query.filter.return_value.all.return_value = mock_events
-        mock_database_session.query.return_value.options.return_value = mock_query
+    def event(name, contract, support, month, location="Paris"):
+        return Event(name=name, contract=contract, client=client, support_contact=support, location=location,
+                     date_start=datetime(2025, month, 1, 10), date_end=datetime(2025, month, 1, 18))
 
-        result = get_filtered_events(mock_database_session, filters)
+    db_session.add_all([
+        event("Gala", alice_contract, sam, 1),
+        event("Wedding", alice_contract, None, 3, location="Lyon"),
+        event("Seminar", bob_contract, sue, 5),
+        event("Party", bob_contract, None, 7),
+    ])
+    db_session.commit()
+    return {'alice': alice, 'bob': bob, 'sam': sam, 'sue': sue}
 
-        assert result == mock_events
 
-    def test_get_filtered_events_support_contact_id_none(self, mock_database_session):
+def event_names(events):
+    return sorted(event.name for event in events)
+
+
+class TestBulkAssignment:
+    """Test cases for assigning support users to many events at once"""
+
+    def test_assign_supports_one_update_per_batch(self, db_session, events_data, mock_gestion_user,
+                                                  statement_counter):
+        """Test that pairs are applied with one UPDATE per batch and missing events are reported"""
+        events = {event.name: event.id for event in get_all_events(db_session)}
+        sam, sue = events_data['sam'].id, events_data['sue'].id
+        pairs = [(events['Wedding'], sam), (events['Party'], sue), (events['Gala'], None), (999, sam)]
+        get_support_users(db_session)
+        statement_counter.clear()
+
+        report = assign_supports(db_session, pairs, mock_gestion_user, batch_size=3)
+
+        assert [statement.split()[0] for statement in statement_counter].count("UPDATE") == 2
+        assert report == {'requested': 4, 'updated': 3, 'batches': 2, 'missing': [999], 'conflicts': {}}
+        assigned = {event.name: event.support_id for event in get_all_events(db_session)}
+        assert assigned == {'Gala': None, 'Wedding': sam, 'Seminar': sue, 'Party': sue}
+        assert db_session.get(Event, events['Wedding']).version == 2
+
+    def test_assign_support_matching(self, db_session, events_data, mock_gestion_user):
+        """Test that a filter assigns every matching event in one statement"""
+        report = assign_support_matching(db_session, {'support_contact_id': None, 'location': "paris"},
+                                         events_data['sam'].id, mock_gestion_user)
+
+        assert report == {'matched': 1, 'updated': 1, 'conflicts': {}}
+        assert event_names(list_events_by_support(db_session, events_data['sam'].id)) == ["Gala", "Party"]
+
+    def test_assignment_refusals(self, db_session, events_data, mock_support_user):
+        """Test that only management assigns, and only support users"""
+        event_id = get_all_events(db_session)[0].id
+        gestion = Mock(spec=User, id=99, role=UserRole.GESTION)
+
+        with pytest.raises(PermissionError):
+            assign_supports(db_session, [(event_id, events_data['sam'].id)], mock_support_user)
+        with pytest.raises(ValueError, match="not a support user"):
+            assign_support_matching(db_session, {}, events_data['alice'].id, gestion)
+
+
+class TestGetFilteredEvents:
+    def test_get_filtered_events_support_contact_id(self, db_session, events_data):
+        filters = {"support_contact_id": events_data['sam'].id}
+
+        assert event_names(get_filtered_events(db_session, filters)) == ["Gala"]
+
+    def test_get_filtered_events_support_contact_id_none(self, db_session, events_data):
         filters = {"support_contact_id": None}
-        mock_events = [Mock(spec=Event) for _ in range(3)]
 
-        mock_query = Mock()
-        mock_query.filter.return_value.all.return_value = mock_events
-        mock_database_session.query.return_value.options.return_value = mock_query
+        assert event_names(get_filtered_events(db_session, filters)) == ["Party", "Wedding"]
 
-        result = get_filtered_events(mock_database_session, filters)
+    def test_get_filtered_events_support_contact_id_not_null(self, db_session, events_data):
+        filters = {"support_contact_id_not_null": True}
 
-        assert result == mock_events
+        assert event_names(get_filtered_events(db_session, filters)) == ["Gala", "Seminar"]
 
-    def test_get_filtered_events_commercial_contact_id(self, mock_database_session):
-        filters = {"commercial_contact_id": 1}
-        mock_events = [Mock(spec=Event) for _ in range(2)]
+    def test_get_filtered_events_commercial_contact_id(self, db_session, events_data):
+        filters = {"commercial_contact_id": events_data['bob'].id}
 
-        mock_query = Mock()
-        mock_query.join.return_value.filter.return_value.all.return_value = mock_events
-        mock_database_session.query.return_value.options.return_value = mock_query
+        assert event_names(get_filtered_events(db_session, filters)) == ["Party", "Seminar"]
 
-        result = get_filtered_events(mock_database_session, filters)
+    def test_get_filtered_events_date_range(self, db_session, events_data):
+        filters = {
+            "start_date_gte": datetime(2025, 2, 1),
+            "end_date_lt": datetime(2025, 6, 1)
+        }
 
-        assert result == mock_events
+        assert event_names(get_filtered_events(db_session, filters)) == ["Seminar", "Wedding"]
 
-    def test_get_filtered_events_date_range(self, mock_database_session):
+    def test_get_filtered_events_multiple_filters(self, db_session, events_data):
         filters = {
-            "start_date_gte": datetime(2025, 1, 1),
-            "end_date_lt": datetime(2025, 12, 31)
+            "support_contact_id": None,
+            "start_date_gte": datetime(2025, 2, 1),
+            "commercial_contact_id": events_data['alice'].id
         }
-        mock_events = [Mock(spec=Event) for _ in range(3)]
 
-        mock_query = Mock()
-        mock_query.filter.return_value.filter.return_value.all.return_value = mock_events
-        mock_database_session.query.return_value.options.return_value = mock_query
+        assert event_names(get_filtered_events(db_session, filters)) == ["Wedding"]
 
-        result = get_filtered_events(mock_database_session, filters)
+    def test_get_filtered_events_location_and_text(self, db_session, events_data):
+        assert event_names(get_filtered_events(db_session, {"location": "lyon"})) == ["Wedding"]
+        assert event_names(get_filtered_events(db_session, {"text": "GAL"})) == ["Gala"]
 
-        assert result == mock_events
+    def test_get_filtered_events_no_filter(self, db_session, events_data):
+        assert len(get_filtered_events(db_session, {})) == 4
 
-    def test_get_filtered_events_multiple_filters(self, mock_database_session):
-        filters = {
-            "support_contact_id": 2,
-            "start_date_gte": datetime(2025, 1, 1),
-            "commercial_contact_id": 1
-        }
-        mock_events = [Mock(spec=Event)]
+    def test_get_filtered_events_loads_details(self, db_session, events_data, statement_counter):
+        alice_id = events_data['alice'].id
+        statement_counter.clear()
 
-        mock_query = Mock()
-        mock_query.filter.return_value.filter.return_value.join.return_value.filter.return_value.all.return_value = mock_events
-        mock_database_session.query.return_value.options.return_value = mock_query
+        events = get_filtered_events(db_session, {"commercial_contact_id": alice_id})
+        for event in events:
+            _ = event.contract.client.full_name, event.support_contact
 
-        result = get_filtered_events(mock_database_session, filters)
+        assert len(statement_counter) == 1
 
-        assert result == mock_events
+    def test_get_filtered_events_unknown_filter(self, db_session):
+        with pytest.raises(ValueError, match="Unknown event filter"):
+            get_filtered_events(db_session, {"colour": "red"})
+
+
+class TestGetEventsForSupportUser:
+    def test_assigned_or_unassigned(self, db_session, events_data):
+        events = get_events_for_support_user(db_session, events_data['sam'].id)
+
+        assert event_names(events) == ["Gala", "Party", "Wedding"]
 
 
 class TestGetSignedContractsForCommercial:
@@ -0,0 +1,86 @@
+import csv
+import json
+import pytest
+from datetime import date, datetime
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.export_service import export_table, get_format
+
+
+@pytest.fixture
+def events_data(db_session):
+    """A client with a contract and three events, one of them unassigned"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    acme = Client(full_name="Acme", email="acme@mail.com", commercial=alice, date_created=date(2025, 1, 2))
+    contract = Contract(client=acme, commercial=alice, total_amount=1000, amount_due=250, is_signed=True)
+    db_session.add_all([
+        Event(name=f"Event {day}", contract=contract, client=acme, support_contact=sam if day != 2 else None,
+              date_start=datetime(2025, 6, day, 10), date_end=datetime(2025, 6, day, 12), attendees=day)
+        for day in (1, 2, 3)
+    ])
+    db_session.commit()
+
+
+class TestExport:
+    """Test cases for the streaming exports"""
+
+    def test_get_format(self):
+        """Test that the format comes from the extension unless given"""
+        assert get_format("events.CSV") == "csv"
+        assert get_format("events.ndjson") == "jsonl"
+        assert get_format("events.out", "parquet") == "parquet"
+        with pytest.raises(ValueError, match="Unsupported export format"):
+            get_format("events.xlsx")
+
+    def test_export_events_csv_in_chunks(self, db_session, events_data, tmp_path, statement_counter):
+        """Test that events are exported with client and support names in a single query"""
+        statement_counter.clear()
+
+        report = export_table(db_session, "events", tmp_path / "events.csv", chunk_size=2)
+
+        assert (report['rows'], report['format']) == (3, "csv")
+        assert len(statement_counter) == 1
+        with open(tmp_path / "events.csv", newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        assert [(row['name'], row['client_name'], row['support_name']) for row in rows] == [
+            ("Event 1", "Acme", "Sam"), ("Event 2", "Acme", ""), ("Event 3", "Acme", "Sam")
+        ]
+        assert rows[0]['date_start'] == "2025-06-01 10:00:00"
+
+    def test_export_events_with_filters(self, db_session, events_data, tmp_path):
+        """Test that the event filters apply to the export"""
+        report = export_table(db_session, "events", tmp_path / "events.jsonl",
+                              filters={'support_contact_id': None})
+
+        assert report['rows'] == 1
+        row = json.loads((tmp_path / "events.jsonl").read_text(encoding="utf-8"))
+        assert (row['name'], row['support_name'], row['date_start']) == ("Event 2", None, "2025-06-02T10:00:00")
+
+    def test_export_contracts_jsonl(self, db_session, events_data, tmp_path):
+        """Test that contracts are exported with client and commercial names, amounts as exact decimals"""
+        export_table(db_session, "contracts", tmp_path / "contracts.jsonl")
+
+        lines = (tmp_path / "contracts.jsonl").read_text(encoding="utf-8").splitlines()
+        row = json.loads(lines[0])
+        assert len(lines) == 1
+        assert (row['client_name'], row['commercial_name'], row['amount_due'], row['is_signed']) == \
+            ("Acme", "Alice", "250.00", True)
+
+    def test_export_clients_parquet(self, db_session, events_data, tmp_path):
+        """Test that the Parquet export keeps the column types"""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        export_table(db_session, "clients", tmp_path / "clients.parquet", chunk_size=1)
+
+        table = pq.read_table(tmp_path / "clients.parquet")
+        assert table.column("commercial_name").to_pylist() == ["Alice"]
+        assert table.column("date_created").to_pylist() == [date(2025, 1, 2)]
+
+    def test_unknown_entity(self, db_session, tmp_path):
+        """Test that only clients, contracts and events can be exported"""
+        with pytest.raises(ValueError, match="Unknown export entity"):
+            export_table(db_session, "users", tmp_path / "users.csv")
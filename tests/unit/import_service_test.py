@@ -0,0 +1,216 @@
+import json
+import pytest
+from datetime import date, datetime
+from sqlalchemy import text
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.import_service import RecordError, import_file, import_records, read_records
+
+
+@pytest.fixture
+def staff(db_session):
+    """One commercial and one support user"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    db_session.add_all([alice, sam])
+    db_session.commit()
+    return {'alice': alice, 'sam': sam}
+
+
+class TestReadRecords:
+    """Test cases for streaming import files"""
+
+    def test_read_csv(self, tmp_path):
+        """Test that CSV rows are read with their line numbers"""
+        path = tmp_path / "clients.csv"
+        path.write_text("full_name,email\nJohn,john@mail.com\nJane,jane@mail.com\n", encoding="utf-8")
+
+        assert list(read_records(path)) == [
+            (2, {'full_name': "John", 'email': "john@mail.com"}),
+            (3, {'full_name': "Jane", 'email': "jane@mail.com"}),
+        ]
+
+    def test_read_jsonl_skips_blank_lines(self, tmp_path):
+        """Test that JSONL records are read with their line numbers"""
+        path = tmp_path / "clients.jsonl"
+        path.write_text('{"full_name": "John"}\n\n{"full_name": "Jane"}\n', encoding="utf-8")
+
+        assert list(read_records(path)) == [(1, {'full_name': "John"}), (3, {'full_name': "Jane"})]
+
+    def test_read_malformed_jsonl_line(self, tmp_path):
+        """Test that a line that is not JSON gives an error in place of its record, reading goes on"""
+        path = tmp_path / "clients.jsonl"
+        path.write_text('{"full_name": "John"\n{"full_name": "Jane"}\n', encoding="utf-8")
+
+        (first_line, error), second = read_records(path)
+
+        assert first_line == 1 and isinstance(error, RecordError)
+        assert str(error).startswith("JSON invalide:")
+        assert second == (2, {'full_name': "Jane"})
+
+    def test_read_unknown_format(self, tmp_path):
+        """Test that other file types are refused"""
+        path = tmp_path / "clients.xlsx"
+        path.write_text("", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="Unsupported import format"):
+            list(read_records(path))
+
+
+class TestImportRecords:
+    """Test cases for batched imports"""
+
+    def test_import_clients_in_batches(self, db_session, staff, statement_counter):
+        """Test that clients are inserted with one INSERT per batch"""
+        records = [(line, {'full_name': f"Client {line}", 'email': f"client{line}@mail.com"})
+                   for line in range(2, 12)]
+        statement_counter.clear()
+        batches = []
+
+        report = import_records(db_session, "clients", records, batch_size=4,
+                                on_batch=batches.append, commercial_email="alice@mail.com")
+
+        assert (report['rows'], report['inserted'], report['rejected'], report['batches']) == (10, 10, 0, 3)
+        assert [batch['inserted'] for batch in batches] == [4, 4, 2]
+        assert (batches[0]['first_line'], batches[0]['last_line']) == (2, 5)
+        assert report['rows_per_second'] > 0
+        assert len([s for s in statement_counter if s.startswith("INSERT INTO clients")]) == 3
+        assert db_session.query(Client).filter_by(commercial_id=staff['alice'].id).count() == 10
+
+    def test_import_clients_reports_invalid_rows(self, db_session, staff):
+        """Test that invalid rows are reported by line and the others imported"""
+        records = [
+            (2, {'full_name': "John", 'email': "john@mail.com", 'commercial_email': "ALICE@mail.com"}),
+            (3, {'full_name': "", 'email': "jane@mail.com", 'commercial_email': "alice@mail.com"}),
+            (4, {'full_name': "Jim", 'email': "jim", 'commercial_email': "alice@mail.com"}),
+            (5, {'full_name': "Joe", 'email': "joe@mail.com", 'commercial_email': "bob@mail.com"}),
+            (6, {'full_name': "Jack", 'email': "jack@mail.com"}),
+        ]
+
+        report = import_records(db_session, "clients", records, batch_size=10)
+
+        assert (report['inserted'], report['rejected']) == (1, 4)
+        assert report['errors'] == [
+            (3, "Le nom complet est obligatoire."),
+            (4, "Format d'email invalide."),
+            (5, "Utilisateur inconnu: bob@mail.com"),
+            (6, "Commercial manquant (colonne commercial_email)."),
+        ]
+
+    def test_unreadable_lines_are_row_errors(self, db_session, staff, tmp_path):
+        """Test that malformed JSON, non-object lines and non-text values are reported, not raised"""
+        path = tmp_path / "clients.jsonl"
+        path.write_text("\n".join([
+            '{"full_name": "John", "email": "john@mail.com"}',
+            '{"full_name": "Jane", "email":',
+            '["Jim", "jim@mail.com"]',
+            '{"full_name": 123, "email": "joe@mail.com", "phone": 612345678}',
+            '{"full_name": null, "email": 42}',
+        ]), encoding="utf-8")
+
+        report = import_file(db_session, "clients", path, batch_size=10, commercial_email="alice@mail.com")
+
+        assert (report['inserted'], report['rejected']) == (2, 3)
+        assert [line for line, _ in report['errors']] == [2, 3, 5]
+        assert report['errors'][1] == (3, "Enregistrement invalide: objet attendu, list reçu.")
+        assert report['errors'][2] == (5, "Le nom complet est obligatoire. Format d'email invalide.")
+        joe = db_session.query(Client).filter_by(email="joe@mail.com").one()
+        assert (joe.full_name, joe.phone) == ("123", "612345678")
+
+    def test_failed_batch_is_rolled_back_and_import_continues(self, db_session, staff):
+        """Test that a batch refused by the database is reported and the next one imported"""
+        db_session.execute(text(
+            "CREATE TRIGGER refuse_client BEFORE INSERT ON clients WHEN NEW.full_name = 'Refused' "
+            "BEGIN SELECT RAISE(ABORT, 'client refused'); END"
+        ))
+        db_session.commit()
+        records = [
+            (2, {'full_name': "John", 'email': "john@mail.com"}),
+            (3, {'full_name': "Refused", 'email': "refused@mail.com"}),
+            (4, {'full_name': "Jane", 'email': "jane@mail.com"}),
+        ]
+        batches = []
+
+        report = import_records(db_session, "clients", records, batch_size=2,
+                                on_batch=batches.append, commercial_email="alice@mail.com")
+
+        assert batches[0]['batch_error'] == "client refused"
+        assert (report['inserted'], report['rejected']) == (1, 2)
+        assert report['errors'] == [(2, "Lot 1 annulé: client refused")]
+        assert [client.full_name for client in db_session.query(Client)] == ["Jane"]
+
+    def test_import_contracts(self, db_session, staff):
+        """Test that contracts are attached to the client found by email"""
+        acme = Client(full_name="Acme", email="Acme@mail.com", commercial=staff['alice'])
+        db_session.add(acme)
+        db_session.commit()
+        records = [
+            (2, {'client_email': "acme@mail.com", 'total_amount': "1500.5", 'is_signed': "oui",
+                 'date_created': "2025-01-10"}),
+            (3, {'client_email': "nobody@mail.com", 'total_amount': "10"}),
+            (4, {'client_email': "acme@mail.com", 'total_amount': "abc"}),
+        ]
+
+        report = import_records(db_session, "contracts", records, batch_size=10)
+
+        assert report['errors'] == [(3, "Client inconnu: nobody@mail.com"), (4, "Montant invalide: 'abc'")]
+        contract = db_session.query(Contract).one()
+        assert (contract.client_id, contract.commercial_id) == (acme.id, staff['alice'].id)
+        assert (contract.total_amount, contract.amount_due, contract.is_signed) == (1500.5, 1500.5, True)
+        assert contract.date_created == date(2025, 1, 10)
+
+    def test_import_events_file(self, db_session, staff, tmp_path):
+        """Test that events read from JSONL get their client from the contract"""
+        acme = Client(full_name="Acme", email="acme@mail.com", commercial=staff['alice'])
+        contract = Contract(client=acme, commercial=staff['alice'], total_amount=10, amount_due=0)
+        db_session.add(contract)
+        db_session.commit()
+        path = tmp_path / "events.jsonl"
+        path.write_text("\n".join(json.dumps(record) for record in [
+            {'contract_id': contract.id, 'name': "Gala", 'date_start': "2025-06-01T10:00",
+             'date_end': "2025-06-01T12:00", 'support_email': "sam@mail.com", 'attendees': 80},
+            {'contract_id': contract.id, 'name': "Expo", 'date_start': "2025-06-02T10:00",
+             'date_end': "2025-06-02T09:00"},
+        ]), encoding="utf-8")
+
+        report = import_file(db_session, "events", path, batch_size=10)
+
+        assert report['errors'] == [(2, "La date de fin doit être postérieure à la date de début.")]
+        event = db_session.query(Event).one()
+        assert (event.client_id, event.support_id, event.attendees) == (acme.id, staff['sam'].id, 80)
+        assert event.date_start == datetime(2025, 6, 1, 10)
+
+    def test_import_events_refuses_overlaps(self, db_session, staff):
+        """Test that a support cannot be double-booked by stored events, earlier rows or earlier batches"""
+        acme = Client(full_name="Acme", email="acme@mail.com", commercial=staff['alice'])
+        contract = Contract(client=acme, commercial=staff['alice'], total_amount=10, amount_due=0)
+        stored = Event(name="Stored", contract=contract, client=acme, support_contact=staff['sam'],
+                       date_start=datetime(2025, 6, 2, 10), date_end=datetime(2025, 6, 2, 12))
+        db_session.add(stored)
+        db_session.commit()
+
+        def event(line_number, day, start, end, support_email="sam@mail.com"):
+            return (line_number, {'contract_id': contract.id, 'name': f"Event {line_number}",
+                                  'date_start': f"2025-06-0{day}T{start:02}:00",
+                                  'date_end': f"2025-06-0{day}T{end:02}:00", 'support_email': support_email})
+
+        records = [event(2, 1, 10, 12), event(3, 1, 11, 13), event(4, 2, 11, 13), event(5, 1, 11, 13, None),
+                   event(6, 1, 12, 14), event(7, 1, 9, 11)]
+        report = import_records(db_session, "events", records, batch_size=4)
+
+        first_row = db_session.query(Event).filter_by(name="Event 2").one()
+        assert report['errors'] == [(3, "Conflit de planning du support: ligne 2."),
+                                    (4, f"Conflit de planning du support: événement {stored.id}."),
+                                    (7, f"Conflit de planning du support: événement {first_row.id}.")]
+        names = [name for name, in db_session.query(Event.name).filter(Event.support_id == staff['sam'].id)
+                 .order_by(Event.date_start)]
+        assert names == ["Event 2", "Event 6", "Stored"]
+        assert db_session.query(Event).filter(Event.support_id.is_(None)).count() == 1
+
+    def test_unknown_entity(self, db_session):
+        """Test that only clients, contracts and events can be imported"""
+        with pytest.raises(ValueError, match="Unknown import entity"):
+            import_records(db_session, "users", [])
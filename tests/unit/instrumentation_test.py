@@ -0,0 +1,133 @@
+import logging
+import pytest
+from functools import partial
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db.instrumentation import (
+    QueryStats, configure_query_log, current_action, fingerprint, instrument, logger, query_action, track_action
+)
+from app.models.client import Client
+from app.models.user import User, UserRole
+from app.services.client_service import get_clients_page
+from app.services.pagination import iter_pages
+
+
+@pytest.fixture
+def stats(sqlite_engine):
+    """Instrument the in-memory engine with its own totals, nothing counting as slow"""
+    stats = QueryStats()
+    instrument(sqlite_engine, slow_query_ms=60_000, stats=stats)
+    return stats
+
+
+@pytest.fixture
+def clients(db_session):
+    """Six clients of one commercial"""
+    commercial = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    db_session.add_all([Client(full_name=f"Client {i}", email=f"client{i}@mail.com", commercial=commercial)
+                        for i in range(6)])
+    db_session.commit()
+    return [client.id for client in db_session.scalars(select(Client))]
+
+
+class TestFingerprint:
+    """Test cases for grouping statements that only differ by their values"""
+
+    def test_values_are_replaced(self):
+        """Test literals, bind parameters and lists of any length"""
+        assert fingerprint("SELECT * FROM clients WHERE id = 12 AND email = 'a''b@mail.com'") == \
+            "SELECT * FROM clients WHERE id = ? AND email = ?"
+        assert fingerprint("SELECT * FROM clients\n  WHERE id IN (?, ?, ?)") == \
+            fingerprint("SELECT * FROM clients WHERE id IN (?)") == "SELECT * FROM clients WHERE id IN (...)"
+        assert fingerprint("INSERT INTO t (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)") == \
+            "INSERT INTO t (a, b) VALUES (...)"
+        assert fingerprint("SELECT x::text FROM t WHERE y = :y AND z = $1 AND w = %s") == \
+            "SELECT x::text FROM t WHERE y = ? AND z = ? AND w = ?"
+
+
+class TestInstrumentation:
+    """Test cases for timing statements per engine and per action"""
+
+    def test_statements_are_counted_per_fingerprint(self, sqlite_engine, stats):
+        """Test that executions with different values add up under one statement"""
+        with sqlite_engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :value"), {'value': value})
+
+        report = stats.stats()
+        assert report['statements'] == 3
+        assert report['distinct'] == 1
+        assert report['slowest'][0]['statement'] == "SELECT ?"
+        assert report['slowest'][0]['count'] == 3
+
+    def test_action_reports_n_plus_one(self, sqlite_engine, stats, clients, caplog):
+        """Test that loading a relationship client by client is reported as N+1, a join is not"""
+        caplog.set_level(logging.DEBUG, logger=logger.name)
+
+        with Session(bind=sqlite_engine) as db, query_action("clients row by row", 5) as lazy:
+            assert current_action() is lazy
+            for client_id in clients:
+                db.get(Client, client_id).commercial.name
+                db.expire_all()
+        with Session(bind=sqlite_engine) as db, query_action("clients in one query", 5) as joined:
+            db.scalars(select(Client).join(Client.commercial)).all()
+
+        assert current_action() is None
+        assert lazy.count == 12
+        assert len(lazy.repeated()) == 2
+        assert joined.count == 1 and joined.repeated() == {}
+        warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+        assert len(warnings) == 2
+        assert all(message.startswith("N+1 in clients row by row: 6 executions of SELECT") for message in warnings)
+
+    def test_paged_listing_is_not_n_plus_one(self, sqlite_engine, stats, clients, caplog):
+        """Test that the page query and eager load repeated for each page of a long listing are not reported"""
+        with Session(bind=sqlite_engine) as db:
+            db.execute(insert(Client), [{'full_name': f"Client {i}", 'email': f"more{i}@mail.com",
+                                         'commercial_id': db.get(Client, clients[0]).commercial_id}
+                                        for i in range(1200)])
+            db.commit()
+        caplog.set_level(logging.WARNING, logger=logger.name)
+
+        with Session(bind=sqlite_engine) as db, query_action("clients listing", 5) as listing:
+            assert sum(1 for _ in iter_pages(partial(get_clients_page, db))) == 1206
+
+        assert listing.count == 26
+        assert listing.repeated() == {}
+        assert caplog.records == []
+
+    def test_track_action_names_the_method(self, sqlite_engine, stats):
+        """Test that a decorated method runs as an action named after it"""
+        class Controller:
+            @track_action
+            def list_clients(self):
+                return current_action()
+
+        action = Controller().list_clients()
+
+        assert action.name == "TestInstrumentation.test_track_action_names_the_method.<locals>.Controller.list_clients"
+
+    def test_slow_query_log(self, sqlite_engine, tmp_path):
+        """Test that statements above the threshold are written to the slow query log"""
+        log = tmp_path / "slow.log"
+        # Engines built by other tests may already have attached the default log file
+        handlers = list(logger.handlers)
+        for handler in handlers:
+            logger.removeHandler(handler)
+        instrument(sqlite_engine, slow_query_ms=0, stats=QueryStats())
+        try:
+            configure_query_log(str(log))
+            with sqlite_engine.connect() as conn, query_action("export"):
+                conn.execute(text("SELECT 42"))
+        finally:
+            for handler in list(logger.handlers):
+                handler.close()
+                logger.removeHandler(handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+
+        lines = log.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert "WARNING slow query:" in lines[0]
+        assert lines[0].endswith("action export: SELECT ?")
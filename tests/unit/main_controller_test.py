@@ -54,7 +54,7 @@ class TestMainController:
         mock_auth_instance.logout.assert_called_once()
         assert controller.current_user == mock_user
 
-    @patch('app.controllers.main_controller.ClientMenuController')
+    @patch('app.controllers.client_menu_controller.ClientMenuController')
     @patch('app.controllers.main_controller.AuthController')
     @patch('app.controllers.main_controller.MainView')
     def test_run_client_menu_choice(self, mock_main_view, mock_auth_controller, mock_client_controller, mock_user):
@@ -75,7 +75,7 @@ class TestMainController:
         mock_client_controller.assert_called_once_with(mock_user)
         mock_client_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.ContractMenuController')
+    @patch('app.controllers.contract_menu_controller.ContractMenuController')
     @patch('app.controllers.main_controller.AuthController')
     @patch('app.controllers.main_controller.MainView')
     def test_run_contract_menu_choice(self, mock_main_view, mock_auth_controller, mock_contract_controller, mock_user):
@@ -96,7 +96,7 @@ class TestMainController:
         mock_contract_controller.assert_called_once_with(mock_user)
         mock_contract_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.EventMenuController')
+    @patch('app.controllers.event_menu_controller.EventMenuController')
     @patch('app.controllers.main_controller.AuthController')
     @patch('app.controllers.main_controller.MainView')
     def test_run_event_menu_choice(self, mock_main_view, mock_auth_controller, mock_event_controller, mock_user):
@@ -117,7 +117,7 @@ class TestMainController:
         mock_event_controller.assert_called_once_with(mock_user)
         mock_event_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.UserMenuController')
+    @patch('app.controllers.user_menu_controller.UserMenuController')
     @patch('app.controllers.main_controller.AuthController')
     @patch('app.controllers.main_controller.MainView')
     def test_run_user_menu_choice_gestion_user(self, mock_main_view, mock_auth_controller, mock_user_controller, mock_gestion_user):
@@ -190,7 +190,7 @@ class TestMainController:
         mock_show_info.assert_called_once_with("Déconnexion en cours...")
         mock_auth_instance.logout.assert_called_once()
 
-    @patch('app.controllers.main_controller.sentry_sdk')
+    @patch('app.controllers.main_controller.telemetry.capture_exception')
     @patch('app.controllers.main_controller.show_error')
     @patch('app.controllers.main_controller.AuthController')
     @patch('app.controllers.main_controller.MainView')
@@ -208,9 +208,9 @@ class TestMainController:
         controller.run()
 
         mock_show_error.assert_called_once_with("Une erreur s'est produite: Test error")
-        mock_sentry.capture_exception.assert_called_once_with(exception_instance)
+        mock_sentry.assert_called_once_with(exception_instance)
 
-    @patch('app.controllers.main_controller.ClientMenuController')
+    @patch('app.controllers.client_menu_controller.ClientMenuController')
     def test_client_menu(self, mock_client_controller, mock_user):
         mock_client_instance = Mock()
         mock_client_controller.return_value = mock_client_instance
@@ -222,7 +222,7 @@ class TestMainController:
         mock_client_controller.assert_called_once_with(mock_user)
         mock_client_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.ContractMenuController')
+    @patch('app.controllers.contract_menu_controller.ContractMenuController')
     def test_contract_menu(self, mock_contract_controller, mock_user):
         mock_contract_instance = Mock()
         mock_contract_controller.return_value = mock_contract_instance
@@ -234,7 +234,7 @@ class TestMainController:
         mock_contract_controller.assert_called_once_with(mock_user)
         mock_contract_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.EventMenuController')
+    @patch('app.controllers.event_menu_controller.EventMenuController')
     def test_event_menu(self, mock_event_controller, mock_user):
         mock_event_instance = Mock()
         mock_event_controller.return_value = mock_event_instance
@@ -246,7 +246,7 @@ class TestMainController:
         mock_event_controller.assert_called_once_with(mock_user)
         mock_event_instance.handle_menu.assert_called_once()
 
-    @patch('app.controllers.main_controller.UserMenuController')
+    @patch('app.controllers.user_menu_controller.UserMenuController')
     def test_user_menu_gestion_user(self, mock_user_controller, mock_gestion_user):
         mock_user_instance = Mock()
         mock_user_controller.return_value = mock_user_instance
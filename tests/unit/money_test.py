@@ -0,0 +1,25 @@
+import pytest
+from decimal import Decimal
+
+from app.utils.money import to_money
+
+
+class TestToMoney:
+    """Test cases for converting amounts to exact decimals"""
+
+    @pytest.mark.parametrize("value, expected", [
+        ("12.5", Decimal("12.50")),
+        ("12,345", Decimal("12.35")),
+        (0.1, Decimal("0.10")),
+        (1000, Decimal("1000.00")),
+        (Decimal("0.005"), Decimal("0.01")),
+    ])
+    def test_to_money(self, value, expected):
+        """Test that amounts are rounded half up to the cent"""
+        assert to_money(value) == expected
+
+    @pytest.mark.parametrize("value", ["abc", "", None, "nan", "inf"])
+    def test_invalid_amounts(self, value):
+        """Test that anything else than a finite number is refused"""
+        with pytest.raises(ValueError, match="Montant invalide"):
+            to_money(value)
@@ -0,0 +1,121 @@
+from unittest.mock import Mock
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User
+from app.services.client_service import get_clients_page
+from app.services.contract_service import get_contracts_page
+from app.services.event_service import get_events_page, get_events_with_details_page
+from app.services.pagination import keyset_page, iter_pages
+from app.services.user_service import list_users_page
+
+
+class TestKeysetPage:
+    """Test cases for keyset pagination"""
+
+    def test_first_page_has_no_lower_bound(self):
+        """Test that the first page is not filtered"""
+        query = Mock()
+        rows = [Mock(), Mock()]
+        query.order_by.return_value.limit.return_value.execution_options.return_value.all.return_value = rows
+
+        result = keyset_page(query, Client.id, limit=2)
+
+        assert result == rows
+        page = query.order_by.return_value.limit.return_value
+        page.execution_options.assert_called_once_with(keep_loaded=False, paged=True)
+        query.filter.assert_not_called()
+        query.order_by.assert_called_once_with(Client.id)
+        query.order_by.return_value.limit.assert_called_once_with(2)
+
+    def test_next_page_starts_after_cursor(self):
+        """Test that following pages only fetch rows after the cursor"""
+        query = Mock()
+        filtered = query.filter.return_value
+        filtered.order_by.return_value.limit.return_value.execution_options.return_value.all.return_value = []
+
+        keyset_page(query, Client.id, after_id=42, limit=10)
+
+        condition = query.filter.call_args[0][0]
+        assert str(condition) == str(Client.id > 42)
+        filtered.order_by.return_value.limit.assert_called_once_with(10)
+
+
+class TestIterPages:
+    """Test cases for page iteration"""
+
+    def test_iter_pages_follows_cursor(self):
+        """Test that each page is requested after the last id of the previous one"""
+        pages = [[Mock(id=1), Mock(id=2)], [Mock(id=3), Mock(id=4)], [Mock(id=5)]]
+        fetch_page = Mock(side_effect=pages)
+
+        result = [row.id for row in iter_pages(fetch_page, page_size=2)]
+
+        assert result == [1, 2, 3, 4, 5]
+        assert [c.kwargs for c in fetch_page.call_args_list] == [
+            {'after_id': None, 'limit': 2},
+            {'after_id': 2, 'limit': 2},
+            {'after_id': 4, 'limit': 2},
+        ]
+
+    def test_iter_pages_stops_on_empty_page(self):
+        """Test that a full last page ends with one empty request"""
+        fetch_page = Mock(side_effect=[[Mock(id=1), Mock(id=2)], []])
+
+        result = list(iter_pages(fetch_page, page_size=2))
+
+        assert len(result) == 2
+        assert fetch_page.call_count == 2
+
+    def test_iter_pages_is_lazy(self):
+        """Test that nothing is fetched before the iteration starts"""
+        fetch_page = Mock(return_value=[])
+
+        pages = iter_pages(fetch_page)
+
+        fetch_page.assert_not_called()
+        assert list(pages) == []
+        fetch_page.assert_called_once()
+
+
+class TestServicePages:
+    """Test cases for the paginated listing services"""
+
+    def _paged_rows(self, db):
+        rows = [Mock(), Mock()]
+        page = db.query.return_value.filter.return_value.order_by.return_value.limit.return_value
+        page.execution_options.return_value.all.return_value = rows
+        return rows
+
+    def _paged_rows_with_options(self, db):
+        rows = [Mock(), Mock()]
+        query = db.query.return_value.options.return_value
+        page = query.filter.return_value.order_by.return_value.limit.return_value
+        page.execution_options.return_value.all.return_value = rows
+        return rows
+
+    def test_get_clients_page(self, mock_database_session):
+        rows = self._paged_rows_with_options(mock_database_session)
+        assert get_clients_page(mock_database_session, after_id=10, limit=2) == rows
+        mock_database_session.query.assert_called_once_with(Client)
+
+    def test_get_contracts_page(self, mock_database_session):
+        rows = self._paged_rows_with_options(mock_database_session)
+        assert get_contracts_page(mock_database_session, after_id=10, limit=2) == rows
+        mock_database_session.query.assert_called_once_with(Contract)
+
+    def test_get_events_page(self, mock_database_session):
+        rows = self._paged_rows(mock_database_session)
+        assert get_events_page(mock_database_session, after_id=10, limit=2) == rows
+        mock_database_session.query.assert_called_once_with(Event)
+
+    def test_get_events_with_details_page(self, mock_database_session):
+        rows = self._paged_rows_with_options(mock_database_session)
+        assert get_events_with_details_page(mock_database_session, after_id=10, limit=2) == rows
+        mock_database_session.query.assert_called_once_with(Event)
+
+    def test_list_users_page(self, mock_database_session):
+        rows = self._paged_rows(mock_database_session)
+        assert list_users_page(mock_database_session, after_id=10, limit=2) == rows
+        mock_database_session.query.assert_called_once_with(User)
@@ -1,4 +1,10 @@
-from app.utils.password import hash_password, verify_password
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils.password import (
+    hash_password, verify_password, get_rounds, get_hash_rounds, needs_rehash, get_executor,
+    shutdown_executor, hash_passwords, verify_passwords, verify_password_async
+)
 
 
 class TestPasswordUtils:
@@ -55,3 +61,95 @@ class TestPasswordUtils:
         assert verify_password(password, hashed) is True
         assert verify_password(password.lower(), hashed) is False
         assert verify_password(password.upper(), hashed) is False
+
+
+class TestPasswordCost:
+    """Test cases for the configurable cost factor"""
+
+    def test_default_rounds(self, monkeypatch):
+        """Test that the default cost is used without configuration"""
+        monkeypatch.delenv("BCRYPT_ROUNDS", raising=False)
+        assert get_rounds() == 12
+
+    def test_rounds_from_environment(self, monkeypatch):
+        """Test that BCRYPT_ROUNDS drives the cost of new hashes"""
+        monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+
+        hashed = hash_password("secret")
+
+        assert get_hash_rounds(hashed) == 5
+        assert verify_password("secret", hashed) is True
+
+    def test_invalid_rounds(self, monkeypatch):
+        """Test that an out of range cost is rejected"""
+        monkeypatch.setenv("BCRYPT_ROUNDS", "3")
+
+        with pytest.raises(ValueError, match="BCRYPT_ROUNDS"):
+            get_rounds()
+
+    def test_explicit_rounds(self):
+        """Test hashing with an explicit cost"""
+        assert get_hash_rounds(hash_password("secret", rounds=4)) == 4
+
+    def test_get_hash_rounds_unreadable(self):
+        """Test reading the cost of something that is not a bcrypt hash"""
+        assert get_hash_rounds("hashed_password") is None
+
+    def test_needs_rehash(self):
+        """Test detecting hashes made with another cost"""
+        hashed = hash_password("secret", rounds=4)
+
+        assert needs_rehash(hashed, rounds=4) is False
+        assert needs_rehash(hashed, rounds=5) is True
+        assert needs_rehash("hashed_password", rounds=5) is False
+
+
+class TestPasswordBatch:
+    """Test cases for batch hashing on the worker pool"""
+
+    def teardown_method(self, method):
+        shutdown_executor()
+
+    def test_hash_passwords_keeps_order(self):
+        """Test that batch hashes match their passwords in input order"""
+        passwords = ["first", "second", "third"]
+
+        hashes = hash_passwords(passwords, rounds=4)
+
+        assert len(hashes) == 3
+        for password, hashed in zip(passwords, hashes):
+            assert verify_password(password, hashed) is True
+
+    def test_verify_passwords(self):
+        """Test verifying several candidates at once"""
+        hashed = hash_password("secret", rounds=4)
+
+        result = verify_passwords([("secret", hashed), ("wrong", hashed)])
+
+        assert result == [True, False]
+
+    def test_verify_passwords_empty(self):
+        """Test verifying an empty batch"""
+        assert verify_passwords([]) == []
+
+    def test_verify_password_async(self):
+        """Test verifying a password without blocking"""
+        hashed = hash_password("secret", rounds=4)
+
+        future = verify_password_async("secret", hashed)
+
+        assert future.result(timeout=10) is True
+
+    def test_process_executor(self, monkeypatch):
+        """Test that a process pool can be selected"""
+        monkeypatch.setenv("PASSWORD_HASH_EXECUTOR", "process")
+        monkeypatch.setenv("PASSWORD_HASH_WORKERS", "1")
+
+        assert isinstance(get_executor(), ProcessPoolExecutor)
+
+    def test_invalid_executor(self, monkeypatch):
+        """Test that an unknown executor kind is rejected"""
+        monkeypatch.setenv("PASSWORD_HASH_EXECUTOR", "gpu")
+
+        with pytest.raises(ValueError, match="PASSWORD_HASH_EXECUTOR"):
+            get_executor()
@@ -0,0 +1,77 @@
+import pytest
+from datetime import date
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.services.client_service import get_all_clients, get_clients_by_user, get_clients_page
+from app.services.contract_service import (
+    get_all_contracts, get_contracts_by_user, get_contracts_page, list_unsigned_contracts,
+    list_unpaid_contracts, list_signed_contracts, list_paid_contracts
+)
+
+
+def seed(session, count, offset=0):
+    """Add count clients, each with one contract, spread over three commercials"""
+    commercials = session.query(User).filter_by(role=UserRole.COMMERCIAL).order_by(User.id).all()
+    if not commercials:
+        commercials = [User(name=f"Commercial {i}", email=f"commercial{i}@mail.com",
+                            password="hashed", role=UserRole.COMMERCIAL) for i in range(3)]
+        session.add_all(commercials)
+
+    for i in range(offset, offset + count):
+        commercial = commercials[i % len(commercials)]
+        client = Client(full_name=f"Client {i}", email=f"client{i}@mail.com",
+                        date_created=date.today(), commercial=commercial)
+        session.add(Contract(client=client, commercial=commercial, total_amount=1000,
+                             amount_due=i % 2 * 500, is_signed=bool(i % 2)))
+    session.commit()
+    return commercials[0].id
+
+
+def count_listing_statements(engine, statement_counter, listing):
+    """Run a listing in a fresh session and touch what the list views display"""
+    statement_counter.clear()
+    with Session(bind=engine) as session:
+        for row in listing(session):
+            if isinstance(row, Contract):
+                _ = row.client.full_name, row.commercial.name
+            else:
+                _ = row.commercial.name
+    return len(statement_counter)
+
+
+def commercial_user(session):
+    return session.query(User).filter_by(role=UserRole.COMMERCIAL).order_by(User.id).first()
+
+
+LISTINGS = {
+    'get_all_contracts': get_all_contracts,
+    'get_contracts_page': lambda db: get_contracts_page(db, limit=1000),
+    'get_contracts_by_user': lambda db: get_contracts_by_user(db, commercial_user(db)),
+    'list_unsigned_contracts': list_unsigned_contracts,
+    'list_unpaid_contracts': list_unpaid_contracts,
+    'list_signed_contracts': list_signed_contracts,
+    'list_paid_contracts': list_paid_contracts,
+    'get_all_clients': get_all_clients,
+    'get_clients_page': lambda db: get_clients_page(db, limit=1000),
+    'get_clients_by_user': lambda db: get_clients_by_user(db, commercial_user(db)),
+}
+
+
+class TestListingStatementCount:
+    """The number of statements of a listing must not grow with the number of rows"""
+
+    @pytest.mark.parametrize("name", LISTINGS)
+    def test_statement_count_is_constant(self, name, sqlite_engine, db_session, statement_counter):
+        listing = LISTINGS[name]
+
+        seed(db_session, 6)
+        small = count_listing_statements(sqlite_engine, statement_counter, listing)
+
+        seed(db_session, 60, offset=6)
+        large = count_listing_statements(sqlite_engine, statement_counter, listing)
+
+        assert large == small
+        assert small <= 3
@@ -0,0 +1,103 @@
+import pytest
+from datetime import date
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.services.report_service import (
+    get_contract_totals, get_contract_totals_by_commercial, get_contract_totals_by_client,
+    get_contract_totals_by_month
+)
+
+
+@pytest.fixture
+def contracts_data(db_session):
+    """Two commercials, three clients and five contracts over two months"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    acme = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    globex = Client(full_name="Globex", email="globex@mail.com", commercial=alice)
+    initech = Client(full_name="Initech", email="initech@mail.com", commercial=bob)
+
+    db_session.add_all([
+        Contract(client=acme, commercial=alice, total_amount=1000, amount_due=0,
+                 is_signed=True, date_created=date(2025, 1, 10)),
+        Contract(client=acme, commercial=alice, total_amount=3000, amount_due=1000,
+                 is_signed=True, date_created=date(2025, 1, 20)),
+        Contract(client=globex, commercial=alice, total_amount=2000, amount_due=2000,
+                 is_signed=False, date_created=date(2025, 2, 1)),
+        Contract(client=initech, commercial=bob, total_amount=4000, amount_due=1000,
+                 is_signed=True, date_created=date(2025, 2, 15)),
+        Contract(client=initech, commercial=bob, total_amount=0, amount_due=0,
+                 is_signed=False, date_created=None),
+    ])
+    db_session.commit()
+    return {'alice': alice, 'bob': bob}
+
+
+class TestContractTotals:
+    """Test cases for the contract financial reports"""
+
+    def test_contract_totals(self, db_session, contracts_data):
+        """Test the totals over every contract"""
+        totals = get_contract_totals(db_session)
+
+        assert totals.contract_count == 5
+        assert totals.total_value == 10000
+        assert totals.outstanding == 4000
+        assert totals.signed_count == 3
+        assert totals.unsigned_count == 2
+        assert totals.paid_ratio == pytest.approx(0.6)
+
+    def test_contract_totals_empty(self, db_session):
+        """Test the totals without any contract"""
+        totals = get_contract_totals(db_session)
+
+        assert totals.contract_count == 0
+        assert totals.total_value == 0
+        assert totals.paid_ratio is None
+
+    def test_totals_by_commercial(self, db_session, contracts_data):
+        """Test the totals grouped by commercial"""
+        rows = get_contract_totals_by_commercial(db_session)
+
+        assert [row.commercial_name for row in rows] == ["Alice", "Bob"]
+        alice, bob = rows
+        assert alice.commercial_id == contracts_data['alice'].id
+        assert (alice.contract_count, alice.total_value, alice.outstanding) == (3, 6000, 3000)
+        assert (alice.signed_count, alice.unsigned_count) == (2, 1)
+        assert alice.paid_ratio == pytest.approx(0.5)
+        assert (bob.contract_count, bob.total_value, bob.outstanding) == (2, 4000, 1000)
+        assert bob.paid_ratio == pytest.approx(0.75)
+
+    def test_totals_by_client(self, db_session, contracts_data):
+        """Test the totals grouped by client"""
+        rows = get_contract_totals_by_client(db_session)
+
+        assert [(row.client_name, row.contract_count, row.outstanding) for row in rows] == [
+            ("Acme", 2, 1000), ("Globex", 1, 2000), ("Initech", 2, 1000)
+        ]
+
+    def test_totals_by_client_for_commercial(self, db_session, contracts_data):
+        """Test the client totals restricted to one commercial"""
+        rows = get_contract_totals_by_client(db_session, commercial_id=contracts_data['bob'].id)
+
+        assert [row.client_name for row in rows] == ["Initech"]
+
+    def test_totals_by_month(self, db_session, contracts_data):
+        """Test the totals grouped by creation month, undated contracts left out"""
+        rows = get_contract_totals_by_month(db_session)
+
+        assert [(row.month, row.contract_count, row.total_value) for row in rows] == [
+            ("2025-01", 2, 4000), ("2025-02", 2, 6000)
+        ]
+
+    def test_reports_run_one_statement(self, db_session, contracts_data, statement_counter):
+        """Test that each report is computed in a single query returning plain rows"""
+        for report in (get_contract_totals_by_commercial, get_contract_totals_by_client,
+                       get_contract_totals_by_month):
+            statement_counter.clear()
+            rows = report(db_session)
+
+            assert len(statement_counter) == 1
+            assert not any(isinstance(value, (Contract, Client, User)) for row in rows for value in row)
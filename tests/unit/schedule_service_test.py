@@ -0,0 +1,124 @@
+import pytest
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.errors import ScheduleConflictError
+from app.services.event_service import assign_supports, update_event
+from app.services.schedule_service import (
+    BusySchedule, find_conflicts, is_support_free, lock_support_query, overlaps
+)
+
+
+def at(day, hour):
+    return datetime(2025, 6, day, hour)
+
+
+@pytest.fixture
+def schedule(db_session):
+    """Sam runs the Gala on June 1st 10-18h, the Brunch and the Dinner of June 1st are unassigned"""
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    client = Client(full_name="Acme", email="acme@mail.com", commercial=alice)
+    contract = Contract(client=client, commercial=alice, total_amount=100, amount_due=0, is_signed=True)
+    events = {
+        name: Event(name=name, contract=contract, client=client, support_contact=support,
+                    date_start=start, date_end=end)
+        for name, support, start, end in [
+            ("Gala", sam, at(1, 10), at(1, 18)),
+            ("Brunch", None, at(1, 11), at(1, 13)),
+            ("Dinner", None, at(1, 18), at(1, 23)),
+            ("Late dinner", None, at(1, 20), at(2, 1)),
+        ]
+    }
+    db_session.add_all(events.values())
+    db_session.commit()
+    return {'sam': sam.id, **{name: event.id for name, event in events.items()}}
+
+
+class TestBusySchedule:
+    """Test cases for the in-memory index of busy periods"""
+
+    def test_conflicts(self):
+        """Test that only the events overlapping the period are returned, touching ones excluded"""
+        busy = BusySchedule([(1, at(1, 10), at(1, 18)), (2, at(1, 12), at(1, 13)), (3, at(2, 9), at(2, 12))])
+
+        assert busy.conflicts(at(1, 17), at(1, 19)) == [1]
+        assert sorted(busy.conflicts(at(1, 12), at(1, 14))) == [1, 2]
+        assert busy.conflicts(at(1, 18), at(2, 9)) == []
+        assert busy.is_free(at(1, 18), at(2, 9))
+        assert not busy.is_free(at(2, 11), at(2, 15))
+        assert busy.is_free(at(2, 9), at(2, 10), exclude_event_id=3)
+
+    def test_added_events_merge_blocks(self):
+        """Test that an event bridging two blocks merges them into one"""
+        busy = BusySchedule([(1, at(1, 10), at(1, 12)), (2, at(1, 14), at(1, 16))])
+
+        busy.add(3, at(1, 11), at(1, 15))
+
+        assert (busy.starts, busy.ends) == ([at(1, 10)], [at(1, 16)])
+        assert busy.conflicts(at(1, 12), at(1, 14)) == [3]
+
+
+class TestScheduleChecks:
+    """Test cases for refusing overlapping events of a support user"""
+
+    def test_is_support_free(self, db_session, schedule):
+        """Test the availability of a support user between two dates"""
+        assert not is_support_free(db_session, schedule['sam'], at(1, 17), at(1, 20))
+        assert is_support_free(db_session, schedule['sam'], at(1, 18), at(1, 20))
+        assert is_support_free(db_session, schedule['sam'], at(1, 9), at(1, 19), exclude_event_id=schedule['Gala'])
+        assert [event.name for event in find_conflicts(db_session, schedule['sam'], at(1, 0), at(2, 0))] == ["Gala"]
+
+    def test_update_event_refuses_overlap(self, db_session, schedule, mock_gestion_user):
+        """Test that neither an assignment nor new dates can give the support two events at once"""
+        with pytest.raises(ScheduleConflictError, match=f"event\\(s\\) {schedule['Gala']} at that time"):
+            update_event(db_session, schedule['Brunch'], mock_gestion_user, support_id=schedule['sam'])
+        update_event(db_session, schedule['Dinner'], mock_gestion_user, support_id=schedule['sam'])
+        with pytest.raises(ScheduleConflictError):
+            update_event(db_session, schedule['Dinner'], mock_gestion_user, date_start=at(1, 17))
+
+        assert db_session.get(Event, schedule['Brunch']).support_id is None
+
+    def test_support_cannot_probe_other_schedules(self, db_session, schedule, mock_gestion_user):
+        """Test that a support editing an event of someone else is refused before the schedule is checked"""
+        pat = User(name="Pat", email="pat@mail.com", password="hashed", role=UserRole.SUPPORT)
+        db_session.add(pat)
+        update_event(db_session, schedule['Dinner'], mock_gestion_user, support_id=schedule['sam'])
+
+        with pytest.raises(PermissionError):
+            update_event(db_session, schedule['Dinner'], pat, date_start=at(1, 17))
+        # Same when the event is not loaded and the ownership is checked by the UPDATE
+        pat_id = pat.id
+        db_session.expunge_all()
+        with pytest.raises(PermissionError):
+            update_event(db_session, schedule['Dinner'], db_session.get(User, pat_id), date_start=at(1, 17))
+
+    def test_schedule_check_locks_the_support(self):
+        """Test that the support whose schedule changes is locked on PostgreSQL"""
+        statement = str(lock_support_query(1, {'date_start': at(1, 10)}).compile(dialect=postgresql.dialect()))
+
+        assert statement.startswith("SELECT users.id \nFROM users \nWHERE users.id = (SELECT events.support_id")
+        assert statement.endswith("FOR UPDATE")
+
+    def test_bulk_assignment_checks_the_batch(self, db_session, schedule, mock_gestion_user):
+        """Test that assignments are checked against stored events and each other"""
+        sam = schedule['sam']
+        pairs = [(schedule['Brunch'], sam), (schedule['Dinner'], sam), (schedule['Late dinner'], sam)]
+
+        report = assign_supports(db_session, pairs, mock_gestion_user)
+
+        assert report['updated'] == 1
+        assert report['conflicts'] == {schedule['Brunch']: [schedule['Gala']],
+                                       schedule['Late dinner']: [schedule['Dinner']]}
+
+    def test_postgresql_uses_range_overlap(self):
+        """Test that PostgreSQL gets the expression of the GiST index"""
+        condition = overlaps(Event, at(1, 10), at(1, 12), "postgresql")
+
+        assert str(condition.compile(dialect=postgresql.dialect())) == \
+            "tsrange(events.date_start, events.date_end) && tsrange(%(tsrange_1)s, %(tsrange_2)s)"
@@ -0,0 +1,149 @@
+from unittest.mock import MagicMock, patch
+from sqlalchemy import Float, Numeric, create_engine, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.db.schema import create_missing_columns, create_missing_indexes, create_schema, upgrade_money_columns
+from app.models.base import Base
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+
+EXPECTED_INDEXES = {
+    'clients': {'ix_clients_commercial_id'},
+    'contracts': {'ix_contracts_client_id', 'ix_contracts_commercial_id_is_signed',
+                  'ix_contracts_unsigned', 'ix_contracts_unpaid'},
+    'events': {'ix_events_contract_id', 'ix_events_client_id', 'ix_events_date_start', 'ix_events_date_end',
+               'ix_events_support_id_date_start', 'ix_events_unassigned'},
+}
+
+
+def index_names(engine, table_name):
+    return {index['name'] for index in inspect(engine).get_indexes(table_name)}
+
+
+class TestDeclaredIndexes:
+    """Test cases for the indexes declared on the models"""
+
+    def test_foreign_keys_and_filters_are_indexed(self):
+        """Test that every hot filter column leads an index"""
+        for model, columns in [
+            (Client, ['commercial_id']),
+            (Contract, ['client_id', 'commercial_id']),
+            (Event, ['contract_id', 'client_id', 'support_id', 'date_start', 'date_end']),
+        ]:
+            leading = {index.columns.values()[0].name for index in model.__table__.indexes}
+            for column in columns:
+                assert column in leading, f"{model.__tablename__}.{column} is not indexed"
+
+    def test_partial_indexes(self):
+        """Test the partial indexes conditions on PostgreSQL"""
+        indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+
+        def ddl(name):
+            return str(CreateIndex(indexes[name]).compile(dialect=postgresql.dialect()))
+
+        assert ddl('ix_contracts_unsigned').endswith("WHERE is_signed = false")
+        assert ddl('ix_contracts_unpaid').endswith("WHERE amount_due > 0")
+        assert ddl('ix_events_unassigned').endswith("WHERE support_id IS NULL")
+
+    def test_support_period_index_is_postgresql_only(self):
+        """Test the GiST index on support periods, which other databases skip"""
+        index = next(index for index in Event.__table__.indexes if index.name == 'ix_events_support_period')
+        engine = create_engine("sqlite://")
+
+        create_schema(engine)
+
+        assert str(CreateIndex(index).compile(dialect=postgresql.dialect())) == (
+            "CREATE INDEX ix_events_support_period ON events USING gist "
+            "(support_id, tsrange(date_start, date_end)) WHERE support_id IS NOT NULL")
+        assert 'ix_events_support_period' not in index_names(engine, 'events')
+
+
+class TestCreateSchema:
+    """Test cases for creating the schema on a new or existing database"""
+
+    def test_create_schema_new_database(self):
+        """Test that a new database gets every table and index"""
+        engine = create_engine("sqlite://")
+
+        created = create_schema(engine)
+
+        assert created == []
+        for table_name, expected in EXPECTED_INDEXES.items():
+            assert expected <= index_names(engine, table_name)
+
+    def test_create_missing_indexes_existing_database(self):
+        """Test that indexes are added to tables created before they were declared"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(engine)
+
+        created = create_missing_indexes(engine)
+
+        assert set(created) == set().union(*EXPECTED_INDEXES.values())
+        for table_name, expected in EXPECTED_INDEXES.items():
+            assert expected <= index_names(engine, table_name)
+
+    def test_create_missing_indexes_is_idempotent(self):
+        """Test that running it again does nothing"""
+        engine = create_engine("sqlite://")
+        create_schema(engine)
+
+        assert create_missing_indexes(engine) == []
+
+
+class TestCreateMissingColumns:
+    """Test cases for adding the columns declared after a table was created"""
+
+    def test_version_columns_are_added_to_existing_rows(self):
+        """Test that existing rows start at version 1, and that running it again does nothing"""
+        engine = create_engine("sqlite://")
+        create_schema(engine)
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO users (id, name, email, password, role) "
+                                    "VALUES (1, 'A', 'a@mail.com', 'x', 'COMMERCIAL')"))
+            connection.execute(text("INSERT INTO clients (id, full_name, email, commercial_id) "
+                                    "VALUES (1, 'Acme', 'acme@mail.com', 1)"))
+            connection.execute(text("ALTER TABLE clients DROP COLUMN version"))
+
+        assert create_missing_columns(engine) == ["clients.version"]
+        assert create_missing_columns(engine) == []
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT version FROM clients")).scalar_one() == 1
+
+
+class TestUpgradeMoneyColumns:
+    """Test cases for converting floating point money columns to NUMERIC"""
+
+    def test_money_columns_are_exact(self):
+        """Test that amounts are declared as NUMERIC(12, 2)"""
+        for column in (Contract.__table__.c.total_amount, Contract.__table__.c.amount_due):
+            assert column.type.compile(dialect=postgresql.dialect()) == "NUMERIC(12, 2)"
+
+    def test_float_columns_are_converted_on_postgresql(self):
+        """Test that only the columns still stored as floating point are altered"""
+        bind = MagicMock()
+        bind.dialect = postgresql.dialect()
+        inspector = MagicMock()
+        inspector.get_columns.side_effect = lambda table_name: [
+            {'name': 'total_amount', 'type': Float()},
+            {'name': 'amount_due', 'type': Numeric(12, 2)},
+        ] if table_name == "contracts" else []
+
+        with patch("app.db.schema.inspect", return_value=inspector):
+            converted = upgrade_money_columns(bind)
+
+        assert converted == ["contracts.total_amount"]
+        statement = str(bind.begin.return_value.__enter__.return_value.execute.call_args.args[0])
+        assert statement == "ALTER TABLE contracts ALTER COLUMN total_amount TYPE NUMERIC(12, 2) " \
+                            "USING round(total_amount::numeric, 2)"
+
+    def test_sqlite_is_left_untouched(self):
+        """Test that SQLite, which has no exact type, needs no conversion"""
+        engine = create_engine("sqlite://")
+        create_schema(engine)
+
+        assert upgrade_money_columns(engine) == []
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from unittest.mock import Mock
+
+from app.models.client import Client
+from app.models.contract import Contract
+from app.models.event import Event
+from app.models.user import User, UserRole
+from app.services.search_service import _ranked, search_clients, search_contracts, search_events
+from datetime import datetime
+
+
+@pytest.fixture
+def directory(db_session):
+    """Clients of two commercials, a contract and an event each"""
+    alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    bob = User(name="Bob", email="bob@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+    sam = User(name="Sam", email="sam@mail.com", password="hashed", role=UserRole.SUPPORT)
+    clients = [
+        Client(full_name="Jean Dupont", email="jean@acme.fr", company_name="Acme", phone="0102030405",
+               commercial=alice),
+        Client(full_name="Marie Acmel", email="marie@globex.fr", company_name="Globex", commercial=alice),
+        Client(full_name="Paul 100% Martin", email="paul@initech.fr", company_name="Initech", commercial=bob),
+    ]
+    for number, client in enumerate(clients):
+        contract = Contract(client=client, commercial=client.commercial, total_amount=100, amount_due=0, is_signed=True)
+        db_session.add(Event(name=f"Salon {client.company_name}", contract=contract, client=client,
+                             support_contact=sam if number == 0 else None,
+                             date_start=datetime(2025, 6, number + 1, 10), date_end=datetime(2025, 6, number + 1, 12)))
+    db_session.commit()
+    return {'alice': alice.id, 'bob': bob.id, 'sam': sam.id}
+
+
+def names(rows):
+    return [row.full_name for row in rows]
+
+
+class TestSearchClients:
+    """Test cases for searching clients instead of listing them all"""
+
+    def test_matches_any_field_name_first(self, db_session, directory):
+        """Test that names, emails, companies and phones match, names starting with the text first"""
+        assert names(search_clients(db_session, "acme")) == ["Jean Dupont", "Marie Acmel"]
+        assert names(search_clients(db_session, "ACME", limit=1)) == ["Jean Dupont"]
+        assert names(search_clients(db_session, "0102")) == ["Jean Dupont"]
+        assert names(search_clients(db_session, "marie")) == ["Marie Acmel"]
+
+    def test_every_word_must_match(self, db_session, directory):
+        """Test that several words narrow the results and wildcards are taken literally"""
+        assert names(search_clients(db_session, "jean globex")) == []
+        assert names(search_clients(db_session, "  marie   globex ")) == ["Marie Acmel"]
+        assert names(search_clients(db_session, "100%")) == ["Paul 100% Martin"]
+        assert names(search_clients(db_session, "_")) == []
+
+    def test_scope_and_default(self, db_session, directory):
+        """Test the commercial scope, and that no text gives the latest clients"""
+        assert names(search_clients(db_session, "fr", commercial_id=directory['bob'])) == ["Paul 100% Martin"]
+        assert names(search_clients(db_session, "", limit=2)) == ["Paul 100% Martin", "Marie Acmel"]
+
+
+class TestSearchContractsAndEvents:
+    """Test cases for finding contracts and events by their client"""
+
+    def test_search_contracts(self, db_session, directory):
+        """Test that contracts are found by client and limited to the commercial's"""
+        assert [contract.client.full_name for contract in search_contracts(db_session, "acme")] == \
+            ["Jean Dupont", "Marie Acmel"]
+        assert search_contracts(db_session, "acme", commercial_id=directory['bob']) == []
+
+    def test_search_events(self, db_session, directory):
+        """Test that events are found by name or client, and limited to what a support may update"""
+        assert [event.name for event in search_events(db_session, "salon dupont")] == []
+        assert [event.name for event in search_events(db_session, "salon")] == \
+            ["Salon Acme", "Salon Globex", "Salon Initech"]
+        assert [event.name for event in search_events(db_session, "initech")] == ["Salon Initech"]
+        supported = search_events(db_session, "", support_id=directory['sam'])
+        assert len(supported) == 3
+        assert [event.name for event in search_events(db_session, "dupont", support_id=directory['sam'])] == \
+            ["Salon Acme"]
+
+
+class TestPostgresqlSearch:
+    """Test cases for the PostgreSQL search expressions and indexes"""
+
+    def test_query_uses_the_indexed_expressions(self):
+        """Test that the query spells the document exactly as the GIN indexes do"""
+        db = Mock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.scalars.return_value = []
+
+        _ranked(db, select(Client), Client, "acme", 5)
+
+        sql = str(db.scalars.call_args[0][0].compile(dialect=postgresql.dialect()))
+        document = "lower(clients.full_name || ' ' || clients.email || ' ' || coalesce(clients.company_name, '') " \
+                   "|| ' ' || coalesce(clients.phone, ''))"
+        assert f"%(param_1)s <%% {document}" in sql
+        assert f"to_tsvector('simple', {document}) @@ plainto_tsquery('simple', %(plainto_tsquery_1)s)" in sql
+        assert "ORDER BY word_similarity" in sql
+
+        indexes = {index.name: str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+                   for index in Client.__table__.indexes}
+        indexed = document.replace("clients.", "")
+        assert indexes['ix_clients_search_trgm'].endswith(f"USING gin ({indexed} gin_trgm_ops)")
+        assert indexes['ix_clients_search_words'].endswith(f"USING gin (to_tsvector('simple', {indexed}))")
@@ -0,0 +1,94 @@
+import os
+import pytest
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User, UserRole
+from app.services.auth_service import forget_session, login_with_token, remember_session, restore_session
+from app.utils.session_token import create_token, decode_token, get_token_path, load_token, save_token
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def alice(db_session, sqlite_engine, monkeypatch):
+    """A stored user, with session tokens enabled and the auth service on the test database"""
+    monkeypatch.setenv("SESSION_SECRET", SECRET)
+    user = User(name="Alice", email="alice@mail.com", password="$2b$04$hash", role=UserRole.COMMERCIAL)
+    db_session.add(user)
+    db_session.commit()
+    with patch("app.services.auth_service.SessionLocal", sessionmaker(bind=sqlite_engine)):
+        yield user
+
+
+class TestSessionToken:
+    """Test cases for signed session tokens"""
+
+    def test_round_trip(self):
+        """Test that a token carries the user id and its expiry"""
+        claims = decode_token(create_token(7, "hash", SECRET, ttl=60), SECRET)
+
+        assert claims['sub'] == 7
+        assert claims['exp'] - claims['iat'] == 60
+
+    def test_rejects_forged_expired_and_malformed_tokens(self):
+        """Test that only untampered, unexpired tokens signed with the secret are accepted"""
+        token = create_token(7, "hash", SECRET)
+        header, payload, signature = token.split(".")
+
+        assert decode_token(token, "other-secret") is None
+        assert decode_token(f"{header}.{create_token(1, 'hash', 'x').split('.')[1]}.{signature}", SECRET) is None
+        assert decode_token(create_token(7, "hash", SECRET, ttl=-1), SECRET) is None
+        assert decode_token("not-a-token", SECRET) is None
+        assert decode_token("a.b!.c", SECRET) is None
+
+    def test_token_file_is_private(self):
+        """Test that the stored token is only readable by its owner"""
+        save_token("abc")
+
+        assert load_token() == "abc"
+        assert os.stat(get_token_path()).st_mode & 0o777 == 0o600
+
+
+class TestTokenLogin:
+    """Test cases for logging in with a session token"""
+
+    def test_login_with_token_skips_bcrypt(self, alice):
+        """Test that a valid token logs the user in without verifying a password"""
+        with patch("app.services.auth_service.verify_password") as mock_verify:
+            user = login_with_token(create_token(alice.id, alice.password, SECRET))
+
+        assert user.email == "alice@mail.com"
+        mock_verify.assert_not_called()
+
+    def test_password_change_or_deletion_revokes_token(self, alice, db_session):
+        """Test that the token is revalidated against the users table"""
+        token = create_token(alice.id, alice.password, SECRET)
+        alice.password = "$2b$04$other"
+        db_session.commit()
+
+        assert login_with_token(token) is None
+        assert login_with_token(create_token(999, alice.password, SECRET)) is None
+
+    def test_remember_restore_forget(self, alice):
+        """Test the stored session lifecycle"""
+        assert restore_session() is None
+
+        remember_session(alice)
+
+        assert restore_session().id == alice.id
+        assert restore_session("ALICE@mail.com").id == alice.id
+        assert restore_session("bob@mail.com") is None
+
+        forget_session()
+
+        assert restore_session() is None
+
+    def test_disabled_without_secret(self, alice, monkeypatch):
+        """Test that nothing is stored or accepted without SESSION_SECRET"""
+        monkeypatch.delenv("SESSION_SECRET")
+
+        remember_session(alice)
+
+        assert load_token() is None
+        assert login_with_token(create_token(alice.id, alice.password, SECRET)) is None
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.utils.config import env_float
+
+ROOT = Path(__file__).resolve().parents[2]
+# Everything the application runs before showing the login prompt
+UP_TO_LOGIN_PROMPT = "import main; from app.controllers.main_controller import MainController; MainController()"
+# Loaded once the user has typed their credentials or opened a menu, never before the prompt
+HEAVY_MODULES = ("sqlalchemy", "sentry_sdk", "psycopg2", "app.db.connection", "app.services",
+                 "app.controllers.client_menu_controller", "app.controllers.contract_menu_controller",
+                 "app.controllers.event_menu_controller", "app.controllers.user_menu_controller")
+
+
+def import_times(code: str) -> dict:
+    """Run code in a fresh interpreter under -X importtime, cumulative microseconds per top level import"""
+    env = {**os.environ, "SENTRY_DSN": "", "SESSION_SECRET": ""}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    modules, top_level = [], {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append(name.strip())
+        if not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative)
+    return {'modules': modules, 'top_level': top_level}
+
+
+class TestStartup:
+    """Test cases guarding the time to the login prompt"""
+
+    def test_login_prompt_does_not_load_heavy_modules(self):
+        """Test that the ORM, Sentry, the driver and the menus stay out of the startup path"""
+        modules = import_times(UP_TO_LOGIN_PROMPT)['modules']
+
+        loaded = sorted({module for module in modules if module.startswith(HEAVY_MODULES)})
+        assert loaded == []
+
+    def test_login_prompt_import_budget(self):
+        """Test that imports up to the login prompt stay within STARTUP_IMPORT_BUDGET_MS"""
+        budget_ms = env_float("STARTUP_IMPORT_BUDGET_MS", 300.0)
+
+        top_level = import_times(UP_TO_LOGIN_PROMPT)['top_level']
+
+        total_ms = sum(top_level.values()) / 1000
+        slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:5]
+        assert total_ms <= budget_ms, f"{total_ms:.0f} ms of imports before the login prompt, slowest: {slowest}"
+
+    def test_command_output_has_no_status_line(self):
+        """Test that the Sentry status goes to stderr, stdout only carries the command output"""
+        env = {**os.environ, "SENTRY_DSN": "", "SESSION_SECRET": ""}
+        result = subprocess.run([sys.executable, "main.py", "--help"], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+
+        assert result.stdout.startswith("Usage:")
+        assert "Sentry not initialized" in result.stderr
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import patch
+
+from app.utils import telemetry
+from app.utils.telemetry import MetricsBuffer, get_traces_sample_rate, init_telemetry, make_traces_sampler
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Telemetry enabled without initializing Sentry, a fresh metrics buffer of 3"""
+    monkeypatch.setattr(telemetry, "_enabled", True)
+    monkeypatch.setattr(telemetry, "metrics", MetricsBuffer(batch_size=3))
+    with patch("sentry_sdk.add_breadcrumb") as add_breadcrumb, patch("sentry_sdk.set_context") as set_context:
+        yield add_breadcrumb, set_context
+
+
+class TestSampling:
+    """Test cases for the share of actions traced"""
+
+    def test_sample_rate_from_environment(self, monkeypatch):
+        """Test the default rate, a configured one and an invalid one"""
+        monkeypatch.delenv("SENTRY_TRACES_SAMPLE_RATE", raising=False)
+        assert get_traces_sample_rate() == 0.1
+        monkeypatch.setenv("SENTRY_TRACES_SAMPLE_RATE", "0.5")
+        assert get_traces_sample_rate() == 0.5
+        monkeypatch.setenv("SENTRY_TRACES_SAMPLE_RATE", "2")
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            get_traces_sample_rate()
+
+    def test_sampler_follows_parent(self):
+        """Test that a trace continued from a sampled or dropped parent keeps its decision"""
+        sampler = make_traces_sampler(0.25)
+
+        assert sampler({}) == 0.25
+        assert sampler({'parent_sampled': True}) == 1.0
+        assert sampler({'parent_sampled': False}) == 0.0
+
+    def test_init_without_dsn(self, monkeypatch):
+        """Test that telemetry stays disabled without a DSN"""
+        monkeypatch.delenv("SENTRY_DSN", raising=False)
+        monkeypatch.setattr(telemetry, "_enabled", False)
+
+        assert init_telemetry() is False
+        assert not telemetry.is_enabled()
+
+    def test_init_with_dsn(self, monkeypatch):
+        """Test that Sentry gets the sampler instead of tracing everything"""
+        monkeypatch.setattr(telemetry, "_enabled", False)
+        monkeypatch.setenv("SENTRY_TRACES_SAMPLE_RATE", "0.2")
+        with patch("sentry_sdk.init") as sentry_init, patch("atexit.register"):
+            assert init_telemetry("https://key@sentry.example/1", "test") is True
+
+        options = sentry_init.call_args.kwargs
+        assert "traces_sample_rate" not in options
+        assert options['traces_sampler']({}) == 0.2
+        assert options['environment'] == "test"
+        assert telemetry.is_enabled()
+
+
+class TestEvents:
+    """Test cases for breadcrumbs and batched counters"""
+
+    def test_disabled_is_a_no_op(self, monkeypatch):
+        """Test that nothing is recorded nor sent while Sentry is not initialized"""
+        monkeypatch.setattr(telemetry, "_enabled", False)
+        with patch("sentry_sdk.add_breadcrumb") as add_breadcrumb, patch("sentry_sdk.capture_exception") as capture:
+            telemetry.record_event("client.created", "Client created")
+            telemetry.capture_exception(Exception("boom"))
+            with telemetry.start_transaction("clients list") as transaction:
+                assert transaction is None
+
+        add_breadcrumb.assert_not_called()
+        capture.assert_not_called()
+
+    def test_counters_are_flushed_in_batches(self, enabled):
+        """Test that every event is a breadcrumb, counters go to Sentry once per batch"""
+        add_breadcrumb, set_context = enabled
+
+        telemetry.record_event("client.created", "Client 1 created", client_id=1)
+        telemetry.record_event("client.created", "Client 2 created", client_id=2)
+        set_context.assert_not_called()
+        telemetry.record_event("event.updated", "Event 7 updated", event_id=7)
+        telemetry.record_event("event.updated", "Event 8 updated", event_id=8)
+
+        assert add_breadcrumb.call_count == 5
+        set_context.assert_called_once_with("metrics", {'client.created': 2, 'event.updated': 1})
+        assert telemetry.metrics.totals() == {'client.created': 2, 'event.updated': 2}
+
+    def test_flush_sends_pending_counts_once(self, enabled):
+        """Test that flushing at exit sends what is left, and nothing when empty"""
+        add_breadcrumb, set_context = enabled
+        telemetry.metrics.increment("user.deleted")
+
+        telemetry.metrics.flush()
+        telemetry.metrics.flush()
+
+        add_breadcrumb.assert_called_once_with(category="metrics", message="counters", level="info",
+                                               data={'user.deleted': 1})
+        set_context.assert_called_once_with("metrics", {'user.deleted': 1})
@@ -0,0 +1,171 @@
+import gc
+import pytest
+from functools import partial
+from unittest.mock import ANY, Mock, patch
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.controllers.client_menu_controller import ClientMenuController
+from app.db.unit_of_work import UnitOfWork
+from app.models.client import Client
+from app.models.user import User, UserRole
+from app.services.client_service import get_clients_page
+from app.services.pagination import iter_pages
+from app.services.user_service import get_user_by_id, list_users_page
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    """Session factory bound to the in-memory database"""
+    return sessionmaker(bind=sqlite_engine)
+
+
+@pytest.fixture
+def alice_id(session_factory):
+    """Store one user and return its id"""
+    with session_factory() as session:
+        alice = User(name="Alice", email="alice@mail.com", password="hashed", role=UserRole.COMMERCIAL)
+        session.add(alice)
+        session.commit()
+        return alice.id
+
+
+class TestUnitOfWork:
+    """Test cases for the session shared by a menu"""
+
+    def test_session_is_opened_once(self, session_factory):
+        """Test that every access returns the same lazily opened session"""
+        uow = UnitOfWork(session_factory, max_age=60)
+
+        assert uow.session is uow.session
+
+    def test_session_keeps_objects_after_commit(self, session_factory):
+        """Test that the shared session does not expire objects on commit"""
+        uow = UnitOfWork(session_factory, max_age=60)
+
+        assert uow.session.expire_on_commit is False
+
+    def test_repeated_lookup_hits_identity_map(self, session_factory, alice_id, statement_counter):
+        """Test that loading the same row twice in a menu queries the database once"""
+        uow = UnitOfWork(session_factory, max_age=60)
+
+        first = get_user_by_id(uow.session, alice_id)
+        second = get_user_by_id(uow.session, alice_id)
+
+        assert first is second
+        assert len(statement_counter) == 1
+
+    def test_end_action_keeps_objects_for_next_action(self, session_factory, alice_id, statement_counter):
+        """Test that ending an action closes its transaction, its objects still serve the next action"""
+        uow = UnitOfWork(session_factory, max_age=60)
+        get_user_by_id(uow.session, alice_id).name
+
+        uow.end_action()
+
+        assert not uow.session.in_transaction()
+        assert get_user_by_id(uow.session, alice_id).name == "Alice"
+        assert len(statement_counter) == 1
+
+    def test_paging_keeps_memory_flat(self, session_factory, alice_id):
+        """Test that streaming a large table only holds the current page, not every row read"""
+        with session_factory() as session:
+            session.execute(insert(Client), [
+                {'full_name': f"Client {i}", 'email': f"client{i}@mail.com", 'commercial_id': alice_id}
+                for i in range(2500)
+            ])
+            session.commit()
+        uow = UnitOfWork(session_factory, max_age=60)
+        sizes = []
+
+        for count, client in enumerate(iter_pages(partial(get_clients_page, uow.session)), start=1):
+            if count % 500 == 0:
+                gc.collect()
+                sizes.append(len(uow.session.identity_map))
+
+        assert count == 2500
+        assert max(sizes) <= 101
+        assert uow._kept == {}
+
+    def test_written_objects_are_kept(self, session_factory, alice_id, statement_counter):
+        """Test that a row read by a listing then edited by the action stays loaded for the next one"""
+        uow = UnitOfWork(session_factory, max_age=60)
+        alice = next(iter_pages(partial(list_users_page, uow.session)))
+        alice.name = "Alice B."
+
+        uow.end_action()
+        del alice
+        gc.collect()
+
+        assert get_user_by_id(uow.session, alice_id).name == "Alice B."
+        assert len(statement_counter) == 2
+
+    def test_objects_expire_after_max_age(self, session_factory, alice_id, statement_counter):
+        """Test that objects older than max_age are reloaded"""
+        uow = UnitOfWork(session_factory, max_age=60)
+        get_user_by_id(uow.session, alice_id)
+
+        with patch("app.db.unit_of_work.time.monotonic", return_value=uow._loaded_at + 61):
+            assert get_user_by_id(uow.session, alice_id).name == "Alice"
+
+        assert len(statement_counter) == 2
+
+    def test_rollback_expires_objects(self, session_factory, alice_id, statement_counter):
+        """Test that a rollback forces objects to be reloaded"""
+        uow = UnitOfWork(session_factory, max_age=60)
+        user = get_user_by_id(uow.session, alice_id)
+
+        uow.rollback()
+        assert user.name == "Alice"
+
+        assert len(statement_counter) == 2
+
+    def test_close_opens_new_session(self, session_factory):
+        """Test that the session is replaced after close"""
+        uow = UnitOfWork(session_factory, max_age=60)
+        session = uow.session
+
+        uow.close()
+
+        assert uow.session is not session
+
+    def test_max_age_from_environment(self, monkeypatch):
+        """Test that SESSION_MAX_AGE sets the expiry delay"""
+        monkeypatch.setenv("SESSION_MAX_AGE", "12.5")
+
+        assert UnitOfWork().max_age == 12.5
+
+    def test_context_manager_rolls_back_and_closes(self):
+        """Test that leaving the block after an error rolls back then closes"""
+        session = Mock()
+        uow = UnitOfWork(Mock(return_value=session), max_age=60)
+
+        with pytest.raises(RuntimeError):
+            with uow:
+                uow.session
+                raise RuntimeError("boom")
+
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+
+
+class TestMenuSession:
+    """Test cases for the session lifetime of a menu"""
+
+    @patch('app.controllers.client_menu_controller.get_clients_page')
+    @patch('app.db.unit_of_work.SessionLocal')
+    def test_menu_shares_session_and_closes_on_exit(self, mock_session_local, mock_get_clients_page, mock_user):
+        """Test that actions of one menu share a session closed when leaving the menu"""
+        db = Mock()
+        mock_session_local.return_value = db
+        mock_get_clients_page.return_value = []
+        controller = ClientMenuController(mock_user)
+        controller.view = Mock()
+        controller.view.show_clients_menu.side_effect = ["1", "1", "0"]
+        controller.view.display_clients_list.side_effect = list
+
+        controller.handle_menu()
+
+        mock_session_local.assert_called_once_with(expire_on_commit=False, info=ANY)
+        assert mock_get_clients_page.call_count == 2
+        assert db.commit.call_count == 2
+        db.close.assert_called_once()
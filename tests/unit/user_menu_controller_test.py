@@ -43,41 +43,45 @@ class TestUserMenuController:
         controller.handle_menu()
         mock_show_error.assert_called_with("Choix invalide.")
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
-    @patch('app.controllers.user_menu_controller.list_all_users')
-    def test_list_users_success(self, mock_list_all_users, mock_session_local, controller):
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.user_menu_controller.list_users_page')
+    def test_list_users_success(self, mock_list_users_page, mock_session_local, controller):
         mock_db = mock_session_local.return_value
         mock_users = [Mock(spec=User), Mock(spec=User)]
-        mock_list_all_users.return_value = mock_users
+        mock_list_users_page.return_value = mock_users
+        displayed = []
+        controller.view.display_users_list.side_effect = displayed.extend
 
         controller.list_users()
 
-        mock_list_all_users.assert_called_once_with(mock_db)
-        controller.view.display_users_list.assert_called_once_with(mock_users)
-        mock_db.close.assert_called_once()
+        mock_list_users_page.assert_called_once_with(mock_db, after_id=None, limit=100)
+        assert displayed == mock_users
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
-    @patch('app.controllers.user_menu_controller.list_all_users')
+    @patch('app.db.unit_of_work.SessionLocal')
+    @patch('app.controllers.user_menu_controller.list_users_page')
     @patch('app.controllers.user_menu_controller.show_error')
-    @patch('app.controllers.user_menu_controller.sentry_sdk')
-    def test_list_users_exception(self, mock_sentry, mock_show_error, mock_list_all_users, mock_session_local, controller):
+    @patch('app.controllers.user_menu_controller.telemetry')
+    def test_list_users_exception(self, mock_telemetry, mock_show_error, mock_list_users_page, mock_session_local,
+                                  controller):
         mock_db = mock_session_local.return_value
         exception = Exception("Database error")
-        mock_list_all_users.side_effect = exception
+        mock_list_users_page.side_effect = exception
+        controller.view.display_users_list.side_effect = list
 
         controller.list_users()
 
         mock_show_error.assert_called_once_with("Erreur lors de la récupération des utilisateurs: Database error")
-        mock_sentry.capture_exception.assert_called_once_with(exception)
-        mock_db.close.assert_called_once()
+        mock_telemetry.capture_exception.assert_called_once_with(exception)
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.get_user_by_email')
     @patch('app.controllers.user_menu_controller.create_user')
     @patch('app.controllers.user_menu_controller.show_success')
     @patch('app.controllers.user_menu_controller.show_info')
-    @patch('app.controllers.user_menu_controller.sentry_sdk')
-    def test_create_user_success(self, mock_sentry, mock_show_info, mock_show_success, mock_create_user,
+    @patch('app.controllers.user_menu_controller.telemetry')
+    def test_create_user_success(self, mock_telemetry, mock_show_info, mock_show_success, mock_create_user,
                                  mock_get_user_by_email, mock_session_local, controller):
         mock_db = mock_session_local.return_value
         user_data = {
@@ -95,10 +99,10 @@ class TestUserMenuController:
 
         mock_create_user.assert_called_once()
         mock_show_success.assert_called_once()
-        mock_sentry.capture_message.assert_called_once()
-        mock_db.close.assert_called_once()
+        mock_telemetry.record_event.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.show_info')
     def test_create_user_cancelled(self, mock_show_info, mock_session_local, controller):
         mock_db = mock_session_local.return_value
@@ -107,9 +111,9 @@ class TestUserMenuController:
         controller.create_user()
 
         mock_show_info.assert_called_once_with("Création annulée.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.show_error')
     def test_create_user_missing_fields(self, mock_show_error, mock_session_local, controller):
         mock_db = mock_session_local.return_value
@@ -120,9 +124,9 @@ class TestUserMenuController:
         controller.create_user()
 
         mock_show_error.assert_called_once_with("Tous les champs sont requis.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.get_user_by_email')
     @patch('app.controllers.user_menu_controller.show_error')
     def test_create_user_email_exists(self, mock_show_error, mock_get_user_by_email, mock_session_local, controller):
@@ -135,9 +139,9 @@ class TestUserMenuController:
         controller.create_user()
 
         mock_show_error.assert_called_once_with("Un utilisateur avec cet email existe déjà.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.list_all_users')
     @patch('app.controllers.user_menu_controller.show_info')
     def test_update_user_no_users(self, mock_show_info, mock_list_all_users, mock_session_local, controller):
@@ -147,15 +151,15 @@ class TestUserMenuController:
         controller.update_user()
 
         mock_show_info.assert_called_once_with("Aucun utilisateur à modifier.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.list_all_users')
     @patch('app.controllers.user_menu_controller.check_user_associations')
     @patch('app.controllers.user_menu_controller.delete_user')
     @patch('app.controllers.user_menu_controller.show_success')
-    @patch('app.controllers.user_menu_controller.sentry_sdk')
-    def test_delete_user_success(self, mock_sentry, mock_show_success, mock_delete_user, mock_check_associations,
+    @patch('app.controllers.user_menu_controller.telemetry')
+    def test_delete_user_success(self, mock_telemetry, mock_show_success, mock_delete_user, mock_check_associations,
                                  mock_list_all_users, mock_session_local, controller):
         mock_db = mock_session_local.return_value
         user = Mock(spec=User, id=2, name="User to Delete")
@@ -168,10 +172,10 @@ class TestUserMenuController:
 
         mock_delete_user.assert_called_once_with(mock_db, 2)
         mock_show_success.assert_called_once()
-        mock_sentry.capture_message.assert_called_once()
-        mock_db.close.assert_called_once()
+        mock_telemetry.record_event.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.list_all_users')
     @patch('app.controllers.user_menu_controller.show_error')
     def test_delete_user_self_deletion(self, mock_show_error, mock_list_all_users, mock_session_local, controller):
@@ -183,9 +187,9 @@ class TestUserMenuController:
         controller.delete_user()
 
         mock_show_error.assert_called_once_with("Vous ne pouvez pas supprimer votre propre compte.")
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
 
-    @patch('app.controllers.user_menu_controller.SessionLocal')
+    @patch('app.db.unit_of_work.SessionLocal')
     @patch('app.controllers.user_menu_controller.list_all_users')
     @patch('app.controllers.user_menu_controller.check_user_associations')
     @patch('app.controllers.user_menu_controller.show_error')
@@ -211,4 +215,4 @@ class TestUserMenuController:
             "Veuillez d'abord réassigner ces éléments à un autre utilisateur."
         )
         mock_show_error.assert_called_once_with(expected_error)
-        mock_db.close.assert_called_once()
+        mock_db.close.assert_not_called()
@@ -1,7 +1,7 @@
 from unittest.mock import Mock, patch
 
 from app.services.user_service import (
-    create_user, update_user, delete_user, list_all_users,
+    create_user, create_users, update_user, delete_user, list_all_users,
     get_user_by_email, get_user_by_id, check_user_associations,
     email_exists_for_different_user
 )
@@ -33,8 +33,24 @@ class TestUserService:
         mock_database_session.commit.assert_called_once()
         mock_database_session.refresh.assert_called_once_with(mock_user)
 
+    @patch('app.services.user_service.hash_passwords')
+    def test_create_users_batch(self, mock_hash_passwords, mock_database_session):
+        mock_hash_passwords.return_value = ["hash_1", "hash_2"]
+        users_data = [
+            {'name': "First", 'email': "first@example.com", 'role': UserRole.COMMERCIAL, 'password': "pw1"},
+            {'name': "Second", 'email': "second@example.com", 'role': UserRole.SUPPORT, 'password': "pw2"},
+        ]
+
+        result = create_users(mock_database_session, users_data)
+
+        mock_hash_passwords.assert_called_once_with(["pw1", "pw2"])
+        assert [user.password for user in result] == ["hash_1", "hash_2"]
+        assert [user.email for user in result] == ["first@example.com", "second@example.com"]
+        mock_database_session.add_all.assert_called_once_with(result)
+        mock_database_session.commit.assert_called_once()
+
     def test_update_user_success(self, mock_database_session, mock_user):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_database_session.identity_map.get.return_value = mock_user
 
         result = update_user(
             db=mock_database_session,
@@ -49,7 +65,7 @@ class TestUserService:
         mock_database_session.commit.assert_called_once()
 
     def test_delete_user_success(self, mock_database_session, mock_user):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_database_session.get.return_value = mock_user
 
         delete_user(db=mock_database_session, user_id=1)
 
@@ -81,15 +97,15 @@ class TestUserService:
         assert result is None
 
     def test_get_user_by_id_found(self, mock_database_session, mock_user):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_database_session.get.return_value = mock_user
 
         result = get_user_by_id(db=mock_database_session, user_id=1)
 
         assert result == mock_user
-        mock_database_session.query.assert_called_once_with(User)
+        mock_database_session.get.assert_called_once_with(User, 1)
 
     def test_get_user_by_id_not_found(self, mock_database_session):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = None
+        mock_database_session.get.return_value = None
 
         result = get_user_by_id(db=mock_database_session, user_id=999)
 
@@ -143,7 +159,7 @@ class TestUserService:
         assert result is False
 
     def test_update_user_multiple_fields(self, mock_database_session, mock_user):
-        mock_database_session.query.return_value.filter_by.return_value.first.return_value = mock_user
+        mock_database_session.identity_map.get.return_value = mock_user
 
         result = update_user(
             db=mock_database_session,
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from app.utils.validators import is_valid_email, validate_client_data, validate_event_data
+
+
+class TestValidators:
+    """Test cases for the validation rules shared by forms and imports"""
+
+    def test_is_valid_email(self):
+        """Test the basic email format check"""
+        assert is_valid_email("john@example.com")
+        assert not is_valid_email("john.example.com")
+        assert not is_valid_email("john@example")
+
+    def test_validate_client_data_valid(self):
+        """Test that complete client data has no errors"""
+        assert validate_client_data({'full_name': "John", 'email': "john@example.com"}) == []
+
+    def test_validate_client_data_errors(self):
+        """Test the errors of incomplete client data"""
+        assert validate_client_data({'full_name': " ", 'email': ""}) == [
+            "Le nom complet est obligatoire.", "L'email est obligatoire."
+        ]
+        assert validate_client_data({'full_name': "John", 'email': "john"}) == ["Format d'email invalide."]
+
+    def test_validate_event_data(self):
+        """Test that an event must end after it starts"""
+        start = datetime(2025, 6, 1, 10)
+
+        assert validate_event_data({'name': "Gala", 'start_date': start, 'end_date': datetime(2025, 6, 1, 12)}) == []
+        assert validate_event_data({'name': "Gala", 'start_date': start, 'end_date': start}) == [
+            "La date de fin doit être postérieure à la date de début."
+        ]